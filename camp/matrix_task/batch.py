@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import operator
+from collections.abc import Callable, Iterable
+from itertools import repeat
+
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.storage import Buffer, pack, same_values
+
+
+class MatrixBatch:
+    """Stack of matrices of the same size.
+
+    Values of all matrices are kept in one flat buffer, matrix after
+    matrix in row-major order, so element ``(i, j)`` of matrix ``k``
+    lives at ``k * rows * cols + i * cols + j``. Operations process the
+    whole stack in one call, which saves the python dispatch of operating
+    on each small matrix separately.
+    """
+
+    __slots__ = ("_buffer", "count", "rows_count", "cols_count")
+
+    def __init__(self, matrices: list[Matrix]) -> None:
+        """Stack the matrices.
+
+        Raises:
+            ValueError: If the matrices have different sizes.
+        """
+        if not matrices:
+            raise ValueError("Batch must contain at least one matrix")
+        rows_count, cols_count = matrices[0].size
+        if any(matrix.size != (rows_count, cols_count) for matrix in matrices):
+            raise ValueError("Matrices must have the same size")
+        self._buffer = pack(
+            [value for matrix in matrices for value in matrix._flat()],
+        )
+        self.count = len(matrices)
+        self.rows_count = rows_count
+        self.cols_count = cols_count
+
+    @classmethod
+    def _from_buffer(
+        cls: type[MatrixBatch],
+        buffer: Buffer,
+        count: int,
+        rows_count: int,
+        cols_count: int,
+    ) -> MatrixBatch:
+        """Create a batch over the flat buffer without copying it."""
+        batch = cls.__new__(cls)
+        batch._buffer = buffer
+        batch.count = count
+        batch.rows_count = rows_count
+        batch.cols_count = cols_count
+        return batch
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """Return size of each matrix of the batch."""
+        return self.rows_count, self.cols_count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> Matrix:
+        """Return a copy of the matrix of the batch."""
+        if not -self.count <= index < self.count:
+            raise IndexError("Batch index out of range")
+        step = self.rows_count * self.cols_count
+        start = index % self.count * step
+        return Matrix._from_buffer(
+            self._buffer[start:start + step],
+            self.rows_count,
+            self.cols_count,
+        )
+
+    def to_list(self) -> list[Matrix]:
+        """Split the batch into separate matrices.
+
+        Returns:
+            list[Matrix]: Copies of the matrices of the batch.
+        """
+        return [self[index] for index in range(self.count)]
+
+    def _elementwise(
+        self,
+        other: object,
+        operation: Callable[[int | float, int | float], int | float],
+        sign: str,
+    ) -> MatrixBatch:
+        """Apply the operation to each element of the batches.
+
+        Raises:
+            ValueError: If other is not a batch of the same size.
+        """
+        if not isinstance(other, MatrixBatch):
+            raise ValueError(
+                f"Unsupported operand for {sign}: "
+                f"'MatrixBatch' and '{type(other)}'",
+            )
+        if (self.count, *self.size) != (other.count, *other.size):
+            raise ValueError("Batches must have the same size")
+        return MatrixBatch._from_buffer(
+            pack(list(map(operation, self._buffer, other._buffer))),
+            self.count,
+            self.rows_count,
+            self.cols_count,
+        )
+
+    def __add__(self, other: object) -> MatrixBatch:
+        return self._elementwise(other, operator.add, "+")
+
+    def __sub__(self, other: object) -> MatrixBatch:
+        return self._elementwise(other, operator.sub, "-")
+
+    def __matmul__(self, other: object) -> MatrixBatch:
+        """Multiply each matrix of the batch.
+
+        Other is either a batch of the same length, then the matrices are
+        multiplied pairwise, or one matrix multiplying each of the batch.
+
+        Raises:
+            ValueError: If matrices are not aligned or the batches have
+                different lengths.
+
+        Returns:
+            MatrixBatch: Batch of the products.
+        """
+        if isinstance(other, Matrix):
+            right, right_step = other._flat(), 0
+            cols_count = other.cols_count
+            inner = other.rows_count
+        elif isinstance(other, MatrixBatch):
+            if other.count != self.count:
+                raise ValueError("Batches must have the same size")
+            right = other._buffer
+            right_step = other.rows_count * other.cols_count
+            inner, cols_count = other.size
+        else:
+            raise ValueError(
+                f"Unsupported operand for *: "
+                f"'MatrixBatch' and '{type(other)}'",
+            )
+        if self.cols_count != inner:
+            raise ValueError("Matrices are not aligned for multiplication")
+        return MatrixBatch._from_buffer(
+            pack(self._product(right, right_step, cols_count)),
+            self.count,
+            self.rows_count,
+            cols_count,
+        )
+
+    def _product(
+        self,
+        right: Buffer,
+        right_step: int,
+        cols_count: int,
+    ) -> list[int | float]:
+        """Compute values of products with matrices from the right buffer.
+
+        The loops go over positions in the matrices, and each step works
+        on a lane: values at the same position in all matrices of the
+        batch, taken with one strided slice. So the python overhead does
+        not depend on the number of matrices.
+
+        Args:
+            right: Flat buffer of the right matrices.
+            right_step: Distance between the right matrices in the buffer,
+                0 to multiply by the same matrix.
+            cols_count: Number of columns of the right matrices.
+        """
+        inner = self.cols_count
+        left_step = self.rows_count * inner
+        out_step = self.rows_count * cols_count
+        left_lanes = [
+            self._buffer[position::left_step] for position in range(left_step)
+        ]
+        right_lanes: list[Iterable[int | float]] = [
+            right[position::right_step]
+            if right_step
+            else repeat(right[position])
+            for position in range(inner * cols_count)
+        ]
+        values: list[int | float] = [0] * (self.count * out_step)
+        for row in range(self.rows_count):
+            for col in range(cols_count):
+                lane: list[int | float] = [0] * self.count
+                for k in range(inner):
+                    lane = list(
+                        map(
+                            operator.add,
+                            lane,
+                            map(
+                                operator.mul,
+                                left_lanes[row * inner + k],
+                                right_lanes[k * cols_count + col],
+                            ),
+                        ),
+                    )
+                values[row * cols_count + col::out_step] = lane
+        return values
+
+    def transpose(self) -> MatrixBatch:
+        """Transpose each matrix of the batch.
+
+        Returns:
+            MatrixBatch: Batch of the transposed matrices.
+        """
+        step = self.rows_count * self.cols_count
+        values = self._buffer[:]
+        for row in range(self.rows_count):
+            for col in range(self.cols_count):
+                values[col * self.rows_count + row::step] = self._buffer[
+                    row * self.cols_count + col::step
+                ]
+        return MatrixBatch._from_buffer(
+            values,
+            self.count,
+            self.cols_count,
+            self.rows_count,
+        )
+
+    def __pow__(self, power: int) -> MatrixBatch:
+        """Raise each matrix of the batch to the power.
+
+        Uses exponentiation by squaring on the whole batch.
+
+        Raises:
+            ValueError: If the power is negative or matrices are not square.
+
+        Returns:
+            MatrixBatch: Batch of the results.
+        """
+        if power < 0:
+            raise ValueError("Power must be a non-negative integer")
+        if self.rows_count != self.cols_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        if power == 0:
+            size = self.rows_count
+            identity = [
+                1 if i == j else 0 for i in range(size) for j in range(size)
+            ]
+            return MatrixBatch._from_buffer(
+                pack(identity * self.count),
+                self.count,
+                size,
+                size,
+            )
+        square = self
+        while not power & 1:
+            square, power = square @ square, power >> 1
+        result = square
+        power >>= 1
+        while power:
+            square = square @ square
+            if power & 1:
+                result = result @ square
+            power >>= 1
+        return result
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MatrixBatch):
+            return False
+        return (self.count, *self.size) == (
+            other.count,
+            *other.size,
+        ) and same_values(self._buffer, other._buffer)
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import json
+import operator
+import pickle
+import random
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from functools import partial
+from itertools import chain, product
+from pathlib import Path
+from typing import Any, TypeAlias
+
+import click
+
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.sparse import SparseMatrix
+
+Operand: TypeAlias = Matrix | SparseMatrix
+Result: TypeAlias = dict[str, Any]
+
+# Part of the elements which are not zero in sparse operands.
+SPARSE_DENSITY = 0.05
+# Slowdown (relative to the baseline ops/sec) which is a regression.
+REGRESSION_THRESHOLD = 0.2
+
+OPERATIONS: dict[str, Callable[[Operand, Operand], object]] = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "scalar_mul": lambda matrix, _: matrix * 3,
+    "matmul": operator.matmul,
+    "transpose": lambda matrix, _: matrix.transpose(),
+    "pow": lambda matrix, _: matrix ** 3,
+    "eq": operator.eq,
+}
+DTYPES = ("int", "float")
+KINDS = ("dense", "sparse")
+SIZES = (16, 64, 128)
+SERIALIZATION_SIZE = 4096
+
+
+def make_operand(size: int, dtype: str, kind: str, seed: int) -> Operand:
+    """Build a random square matrix.
+
+    Args:
+        size: Number of rows and columns.
+        dtype: ``int`` or ``float`` values.
+        kind: ``dense`` or ``sparse`` matrix. Only ``SPARSE_DENSITY`` of
+            elements of a sparse one are not zero.
+        seed: Seed of the random values.
+
+    Returns:
+        Operand: The matrix.
+    """
+    if kind == "sparse":
+        return SparseMatrix.from_dense(
+            random_matrix(size, dtype, SPARSE_DENSITY, seed),
+        )
+    return random_matrix(size, dtype, 1, seed)
+
+
+def random_matrix(size: int, dtype: str, density: float, seed: int) -> Matrix:
+    """Build a random square matrix with the part of nonzero elements."""
+    generator = random.Random(seed)
+
+    def value() -> int | float:
+        if generator.random() >= density:
+            return 0
+        if dtype == "float":
+            return generator.uniform(-10, 10)
+        return generator.randint(-10, 10)
+
+    return Matrix([[value() for _ in range(size)] for _ in range(size)])
+
+
+def measure(
+    operation: Callable[[], object],
+    min_time: float,
+) -> tuple[float, int]:
+    """Measure speed and memory of the operation.
+
+    The operation is repeated until it takes at least ``min_time``
+    seconds in total.
+
+    Returns:
+        tuple[float, int]: Operations per second and peak memory in bytes
+            allocated by one operation.
+    """
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    count = 0
+    start = time.perf_counter()
+    while True:
+        operation()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return count / elapsed, peak
+
+
+def run(
+    sizes: tuple[int, ...] = SIZES,
+    min_time: float = 0.2,
+) -> Iterator[Result]:
+    """Benchmark all operations on all sizes, dtypes and kinds of matrices.
+
+    Yields:
+        Result: Case (``name``) with its ``ops_per_sec`` and ``peak_bytes``.
+    """
+    for size, dtype, kind in product(sizes, DTYPES, KINDS):
+        left = make_operand(size, dtype, kind, seed=0)
+        right = make_operand(size, dtype, kind, seed=1)
+        for name, operation in OPERATIONS.items():
+            ops_per_sec, peak = measure(
+                partial(operation, left, right),
+                min_time,
+            )
+            yield {
+                "name": f"{name}[{kind}-{dtype}-{size}]",
+                "ops_per_sec": ops_per_sec,
+                "peak_bytes": peak,
+            }
+
+
+def run_serialization(
+    size: int = SERIALIZATION_SIZE,
+    min_time: float = 0.2,
+) -> Iterator[Result]:
+    """Benchmark the binary format against JSON of ``data`` and pickle.
+
+    Yields:
+        Result: Case (``name``) with its ``ops_per_sec``, ``peak_bytes``
+            and ``size_bytes`` of the serialized matrix.
+    """
+    matrix = random_matrix(size, "float", 1, seed=0)
+    formats: dict[str, tuple[Callable[[], bytes], Callable[[bytes], object]]]
+    formats = {
+        "binary": (matrix.to_bytes, Matrix.from_bytes),
+        "json": (
+            lambda: json.dumps(matrix.data).encode(),
+            lambda data: Matrix(json.loads(data)),
+        ),
+        "pickle": (
+            lambda: pickle.dumps(matrix, pickle.HIGHEST_PROTOCOL),
+            pickle.loads,
+        ),
+    }
+    for name, (dump, load) in formats.items():
+        data = dump()
+        for step, operation in (
+            ("dump", dump),
+            ("load", partial(load, data)),
+        ):
+            ops_per_sec, peak = measure(operation, min_time)
+            yield {
+                "name": f"{name}_{step}[float-{size}]",
+                "ops_per_sec": ops_per_sec,
+                "peak_bytes": peak,
+                "size_bytes": len(data),
+            }
+
+
+def regressions(
+    results: list[Result],
+    baseline: list[Result],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> list[str]:
+    """Compare results with the baseline.
+
+    Cases missing in the baseline are skipped.
+
+    Args:
+        results: Results of the current run.
+        baseline: Results of the baseline run.
+        threshold: Allowed slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        list[str]: Descriptions of the cases that got slower.
+    """
+    expected = {result["name"]: result["ops_per_sec"] for result in baseline}
+    return [
+        f"{result['name']}: {result['ops_per_sec']:.1f} ops/sec, "
+        f"baseline {expected[result['name']]:.1f} ops/sec"
+        for result in results
+        if result["name"] in expected
+        and result["ops_per_sec"] < expected[result["name"]] * (1 - threshold)
+    ]
+
+
+@click.command()
+@click.option(
+    "-o", "--output",
+    type=click.Path(),
+    default=None,
+    help="Save results to the JSON file",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True),
+    default=None,
+    help="JSON file with results to compare with",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=REGRESSION_THRESHOLD,
+    help="Allowed slowdown relative to the baseline",
+)
+@click.option(
+    "--size",
+    "sizes",
+    type=int,
+    multiple=True,
+    default=SIZES,
+    help="Number of rows and columns of matrices, may be repeated",
+)
+@click.option(
+    "--serialization-size",
+    type=int,
+    default=SERIALIZATION_SIZE,
+    help="Size of the float matrix to serialize, 0 to skip",
+)
+@click.option(
+    "--min-time",
+    type=float,
+    default=0.2,
+    help="Minimal time in seconds to repeat each operation",
+)
+def main(
+    output: str | None,
+    baseline: str | None,
+    threshold: float,
+    sizes: tuple[int, ...],
+    serialization_size: int,
+    min_time: float,
+) -> None:
+    """Benchmark matrix operations.
+
+    Raises:
+        ClickException: If some operations got slower than the baseline.
+    """
+    results = []
+    cases = run(sizes, min_time)
+    if serialization_size:
+        cases = chain(cases, run_serialization(serialization_size, min_time))
+    for result in cases:
+        click.echo(
+            f"{result['name']:<32} {result['ops_per_sec']:>12.1f} ops/sec "
+            f"{result['peak_bytes']:>12} bytes",
+        )
+        results.append(result)
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2))
+    if baseline:
+        slower = regressions(
+            results,
+            json.loads(Path(baseline).read_text()),
+            threshold,
+        )
+        if slower:
+            raise click.ClickException(
+                "Performance regressions:\n" + "\n".join(slower),
+            )
+
+
+if __name__ == "__main__":
+    main()
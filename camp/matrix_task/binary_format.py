@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from typing import Any
+
+from camp.matrix_task.storage import FLOAT_TYPECODE, INT_TYPECODE
+
+# Binary layout of a matrix: the header followed by row-major values in
+# little-endian byte order. The header is 8-byte aligned, so the values
+# can be used in place from a mmap'd file.
+MAGIC = b"CMTX"
+VERSION = 1
+# Magic, version, typecode of values, padding, rows and columns.
+HEADER = struct.Struct("<4sBc2xQQ")
+TYPECODES = (INT_TYPECODE, FLOAT_TYPECODE)
+
+
+def pack_header(typecode: str, rows_count: int, cols_count: int) -> bytes:
+    """Build the header of a matrix.
+
+    Raises:
+        ValueError: If values of the typecode can't be stored.
+    """
+    if typecode not in TYPECODES:
+        raise ValueError("Only int64 and float64 matrices can be stored")
+    return HEADER.pack(
+        MAGIC,
+        VERSION,
+        typecode.encode(),
+        rows_count,
+        cols_count,
+    )
+
+
+def unpack_header(
+    data: bytes | bytearray | memoryview,
+) -> tuple[str, int, int]:
+    """Parse the header at the beginning of the data.
+
+    Raises:
+        ValueError: If the data does not start with a valid header.
+
+    Returns:
+        tuple[str, int, int]: Typecode of values, rows and columns.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Data is too short for a matrix header")
+    magic, version, typecode, rows_count, cols_count = HEADER.unpack_from(
+        data,
+    )
+    if magic != MAGIC:
+        raise ValueError("Data is not a binary matrix")
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary matrix version {version}")
+    if typecode.decode() not in TYPECODES:
+        raise ValueError(f"Unsupported typecode {typecode!r}")
+    return typecode.decode(), rows_count, cols_count
+
+
+def payload_size(typecode: str, rows_count: int, cols_count: int) -> int:
+    """Return size of the values in bytes."""
+    return rows_count * cols_count * array(typecode).itemsize
+
+
+def swap_byte_order(values: array[Any]) -> None:
+    """Convert values between native and little-endian order in place.
+
+    Does nothing on little-endian machines.
+    """
+    if sys.byteorder == "big":
+        values.byteswap()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from collections.abc import Callable, Iterable, Sequence
+from itertools import repeat
+
+from camp.matrix_task import kernels
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.sparse import SparseMatrix
+from camp.matrix_task.storage import FLOAT_TYPECODE
+
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 1000
+
+
+class EigenPair:
+    """Dominant eigenvalue and eigenvector found by ``power_iteration``.
+
+    Attributes:
+        value: The eigenvalue (Rayleigh quotient of the vector).
+        vector: The eigenvector, of unit Euclidean length.
+        residual: Length of ``A @ vector - value * vector``.
+        iterations: Number of mat-vec products done.
+        converged: Whether the residual got within the tolerance.
+        elapsed: Time the iteration took, in seconds.
+    """
+
+    __slots__ = (
+        "value",
+        "vector",
+        "residual",
+        "iterations",
+        "converged",
+        "elapsed",
+    )
+
+    def __init__(
+        self,
+        value: float,
+        vector: array[float],
+        residual: float,
+        iterations: int,
+        converged: bool,
+        elapsed: float,
+    ) -> None:
+        self.value = value
+        self.vector = vector
+        self.residual = residual
+        self.iterations = iterations
+        self.converged = converged
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        return (
+            f"EigenPair(value={self.value!r}, iterations={self.iterations}, "
+            f"converged={self.converged}, elapsed={self.elapsed:.6f})"
+        )
+
+
+def power_iteration(
+    matrix: Matrix | SparseMatrix,
+    tolerance: float = TOLERANCE,
+    max_iterations: int = MAX_ITERATIONS,
+    start: Iterable[int | float] | None = None,
+    transpose: bool = False,
+) -> EigenPair:
+    """Find the dominant eigenpair of the matrix by power iteration.
+
+    Each step is one mat-vec product, ``O(n ** 2)`` for a dense matrix
+    and ``O(nnz)`` for a sparse one, instead of a matmul of ``m ** k``.
+    The iteration stops as soon as the residual
+    ``|A @ x - value * x|`` is at most ``tolerance * |value|``.
+
+    Example:
+        Stationary distribution of a row-stochastic matrix ``P`` is the
+        left eigenvector, ``power_iteration(P, transpose=True).vector``
+        divided by its sum.
+
+    Args:
+        matrix: Square dense or sparse matrix.
+        tolerance: Relative residual to stop at.
+        max_iterations: Maximal number of mat-vec products.
+        start: Initial vector, all ones if not set. It must not be
+            orthogonal to the dominant eigenvector.
+        transpose: Find the left eigenvector, of ``A.T``, instead.
+
+    Raises:
+        ValueError: If the matrix is not square, or the start vector is
+            zero or has a wrong length.
+
+    Returns:
+        EigenPair: The eigenpair with the iteration statistics. Its
+            ``converged`` is False if ``max_iterations`` was not enough,
+            e.g. when two eigenvalues have the same largest magnitude.
+    """
+    size, cols_count = matrix.size
+    if size != cols_count:
+        raise ValueError("Matrix must be square")
+    started = time.perf_counter()
+    multiply = _multiplication(matrix, transpose)
+    vector: array[float] = array(
+        FLOAT_TYPECODE,
+        repeat(1.0, size) if start is None else start,
+    )
+    if len(vector) != size:
+        raise ValueError("Matrix and vector are not aligned")
+    norm = _norm(vector)
+    if not norm:
+        raise ValueError("Start vector must not be zero")
+    _scale(vector, 1 / norm)
+    product: array[float] = array(FLOAT_TYPECODE, [0.0]) * size
+    value, residual, converged, iterations = 0.0, math.inf, False, 0
+    while iterations < max_iterations and not converged:
+        multiply(vector, product)
+        iterations += 1
+        value = kernels.float_dot(vector, product)
+        residual = math.sqrt(
+            math.fsum(
+                (new - value * old) ** 2
+                for new, old in zip(product, vector)
+            ),
+        )
+        converged = residual <= tolerance * abs(value)
+        norm = _norm(product)
+        if not norm:
+            # The vector is in the kernel of the matrix, the value is 0.
+            break
+        _scale(product, 1 / norm)
+        vector, product = product, vector
+    return EigenPair(
+        value,
+        vector,
+        residual,
+        iterations,
+        converged,
+        time.perf_counter() - started,
+    )
+
+
+def _multiplication(
+    matrix: Matrix | SparseMatrix,
+    transpose: bool,
+) -> Callable[[Sequence[float], array[float]], None]:
+    """Return function writing ``A @ x`` into a buffer.
+
+    Rows of a dense matrix are sliced once, so each step is only the dot
+    products.
+    """
+    if isinstance(matrix, SparseMatrix):
+        sparse = matrix.transpose() if transpose else matrix
+
+        def multiply_sparse(
+            vector: Sequence[float],
+            out: array[float],
+        ) -> None:
+            out[:] = array(FLOAT_TYPECODE, sparse.matvec(vector))
+
+        return multiply_sparse
+    rows = matrix._columns() if transpose else list(matrix._rows())
+    product = kernels.float_dot
+
+    def multiply_dense(vector: Sequence[float], out: array[float]) -> None:
+        kernels.gemv_into(out, rows, vector, product=product)
+
+    return multiply_dense
+
+
+def _norm(vector: Sequence[float]) -> float:
+    """Return Euclidean length of the vector."""
+    return math.sqrt(kernels.float_dot(vector, vector))
+
+
+def _scale(vector: array[float], factor: float) -> None:
+    """Multiply values of the vector by the factor in place."""
+    vector[:] = array(FLOAT_TYPECODE, [value * factor for value in vector])
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import math
+import operator
+from array import array
+from collections.abc import Callable, Iterable, Sequence
+from typing import TypeAlias
+
+from camp.matrix_task.storage import FLOAT_TYPECODE, Buffer, typecode_of
+
+Vector: TypeAlias = Sequence[int | float]
+DotProduct: TypeAlias = Callable[
+    [Iterable[int | float], Iterable[int | float]],
+    int | float,
+]
+
+# Size of the cache the tiles of the operands should fit into (L2).
+CACHE_SIZE = 256 * 1024
+MIN_TILE = 1
+MAX_TILE = 256
+# Size of a pointer, used for buffers of boxed python objects.
+POINTER_SIZE = 8
+
+
+def _sum_of_products(
+    left: Iterable[int | float],
+    right: Iterable[int | float],
+) -> int | float:
+    return sum(map(operator.mul, left, right))
+
+
+def _fsum_of_products(
+    left: Iterable[int | float],
+    right: Iterable[int | float],
+) -> int | float:
+    return math.fsum(map(operator.mul, left, right))
+
+
+# ``math.sumprod`` (python 3.12+) computes the dot product in C without
+# boxing each intermediate product. It's exact for integers and uses
+# extended precision for floats.
+dot: DotProduct = getattr(math, "sumprod", _sum_of_products)
+# Dot product of floats without accumulated rounding errors.
+float_dot: DotProduct = getattr(math, "sumprod", _fsum_of_products)
+
+
+def dot_for(*typecodes: str | None) -> DotProduct:
+    """Pick the dot product for buffers with the typecodes.
+
+    Integers (``array`` or big ones in a list) are summed exactly as is,
+    floats are summed with ``float_dot``.
+    """
+    return float_dot if FLOAT_TYPECODE in typecodes else dot
+
+
+def modular_dot(modulus: int) -> DotProduct:
+    """Return the dot product of integers modulo the modulus."""
+
+    def product(
+        left: Iterable[int | float],
+        right: Iterable[int | float],
+    ) -> int | float:
+        return dot(left, right) % modulus
+
+    return product
+
+
+def itemsize(buffer: Vector) -> int:
+    """Return size of one element of the buffer in bytes."""
+    return getattr(buffer, "itemsize", POINTER_SIZE)
+
+
+def tile_size(inner: int, size_of_item: int) -> int:
+    """Pick the side of an output tile for the blocked matmul.
+
+    The tile is chosen so that a tile of left rows and a tile of right
+    columns (each ``inner`` elements long) fit into the cache together.
+
+    Args:
+        inner: Length of the rows and columns being multiplied.
+        size_of_item: Size of one element in bytes.
+
+    Returns:
+        int: Number of rows (and columns) in one tile.
+    """
+    tile = CACHE_SIZE // max(1, 2 * inner * size_of_item)
+    return max(MIN_TILE, min(MAX_TILE, tile))
+
+
+def matmul_into(
+    out: Buffer,
+    left_rows: Sequence[Vector],
+    right_cols: Sequence[Vector],
+    tile: int | None = None,
+    product: DotProduct | None = None,
+) -> None:
+    """Multiply matrices given as rows of left and columns of right.
+
+    The right operand is expected to be transposed beforehand, so every
+    output cell is a dot product of two contiguous buffers, computed by
+    ``dot`` without a python level loop. Output is filled tile by tile,
+    so the same few columns are reused for a tile of rows while they are
+    still in cache.
+
+    Args:
+        out: Flat row-major buffer for the result, filled in place.
+        left_rows: Rows of the left matrix.
+        right_cols: Columns of the right matrix.
+        tile: Side of an output tile, picked by ``tile_size`` if not set.
+        product: Dot product of a row and a column, picked by ``dot_for``
+            the typecodes of the operands if not set.
+    """
+    rows_count, cols_count = len(left_rows), len(right_cols)
+    if not rows_count or not cols_count:
+        return
+    if tile is None:
+        tile = tile_size(len(left_rows[0]), itemsize(left_rows[0]))
+    if product is None:
+        product = dot_for(
+            typecode_of(left_rows[0]),
+            typecode_of(right_cols[0]),
+        )
+    for row_start in range(0, rows_count, tile):
+        row_block = range(row_start, min(row_start + tile, rows_count))
+        for col_start in range(0, cols_count, tile):
+            col_block = right_cols[col_start:col_start + tile]
+            for i in row_block:
+                row = left_rows[i]
+                position = i * cols_count + col_start
+                for offset, col in enumerate(col_block):
+                    out[position + offset] = product(row, col)
+
+
+def matmul(
+    left_rows: Sequence[Vector],
+    right_cols: Sequence[Vector],
+    tile: int | None = None,
+    product: DotProduct | None = None,
+) -> list[int | float]:
+    """Multiply matrices given as rows of left and columns of right.
+
+    Returns:
+        list: Flat row-major values of the product.
+    """
+    out: list[int | float] = [0] * (len(left_rows) * len(right_cols))
+    matmul_into(out, left_rows, right_cols, tile, product)
+    return out
+
+
+def matvec(
+    rows: Sequence[Vector],
+    vector: Vector,
+    product: DotProduct | None = None,
+) -> list[int | float]:
+    """Multiply a matrix given as rows by a vector.
+
+    Each value of the result is one dot product of a row and the vector,
+    so no intermediate matrix is built.
+
+    Args:
+        rows: Rows of the matrix (or columns, for a vector-matrix product).
+        vector: The vector.
+        product: Dot product of a row and the vector, picked by
+            ``dot_for`` the typecodes of the operands if not set.
+
+    Returns:
+        list: Values of the product.
+    """
+    if product is None and rows:
+        product = dot_for(typecode_of(rows[0]), typecode_of(vector))
+    elif product is None:
+        product = dot
+    return [product(row, vector) for row in rows]
+
+
+def gemv_into(
+    out: Buffer,
+    rows: Sequence[Vector],
+    vector: Vector,
+    alpha: int | float = 1,
+    beta: int | float = 0,
+    product: DotProduct | None = None,
+) -> None:
+    """Compute ``out = alpha * A @ vector + beta * out`` in place.
+
+    With zero ``beta`` the values of ``out`` are not read, so they may be
+    anything (e.g. ``nan``), like in BLAS.
+
+    Args:
+        out: Buffer for the result, as long as the number of rows.
+        rows: Rows of the matrix ``A``.
+        vector: The vector.
+        alpha: Factor of the product.
+        beta: Factor of the current values of ``out``.
+        product: Dot product of a row and the vector, picked by
+            ``dot_for`` the typecodes of the operands if not set.
+
+    Raises:
+        TypeError: If float values are written to an int64 buffer.
+        OverflowError: If the values do not fit the buffer.
+    """
+    values = matvec(rows, vector, product)
+    if alpha != 1:
+        values = [alpha * value for value in values]
+    if beta:
+        values = [value + beta * old for value, old in zip(values, out)]
+    typecode = typecode_of(out)
+    out[:] = values if typecode is None else array(typecode, values)
+
+
+# Square matrices of this size and bigger are multiplied by Strassen.
+STRASSEN_THRESHOLD = 512
+# Strassen recursion falls back to the blocked kernel below this size.
+STRASSEN_CUTOFF = 128
+
+
+def use_strassen(rows_count: int, inner: int, cols_count: int) -> bool:
+    """Check if Strassen algorithm should be used for the product sizes."""
+    return rows_count == inner == cols_count >= STRASSEN_THRESHOLD
+
+
+def strassen(
+    left: Vector,
+    right: Vector,
+    size: int,
+    cutoff: int | None = None,
+    product: DotProduct | None = None,
+) -> list[int | float]:
+    """Multiply square matrices with Strassen algorithm.
+
+    Each step splits the matrices into quadrants and does 7 products of
+    half size instead of 8. Odd sizes are padded with a zero row and
+    column. Below the cutoff the blocked kernel is used.
+
+    Args:
+        left: Flat row-major values of the left matrix.
+        right: Flat row-major values of the right matrix.
+        size: Number of rows (and columns) of the matrices.
+        cutoff: Size to switch to the blocked kernel at,
+            ``STRASSEN_CUTOFF`` by default.
+        product: Dot product for the blocked kernel, picked by
+            ``dot_for`` the typecodes of the operands if not set.
+
+    Returns:
+        list: Flat row-major values of the product.
+    """
+    if cutoff is None:
+        cutoff = STRASSEN_CUTOFF
+    if product is None:
+        product = dot_for(typecode_of(left), typecode_of(right))
+    if size <= max(cutoff, 1):
+        return matmul(
+            [left[row:row + size] for row in range(0, size * size, size)],
+            [right[col::size] for col in range(size)],
+            product=product,
+        )
+    if size % 2:
+        padded = strassen(
+            _pad(left, size),
+            _pad(right, size),
+            size + 1,
+            cutoff,
+            product,
+        )
+        return _unpad(padded, size + 1)
+    half = size // 2
+    a11, a12, a21, a22 = _quadrants(left, size)
+    b11, b12, b21, b22 = _quadrants(right, size)
+    m1 = strassen(_add(a11, a22), _add(b11, b22), half, cutoff, product)
+    m2 = strassen(_add(a21, a22), b11, half, cutoff, product)
+    m3 = strassen(a11, _sub(b12, b22), half, cutoff, product)
+    m4 = strassen(a22, _sub(b21, b11), half, cutoff, product)
+    m5 = strassen(_add(a11, a12), b22, half, cutoff, product)
+    m6 = strassen(_sub(a21, a11), _add(b11, b12), half, cutoff, product)
+    m7 = strassen(_sub(a12, a22), _add(b21, b22), half, cutoff, product)
+    return _join(
+        _add(_sub(_add(m1, m4), m5), m7),
+        _add(m3, m5),
+        _add(m2, m4),
+        _add(_add(_sub(m1, m2), m3), m6),
+        half,
+    )
+
+
+def _add(
+    left: Vector,
+    right: Vector,
+) -> list[int | float]:
+    return list(map(operator.add, left, right))
+
+
+def _sub(
+    left: Vector,
+    right: Vector,
+) -> list[int | float]:
+    return list(map(operator.sub, left, right))
+
+
+def _quadrants(
+    values: Vector,
+    size: int,
+) -> tuple[list[int | float], ...]:
+    """Split flat square matrix of even size into four quadrants."""
+    half = size // 2
+    quadrants: tuple[list[int | float], ...] = ([], [], [], [])
+    for row in range(size):
+        start = row * size
+        top = 0 if row < half else 2
+        quadrants[top].extend(values[start:start + half])
+        quadrants[top + 1].extend(values[start + half:start + size])
+    return quadrants
+
+
+def _join(
+    c11: list[int | float],
+    c12: list[int | float],
+    c21: list[int | float],
+    c22: list[int | float],
+    half: int,
+) -> list[int | float]:
+    """Join four quadrants into a flat square matrix."""
+    values: list[int | float] = []
+    for left, right in ((c11, c12), (c21, c22)):
+        for start in range(0, half * half, half):
+            values.extend(left[start:start + half])
+            values.extend(right[start:start + half])
+    return values
+
+
+def _pad(values: Vector, size: int) -> list[int | float]:
+    """Add a zero row and column to a flat square matrix."""
+    padded: list[int | float] = []
+    for start in range(0, size * size, size):
+        padded.extend(values[start:start + size])
+        padded.append(0)
+    padded.extend([0] * (size + 1))
+    return padded
+
+
+def _unpad(values: Vector, size: int) -> list[int | float]:
+    """Remove the last row and column of a flat square matrix."""
+    unpadded: list[int | float] = []
+    for start in range(0, (size - 1) * size, size):
+        unpadded.extend(values[start:start + size - 1])
+    return unpadded
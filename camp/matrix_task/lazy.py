@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import math
+import operator
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from itertools import repeat
+from typing import TypeAlias
+
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.storage import Buffer, pack_as
+
+Operation: TypeAlias = Callable[[int | float, int | float], int | float]
+
+
+class LazyMatrix(ABC):
+    """Node of a lazily evaluated matrix expression.
+
+    Operators on lazy matrices do not compute anything, they build an
+    expression tree. The tree is evaluated when the result is read
+    (``evaluate``, ``data`` or ``==``): all elementwise operations are
+    fused into one pass over the elements, and chains of matrix
+    multiplications are done in the cheapest order.
+
+    The result is computed once and kept, so the matrices of the
+    expression must not be changed in place after it's evaluated.
+    """
+
+    __matrix_priority__ = 1
+
+    __slots__ = ("rows_count", "cols_count", "_result")
+
+    def __init__(self, rows_count: int, cols_count: int) -> None:
+        self.rows_count = rows_count
+        self.cols_count = cols_count
+        self._result: Matrix | None = None
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """Return size of the result matrix."""
+        return self.rows_count, self.cols_count
+
+    @property
+    def data(self) -> list[list[int | float]]:
+        """Return the result matrix as a list of rows."""
+        return self.evaluate().data
+
+    def evaluate(self) -> Matrix:
+        """Evaluate the expression.
+
+        The result is computed once and kept, later reads return a
+        copy-on-write view of it, so changing them in place does not
+        change the kept result.
+
+        Returns:
+            Matrix: The result of the expression.
+        """
+        if self._result is None:
+            self._result = Matrix._from_buffer(
+                pack_as(list(self._values()), *self._sources()),
+                self.rows_count,
+                self.cols_count,
+            )
+        return _view(self._result)
+
+    @abstractmethod
+    def _values(self) -> Iterator[int | float]:
+        """Iterate over the values of the result in row-major order."""
+
+    @abstractmethod
+    def _sources(self) -> list[Buffer]:
+        """Return buffers the values are computed from.
+
+        They pick the buffer of the result like for ``Matrix``, e.g. the
+        values computed from big integers stay in a list.
+        """
+
+    def __add__(self, other: object) -> LazyMatrix:
+        return self._elementwise(other, operator.add, "+")
+
+    def __radd__(self, other: object) -> LazyMatrix:
+        return _wrap(other, "+")._elementwise(self, operator.add, "+")
+
+    def __sub__(self, other: object) -> LazyMatrix:
+        return self._elementwise(other, operator.sub, "-")
+
+    def __rsub__(self, other: object) -> LazyMatrix:
+        return _wrap(other, "-")._elementwise(self, operator.sub, "-")
+
+    def __mul__(self, other: object) -> LazyMatrix:
+        if isinstance(other, (int, float)):
+            return Scalar(operator.mul, self, other)
+        return self.__matmul__(other)
+
+    def __rmul__(self, other: object) -> LazyMatrix:
+        if isinstance(other, (int, float)):
+            return Scalar(operator.mul, self, other)
+        return self.__rmatmul__(other)
+
+    def __matmul__(self, other: object) -> LazyMatrix:
+        return MatMulChain(self, _wrap(other, "*"))
+
+    def __rmatmul__(self, other: object) -> LazyMatrix:
+        return MatMulChain(_wrap(other, "*"), self)
+
+    def __neg__(self) -> LazyMatrix:
+        return Unary(operator.neg, self)
+
+    def __eq__(self, other: object) -> bool:
+        """Check if the result of the expression equals to other."""
+        if isinstance(other, LazyMatrix):
+            other = other.evaluate()
+        return self.evaluate() == other
+
+    def _elementwise(
+        self,
+        other: object,
+        operation: Operation,
+        sign: str,
+    ) -> LazyMatrix:
+        """Build node of an elementwise operation with other.
+
+        Raises:
+            ValueError: If the matrices have different sizes.
+        """
+        right = _wrap(other, sign)
+        if self.size != right.size:
+            raise ValueError("Matrices must have the same size")
+        return Binary(operation, self, right)
+
+
+class Leaf(LazyMatrix):
+    """Matrix used as an operand of an expression."""
+
+    __slots__ = ("matrix",)
+
+    def __init__(self, matrix: Matrix) -> None:
+        super().__init__(matrix.rows_count, matrix.cols_count)
+        self.matrix = matrix
+
+    def evaluate(self) -> Matrix:
+        return _view(self.matrix)
+
+    def _values(self) -> Iterator[int | float]:
+        return iter(self.matrix._flat())
+
+    def _sources(self) -> list[Buffer]:
+        return [self.matrix._buffer]
+
+
+class Binary(LazyMatrix):
+    """Elementwise operation of two expressions."""
+
+    __slots__ = ("operation", "left", "right")
+
+    def __init__(
+        self,
+        operation: Operation,
+        left: LazyMatrix,
+        right: LazyMatrix,
+    ) -> None:
+        super().__init__(left.rows_count, left.cols_count)
+        self.operation = operation
+        self.left = left
+        self.right = right
+
+    def _values(self) -> Iterator[int | float]:
+        return map(self.operation, self.left._values(), self.right._values())
+
+    def _sources(self) -> list[Buffer]:
+        return self.left._sources() + self.right._sources()
+
+
+class Scalar(LazyMatrix):
+    """Elementwise operation of an expression and a scalar."""
+
+    __slots__ = ("operation", "operand", "scalar")
+
+    def __init__(
+        self,
+        operation: Operation,
+        operand: LazyMatrix,
+        scalar: int | float,
+    ) -> None:
+        super().__init__(operand.rows_count, operand.cols_count)
+        self.operation = operation
+        self.operand = operand
+        self.scalar = scalar
+
+    def _values(self) -> Iterator[int | float]:
+        return map(self.operation, self.operand._values(), repeat(self.scalar))
+
+    def _sources(self) -> list[Buffer]:
+        return self.operand._sources()
+
+
+class Unary(LazyMatrix):
+    """Elementwise operation of one expression."""
+
+    __slots__ = ("operation", "operand")
+
+    def __init__(
+        self,
+        operation: Callable[[int | float], int | float],
+        operand: LazyMatrix,
+    ) -> None:
+        super().__init__(operand.rows_count, operand.cols_count)
+        self.operation = operation
+        self.operand = operand
+
+    def _values(self) -> Iterator[int | float]:
+        return map(self.operation, self.operand._values())
+
+    def _sources(self) -> list[Buffer]:
+        return self.operand._sources()
+
+
+class MatMulChain(LazyMatrix):
+    """Product of a chain of expressions."""
+
+    __slots__ = ("operands",)
+
+    def __init__(self, left: LazyMatrix, right: LazyMatrix) -> None:
+        """Build product of two expressions, merging nested chains.
+
+        Raises:
+            ValueError: If the cols are not equal rows
+        """
+        if left.cols_count != right.rows_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        super().__init__(left.rows_count, right.cols_count)
+        self.operands: list[LazyMatrix] = [
+            operand
+            for node in (left, right)
+            for operand in (
+                node.operands if isinstance(node, MatMulChain) else [node]
+            )
+        ]
+
+    def evaluate(self) -> Matrix:
+        if self._result is None:
+            matrices = [operand.evaluate() for operand in self.operands]
+            split = chain_order(
+                [matrices[0].rows_count]
+                + [matrix.cols_count for matrix in matrices],
+            )
+            self._result = _multiply(matrices, split, 0, len(matrices) - 1)
+        return _view(self._result)
+
+    def _values(self) -> Iterator[int | float]:
+        return iter(self.evaluate()._flat())
+
+    def _sources(self) -> list[Buffer]:
+        return [self.evaluate()._buffer]
+
+
+def lazy(matrix: Matrix) -> LazyMatrix:
+    """Start a lazy expression with the matrix.
+
+    Example:
+        ``((lazy(a) + b) * 2 - c).evaluate()`` computes the result in
+        one pass, without intermediate matrices.
+
+    Returns:
+        LazyMatrix: Expression of the matrix itself.
+    """
+    return Leaf(matrix)
+
+
+def chain_order(dims: list[int]) -> list[list[int]]:
+    """Find the cheapest order of multiplication of a matrix chain.
+
+    Args:
+        dims: Sizes of the chain, matrix ``i`` is ``dims[i] x dims[i + 1]``.
+
+    Returns:
+        list: Table of splits, ``split[i][j]`` is the last matrix of the
+            left part in the optimal product of matrices ``i..j``.
+    """
+    count = len(dims) - 1
+    cost = [[0.0] * count for _ in range(count)]
+    split = [[0] * count for _ in range(count)]
+    for length in range(1, count):
+        for i in range(count - length):
+            j = i + length
+            cost[i][j] = math.inf
+            for k in range(i, j):
+                current = (
+                    cost[i][k] + cost[k + 1][j]
+                    + dims[i] * dims[k + 1] * dims[j + 1]
+                )
+                if current < cost[i][j]:
+                    cost[i][j], split[i][j] = current, k
+    return split
+
+
+def _multiply(
+    matrices: list[Matrix],
+    split: list[list[int]],
+    first: int,
+    last: int,
+) -> Matrix:
+    """Multiply matrices ``first..last`` in the order from the split."""
+    if first == last:
+        return matrices[first]
+    middle = split[first][last]
+    return (
+        _multiply(matrices, split, first, middle)
+        @ _multiply(matrices, split, middle + 1, last)
+    )
+
+
+def _view(matrix: Matrix) -> Matrix:
+    """Return a copy-on-write view of the whole matrix."""
+    return matrix._view(matrix._offset, matrix._strides, *matrix.size)
+
+
+def _wrap(operand: object, sign: str) -> LazyMatrix:
+    """Turn the operand into an expression.
+
+    Raises:
+        ValueError: If the operand is not a matrix.
+    """
+    if isinstance(operand, LazyMatrix):
+        return operand
+    if isinstance(operand, Matrix):
+        return Leaf(operand)
+    raise ValueError(
+        f"Unsupported operand for {sign}: "
+        f"'LazyMatrix' and '{type(operand)}'",
+    )
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import operator
+from collections.abc import Sequence
+from itertools import repeat
+
+from camp.matrix_task.kernels import float_dot
+
+
+class LU:
+    """LU factorization with partial pivoting, ``P @ A = L @ U``.
+
+    Both factors are kept in one flat row-major list of size ``n * n``:
+    ``U`` is the upper triangle with the diagonal, ``L`` is the strict
+    lower triangle (its diagonal is all ones and not stored).
+    """
+
+    __slots__ = ("factors", "pivots", "sign", "size", "singular")
+
+    def __init__(self, values: list[float], size: int) -> None:
+        """Factorize the matrix in place.
+
+        Args:
+            values: Flat row-major values of a square matrix. The list is
+                overwritten with the factors.
+            size: Number of rows (and columns) of the matrix.
+        """
+        self.factors = values
+        self.size = size
+        # Row ``i`` of ``P @ A`` is the row ``pivots[i]`` of ``A``.
+        self.pivots = list(range(size))
+        self.sign = 1
+        self.singular = False
+        for k in range(size):
+            self._eliminate(k)
+
+    def _eliminate(self, k: int) -> None:
+        """Eliminate the column ``k`` below the diagonal."""
+        values, size = self.factors, self.size
+        pivot_row = max(
+            range(k, size),
+            key=lambda row: abs(values[row * size + k]),
+        )
+        if values[pivot_row * size + k] == 0:
+            self.singular = True
+            return
+        if pivot_row != k:
+            top, bottom = k * size, pivot_row * size
+            values[top:top + size], values[bottom:bottom + size] = (
+                values[bottom:bottom + size],
+                values[top:top + size],
+            )
+            self.pivots[k], self.pivots[pivot_row] = (
+                self.pivots[pivot_row],
+                self.pivots[k],
+            )
+            self.sign = -self.sign
+        pivot = values[k * size + k]
+        rest = values[k * size + k + 1:(k + 1) * size]
+        for row in range(k + 1, size):
+            start = row * size + k
+            factor = values[start] / pivot
+            values[start] = factor
+            if factor:
+                values[start + 1:(row + 1) * size] = map(
+                    operator.sub,
+                    values[start + 1:(row + 1) * size],
+                    map(operator.mul, repeat(factor), rest),
+                )
+
+    def det(self) -> float:
+        """Return the determinant of the factorized matrix."""
+        if self.singular:
+            return 0.0
+        result = float(self.sign)
+        for k in range(self.size):
+            result *= self.factors[k * (self.size + 1)]
+        return result
+
+    def solve(self, rhs: Sequence[int | float]) -> list[float]:
+        """Solve ``A @ x = rhs`` in ``O(n ** 2)``.
+
+        Raises:
+            ValueError: If the matrix is singular.
+
+        Returns:
+            list[float]: The solution ``x``.
+        """
+        if self.singular:
+            raise ValueError("Matrix is singular")
+        values, size = self.factors, self.size
+        solution = [float(rhs[row]) for row in self.pivots]
+        for row in range(1, size):
+            start = row * size
+            solution[row] -= float_dot(
+                values[start:start + row],
+                solution[:row],
+            )
+        for row in reversed(range(size)):
+            start = row * size
+            solution[row] = (
+                solution[row]
+                - float_dot(
+                    values[start + row + 1:start + size],
+                    solution[row + 1:],
+                )
+            ) / values[start + row]
+        return solution
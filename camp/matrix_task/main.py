@@ -1,12 +1,76 @@
 from __future__ import annotations
 
-from typing import TypeAlias
+import operator
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from itertools import repeat
+from pathlib import Path
+from typing import (
+    NoReturn,
+    Self,
+    SupportsIndex,
+    TypeAlias,
+    TypeVar,
+    overload,
+)
+
+from camp.matrix_task import binary_format, kernels, parallel, product_cache
+from camp.matrix_task.linalg import LU
+from camp.matrix_task.storage import (
+    FLOAT64,
+    INT64,
+    TYPECODES,
+    Buffer,
+    allocate,
+    assign,
+    convert,
+    dtype_of,
+    pack,
+    pack_as,
+    pack_rows,
+    result_typecode,
+    same_values,
+    typecode_for,
+    typecode_of,
+)
 
 Matrix_data: TypeAlias = list[list[int | float]]
+T = TypeVar("T")
+
+# Number of elements updated at once by the in-place operations.
+UPDATE_BLOCK_SIZE = 4096
 
 
 class Matrix:
-    """Represent a mathematical matrix."""
+    """Represent a mathematical matrix.
+
+    Values are kept in one flat row-major buffer (see ``storage.pack``)
+    instead of a list of boxed rows. Element ``(i, j)`` lives at
+    ``offset + i * strides[0] + j * strides[1]``.
+
+    Transposition and slicing (``m[1:3, :]``) return views sharing the
+    buffer with the matrix. The buffer is copied when the matrix or one
+    of its views is changed in place (copy on write).
+    """
+
+    # Types built on top of matrices (e.g. lazy expressions) set a higher
+    # priority to take over the operations mixing them with matrices.
+    __matrix_priority__ = 0
+
+    __slots__ = (
+        "_buffer",
+        "_offset",
+        "_strides",
+        "_shared",
+        "_power_cache",
+        "_scratch",
+        "_lu",
+        "_fingerprint",
+        "rows_count",
+        "cols_count",
+    )
 
     def __init__(
         self,
@@ -19,9 +83,449 @@ class Matrix:
             rows (int): The number of rows in the matrix.
             cols (int): The number of columns in the matrix.
         """
-        self.data = data
-        self.rows_count = len(data)
-        self.cols_count = len(data[0])
+        self._power_cache: dict[int, Matrix] | None = None
+        self._scratch: Buffer | None = None
+        self._lu: LU | None = None
+        self._fingerprint: int | None = None
+        self._set_data(data)
+
+    @classmethod
+    def _from_buffer(
+        cls: type[Self],
+        buffer: Buffer,
+        rows_count: int,
+        cols_count: int,
+    ) -> Self:
+        """Create a matrix over an already packed row-major buffer."""
+        matrix = cls.__new__(cls)
+        matrix._power_cache = None
+        matrix._scratch = None
+        matrix._lu = None
+        matrix._set_buffer(buffer, rows_count, cols_count)
+        return matrix
+
+    def _set_buffer(
+        self,
+        buffer: Buffer,
+        rows_count: int,
+        cols_count: int,
+    ) -> None:
+        self._buffer = buffer
+        self._offset = 0
+        self._strides = (cols_count, 1)
+        self._shared = False
+        self.rows_count = rows_count
+        self.cols_count = cols_count
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Drop values computed from the previous content of the matrix."""
+        if self._power_cache:
+            self._power_cache.clear()
+        self._lu = None
+        self._fingerprint = None
+
+    def _view(
+        self,
+        offset: int,
+        strides: tuple[int, int],
+        rows_count: int,
+        cols_count: int,
+    ) -> Matrix:
+        """Create a matrix sharing the buffer with this one."""
+        view = Matrix._from_buffer(self._buffer, rows_count, cols_count)
+        view._offset, view._strides = offset, strides
+        view._shared = self._shared = True
+        return view
+
+    def _is_contiguous(self) -> bool:
+        """Check if the buffer holds exactly the matrix in row-major order."""
+        return (
+            self._offset == 0
+            and self._strides == (self.cols_count, 1)
+            and len(self._buffer) == self.rows_count * self.cols_count
+        )
+
+    def _flat(self) -> Buffer:
+        """Return values of the matrix in row-major order.
+
+        That's the buffer itself unless the matrix is a strided view,
+        which gets gathered into a new buffer.
+        """
+        if self._is_contiguous():
+            return self._buffer
+        flat = allocate(0, typecode_of(self._buffer))
+        for row in self._rows():
+            flat.extend(row)
+        return flat
+
+    def _copy(self) -> Matrix:
+        """Return a copy of the matrix with its own buffer."""
+        flat = self._flat()
+        return Matrix._from_buffer(
+            flat[:] if flat is self._buffer else flat,
+            self.rows_count,
+            self.cols_count,
+        )
+
+    def _own(self) -> None:
+        """Copy the buffer before writing to it, if it's shared."""
+        if self._shared:
+            self._buffer = self._copy()._buffer
+            self._offset = 0
+            self._strides = (self.cols_count, 1)
+            self._shared = False
+
+    def cache_powers(self, enabled: bool = True) -> None:
+        """Turn caching of the computed powers of the matrix on or off.
+
+        When it's on, the squares ``A**2, A**4, ...`` computed by ``**``
+        are kept, so raising the matrix to many different powers reuses
+        them. The cache is cleared when the matrix is changed in place.
+        """
+        self._power_cache = {} if enabled else None
+
+    @property
+    def data(self) -> Matrix_data:
+        """Return the matrix as a list of rows.
+
+        The rows are built from the flat buffer on each access, so use
+        ``m[i, j]`` to get or set a single element. Values set by
+        ``m.data[i][j] = value`` or ``m.data[i] = row`` are written to the
+        matrix, but the rows can't be resized. Copies of the rows are
+        plain lists.
+        """
+        return _DataRows(
+            (
+                _DataRow(row, self, index)
+                for index, row in enumerate(self._rows())
+            ),
+            self,
+        )
+
+    @data.setter
+    def data(self, data: Matrix_data) -> None:
+        self._set_data(data)
+
+    def _set_data(self, data: Iterable[Iterable[int | float]]) -> None:
+        """Set content of the matrix from rows.
+
+        Raises:
+            ValueError: If the rows have different lengths.
+        """
+        self._set_buffer(*pack_rows(data))
+
+    @classmethod
+    def zeros(
+        cls: type[Matrix],
+        rows_count: int,
+        cols_count: int,
+        dtype: str = INT64,
+    ) -> Matrix:
+        """Create a zero matrix.
+
+        Args:
+            rows_count (int): Number of rows.
+            cols_count (int): Number of columns.
+            dtype (str): ``int64``, ``float64`` or ``object``.
+
+        Raises:
+            ValueError: If the dtype is unknown.
+
+        Returns:
+            Matrix: The zero matrix.
+        """
+        return cls._from_buffer(
+            allocate(rows_count * cols_count, typecode_for(dtype)),
+            rows_count,
+            cols_count,
+        )
+
+    @classmethod
+    def identity(cls: type[Matrix], size: int, dtype: str = INT64) -> Matrix:
+        """Create an identity matrix.
+
+        Args:
+            size (int): Number of rows and columns.
+            dtype (str): ``int64``, ``float64`` or ``object``.
+
+        Raises:
+            ValueError: If the dtype is unknown.
+
+        Returns:
+            Matrix: The identity matrix.
+        """
+        matrix = cls.zeros(size, size, dtype)
+        matrix._buffer[::size + 1] = convert(repeat(1, size), dtype)
+        return matrix
+
+    @classmethod
+    def from_flat(
+        cls: type[Matrix],
+        values: Iterable[int | float],
+        shape: tuple[int, int],
+    ) -> Matrix:
+        """Create a matrix from values in row-major order.
+
+        An ``array`` of int64 or float64 values is used as the buffer of
+        the matrix as is, without copying. It's shared with the caller,
+        so it's copied on the first change of the matrix in place, and
+        it should not be changed later.
+
+        Args:
+            values (Iterable): Values of the matrix.
+            shape (tuple[int, int]): Number of rows and columns.
+
+        Raises:
+            ValueError: If the number of values does not match the shape.
+
+        Returns:
+            Matrix: The matrix.
+        """
+        rows_count, cols_count = shape
+        buffer = (
+            values
+            if isinstance(values, array)
+            and values.typecode in TYPECODES.values()
+            else pack(values)
+        )
+        if len(buffer) != rows_count * cols_count or min(shape) < 0:
+            raise ValueError(
+                f"Cannot make a {rows_count}x{cols_count} matrix "
+                f"of {len(buffer)} values",
+            )
+        matrix = cls._from_buffer(buffer, rows_count, cols_count)
+        matrix._shared = buffer is values
+        return matrix
+
+    @classmethod
+    def from_iterable(
+        cls: type[Matrix],
+        rows: Iterable[Iterable[int | float]],
+    ) -> Matrix:
+        """Create a matrix from rows given by any iterables.
+
+        The rows are read one by one right into the buffer of the matrix.
+
+        Raises:
+            ValueError: If the rows have different lengths.
+
+        Returns:
+            Matrix: The matrix.
+        """
+        return cls._from_buffer(*pack_rows(rows))
+
+    def to_bytes(self) -> bytes:
+        """Serialize the matrix to the binary format.
+
+        The format is a small header with the size and dtype followed by
+        raw little-endian values (see ``binary_format``), the same as in
+        files of ``MappedMatrix``.
+
+        Raises:
+            ValueError: If the values are not int64 or float64 ones.
+
+        Returns:
+            bytes: The serialized matrix.
+        """
+        header = binary_format.pack_header(
+            typecode_of(self._buffer) or "",
+            *self.size,
+        )
+        with self._payload() as payload:
+            return header + payload
+
+    def save(self, path: str | Path) -> None:
+        """Save the matrix to a file in the binary format.
+
+        Raises:
+            ValueError: If the values are not int64 or float64 ones.
+        """
+        header = binary_format.pack_header(
+            typecode_of(self._buffer) or "",
+            *self.size,
+        )
+        with Path(path).open("wb") as file, self._payload() as payload:
+            file.write(header)
+            file.write(payload)
+
+    def _payload(self) -> memoryview:
+        """Return little-endian values of the matrix as raw bytes."""
+        flat = self._flat()
+        if sys.byteorder == "big":
+            flat = flat[:]
+            binary_format.swap_byte_order(flat)  # type: ignore[arg-type]
+        return memoryview(flat).cast("B")  # type: ignore[arg-type]
+
+    @classmethod
+    def from_bytes(
+        cls: type[Matrix],
+        data: bytes | bytearray | memoryview,
+    ) -> Matrix:
+        """Deserialize the matrix from the binary format.
+
+        The values are not parsed, they are copied from a view of the data
+        into the buffer at once. Use ``MappedMatrix`` to work with a file
+        without loading it.
+
+        Raises:
+            ValueError: If the data is not a serialized matrix.
+
+        Returns:
+            Matrix: The matrix.
+        """
+        typecode, rows_count, cols_count = binary_format.unpack_header(data)
+        start = binary_format.HEADER.size
+        stop = start + binary_format.payload_size(
+            typecode,
+            rows_count,
+            cols_count,
+        )
+        if len(data) < stop:
+            raise ValueError("Data is too short for the matrix")
+        buffer = array(typecode)
+        with memoryview(data) as view, view[start:stop] as payload:
+            buffer.frombytes(payload)
+        binary_format.swap_byte_order(buffer)
+        return cls._from_buffer(buffer, rows_count, cols_count)
+
+    @classmethod
+    def load(cls: type[Matrix], path: str | Path) -> Matrix:
+        """Load the matrix saved by ``save``.
+
+        The values are read from the file right into the buffer.
+
+        Raises:
+            ValueError: If the file is not a serialized matrix.
+
+        Returns:
+            Matrix: The matrix.
+        """
+        with Path(path).open("rb") as file:
+            typecode, rows_count, cols_count = binary_format.unpack_header(
+                file.read(binary_format.HEADER.size),
+            )
+            buffer = array(typecode, [0]) * (rows_count * cols_count)
+            with memoryview(buffer) as view, view.cast("B") as payload:
+                if file.readinto(payload) < payload.nbytes:
+                    raise ValueError("Data is too short for the matrix")
+        binary_format.swap_byte_order(buffer)
+        return cls._from_buffer(buffer, rows_count, cols_count)
+
+    def _rows(self) -> Iterator[Buffer]:
+        """Iterate over the rows of the matrix as buffer slices."""
+        row_stride, col_stride = self._strides
+        length = (self.cols_count - 1) * col_stride + 1
+        for row in range(self.rows_count):
+            start = self._offset + row * row_stride
+            yield self._buffer[start:start + length:col_stride]
+
+    def _columns(self) -> list[Buffer]:
+        """Return the columns of the matrix as buffer slices.
+
+        This is the transposition of the matrix done once, with strided
+        slicing of the buffer.
+        """
+        row_stride, col_stride = self._strides
+        length = (self.rows_count - 1) * row_stride + 1
+        columns = []
+        for col in range(self.cols_count):
+            start = self._offset + col * col_stride
+            columns.append(self._buffer[start:start + length:row_stride])
+        return columns
+
+    def _elementwise(
+        self,
+        other: Matrix | int | float,
+        operation: Callable[[int | float, int | float], int | float],
+    ) -> Matrix:
+        """Apply the operation to each element and a matrix or scalar.
+
+        Big matrices are processed in parallel, if it's turned on.
+        """
+        flat = self._flat()
+        operand = other._flat() if isinstance(other, Matrix) else other
+        values = None
+        if parallel.accepts(len(flat), flat, operand):
+            values = parallel.elementwise(operation, flat, operand)
+        if values is None:
+            operands = (
+                operand
+                if not isinstance(operand, (int, float))
+                else repeat(operand)
+            )
+            sources = [self._buffer]
+            if isinstance(other, Matrix):
+                sources.append(other._buffer)
+            values = pack_as(list(map(operation, flat, operands)), *sources)
+        return Matrix._from_buffer(values, self.rows_count, self.cols_count)
+
+    def _update(
+        self,
+        operation: Callable[[int | float, int | float], int | float],
+        operand: Buffer | int | float,
+    ) -> None:
+        """Apply the operation to each element of the matrix in place.
+
+        Values are computed by ``map`` and written back by slices of
+        ``UPDATE_BLOCK_SIZE`` elements, so there is no Python loop per
+        element. The buffer is widened only if a block does not fit it.
+
+        Args:
+            operation: Operation of the element and the operand.
+            operand: Flat values of the other matrix or a scalar.
+        """
+        self._own()
+        buffer = self._buffer
+        for start in range(0, len(buffer), UPDATE_BLOCK_SIZE):
+            stop = start + UPDATE_BLOCK_SIZE
+            operands = (
+                repeat(operand)
+                if isinstance(operand, (int, float))
+                else operand[start:stop]
+            )
+            values = list(map(operation, buffer[start:stop], operands))
+            buffer = assign(buffer, start, values)
+        self._buffer = buffer
+        self._invalidate()
+
+    def _defers_to(self, other: object) -> bool:
+        """Check if the operation should be left to the other operand."""
+        return (
+            getattr(other, "__matrix_priority__", 0)
+            > self.__matrix_priority__
+        )
+
+    def _check_operand(self, other: object, sign: str) -> Matrix:
+        """Check that other is a matrix of the same size.
+
+        Raises:
+            ValueError: If the other is not a matrix.
+            ValueError: If the matrices have different sizes.
+        """
+        if not isinstance(other, Matrix):
+            raise ValueError(
+                f"Unsupported operand for {sign}: "
+                f"'Matrix' and '{type(other)}'",
+            )
+        if self.size != other.size:
+            raise ValueError("Matrices must have the same size")
+        return other
+
+    def _check_aligned(self, other: object) -> Matrix:
+        """Check that other is a matrix that can be multiplied by.
+
+        Raises:
+            ValueError: If the other is not a matrix.
+            ValueError: If the cols are not equal rows
+        """
+        if not isinstance(other, Matrix):
+            raise ValueError(
+                f"Unsupported operand for *: 'Matrix' and '{type(other)}'",
+            )
+        if self.cols_count != other.rows_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        return other
 
     @property
     def size(self) -> tuple[int, int]:
@@ -32,6 +536,34 @@ class Matrix:
         """
         return self.rows_count, self.cols_count
 
+    @property
+    def dtype(self) -> str:
+        """Return type of the values of the matrix.
+
+        It's ``int64`` or ``float64`` for values kept in an ``array``, and
+        ``object`` for python numbers, e.g. big integers. Operations keep
+        ``object`` dtype, so integer arithmetic stays exact.
+        """
+        return dtype_of(self._buffer)
+
+    def astype(self, dtype: str) -> Matrix:
+        """Return a copy of the matrix with values of the dtype.
+
+        Args:
+            dtype (str): ``int64``, ``float64`` or ``object``.
+
+        Raises:
+            ValueError: If the dtype is unknown or the values do not fit it.
+
+        Returns:
+            Matrix: The converted matrix.
+        """
+        return Matrix._from_buffer(
+            convert(self._flat(), dtype),
+            self.rows_count,
+            self.cols_count,
+        )
+
     def __add__(self, other: object) -> Matrix:
         """Sum two matrices.
 
@@ -44,19 +576,10 @@ class Matrix:
         Returns:
             Matrix: The sum of two matrix.
         """
-        if not isinstance(other, Matrix):
-            raise ValueError(
-                f"Unsupported operand for +: 'Matrix' and '{type(other)}'",
-            )
-        return Matrix(
-            [
-                [
-                    self.data[i][j] + other.data[i][j]
-                    for j in range(self.cols_count)
-                ]
-                for i in range(self.rows_count)
-            ],
-        )
+        if self._defers_to(other):
+            return NotImplemented
+        matrix = self._check_operand(other, "+")
+        return self._elementwise(matrix, operator.add)
 
     def __iadd__(self, other: object) -> Matrix:
         """Implement the += operator for matrices.
@@ -64,8 +587,10 @@ class Matrix:
         Returns:
             Self: The updated matrix.
         """
-        new_matrix = self.__add__(other)
-        self.data = new_matrix.data
+        if self._defers_to(other):
+            return NotImplemented
+        matrix = self._check_operand(other, "+")
+        self._update(operator.add, matrix._flat())
         return self
 
     def __sub__(self, other: object) -> Matrix:
@@ -80,19 +605,10 @@ class Matrix:
         Returns:
             Matrix: The result of the subtraction.
         """
-        if not isinstance(other, Matrix):
-            raise ValueError(
-                f"Unsupported operand for -: 'Matrix' and '{type(other)}'",
-            )
-        return Matrix(
-            [
-                [
-                    self.data[i][j] - other.data[i][j]
-                    for j in range(self.cols_count)
-                ]
-                for i in range(self.rows_count)
-            ],
-        )
+        if self._defers_to(other):
+            return NotImplemented
+        matrix = self._check_operand(other, "-")
+        return self._elementwise(matrix, operator.sub)
 
     def __isub__(self, other: object) -> Matrix:
         """Implement the -= operator for matrices.
@@ -100,8 +616,10 @@ class Matrix:
         Returns:
             Self: The updated matrix.
         """
-        new_matrix = self.__sub__(other)
-        self.data = new_matrix.data
+        if self._defers_to(other):
+            return NotImplemented
+        matrix = self._check_operand(other, "-")
+        self._update(operator.sub, matrix._flat())
         return self
 
     def __mul__(self, other: object) -> Matrix:
@@ -116,13 +634,10 @@ class Matrix:
         Returns:
             Matrix: The result of multiplication
         """
+        if self._defers_to(other):
+            return NotImplemented
         if isinstance(other, (int, float)):
-            return Matrix(
-                [
-                    [self.data[i][j] * other for j in range(self.cols_count)]
-                    for i in range(self.rows_count)
-                ],
-            )
+            return self._elementwise(other, operator.mul)
         if isinstance(other, Matrix):
             return self.__matmul__(other)
         raise ValueError(
@@ -134,10 +649,16 @@ class Matrix:
         return self.__mul__(other)
 
     def __imul__(self, other: object) -> Matrix:
-        """Implement the *= operator for matrices."""
-        new_matrix = self.__mul__(other)
-        self.data = new_matrix.data
-        return self
+        """Implement the *= operator for matrices.
+
+        Multiplication by a scalar is done in place.
+        """
+        if self._defers_to(other):
+            return NotImplemented
+        if isinstance(other, (int, float)):
+            self._update(operator.mul, other)
+            return self
+        return self.__imatmul__(other)
 
     def __matmul__(self, other: object) -> Matrix:
         """Multiply two matrices.
@@ -152,58 +673,274 @@ class Matrix:
         Returns:
             Matrix: The result of the multiplication.
         """
-        if not isinstance(other, Matrix):
-            raise ValueError(
-                f"Unsupported operand for *: 'Matrix' and '{type(other)}'",
+        if self._defers_to(other):
+            return NotImplemented
+        matrix = self._check_aligned(other)
+        return product_cache.memoize(
+            "@",
+            (self, matrix),
+            lambda: Matrix._from_buffer(
+                pack_as(self._product(matrix), self._buffer, matrix._buffer),
+                self.rows_count,
+                matrix.cols_count,
+            ),
+        )
+
+    def _product(self, other: Matrix) -> Buffer:
+        """Compute values of the product with the best suited kernel.
+
+        Big matrices are multiplied in parallel, if it's turned on. Big
+        square matrices are multiplied by Strassen algorithm, others by
+        the blocked kernel.
+
+        Rows of this matrix and columns of the other one are gathered
+        into new buffers first, so each operand is copied once, e.g. for
+        ``m.transpose() @ m``. That's ``O(n ** 2)`` against ``O(n ** 3)``
+        of the product, and dot products of the gathered buffers are
+        faster than ones of strided ``memoryview`` windows.
+        """
+        shape = (*self.size, other.cols_count)
+        if parallel.accepts(
+            self.rows_count * self.cols_count * other.cols_count,
+            self._buffer,
+            other._buffer,
+        ):
+            values = parallel.matmul(self._flat(), other._flat(), shape)
+            if values is not None:
+                return values
+        if kernels.use_strassen(*shape):
+            return kernels.strassen(
+                self._flat(),
+                other._flat(),
+                self.rows_count,
             )
-        if self.cols_count != other.rows_count:
-            raise ValueError("Matrices are not aligned for multiplication")
-        result = [
-            [
-                sum(
-                    self.data[i][k] * other.data[k][j]
-                    for k in range(self.cols_count)
-                )
-                for j in range(other.cols_count)
-            ]
-            for i in range(self.rows_count)
-        ]
-        return Matrix(result)
+        return kernels.matmul(list(self._rows()), other._columns())
 
     def __rmatmul__(self, other: Matrix) -> Matrix:
         """Implement the right matrix multiplication."""
         return other.__matmul__(self)
 
     def __imatmul__(self, other: object) -> Matrix:
-        """Implement the @= operator for matrices."""
-        result = self.__matmul__(other)
-        self.data = result.data
-        self.cols_count = len(result.data[0])
+        """Implement the @= operator for matrices.
+
+        The product is written into a scratch buffer kept by the matrix,
+        which then swaps with the current one. So repeated ``@=`` with the
+        same shapes does not allocate new buffers. A shared buffer is not
+        reused as the scratch one.
+        """
+        if self._defers_to(other):
+            return NotImplemented
+        matrix = self._check_aligned(other)
+        if kernels.use_strassen(*self.size, matrix.cols_count):
+            self._set_buffer(
+                pack_as(self._product(matrix), self._buffer, matrix._buffer),
+                self.rows_count,
+                matrix.cols_count,
+            )
+            return self
+        rows, cols = list(self._rows()), matrix._columns()
+        size = self.rows_count * matrix.cols_count
+        typecode = result_typecode(self._buffer, matrix._buffer)
+        scratch = self._scratch
+        if (
+            scratch is None
+            or len(scratch) != size
+            or getattr(scratch, "typecode", None) != typecode
+        ):
+            scratch = allocate(size, typecode)
+        try:
+            kernels.matmul_into(scratch, rows, cols)
+        except (OverflowError, TypeError):
+            scratch = pack_as(
+                kernels.matmul(rows, cols),
+                self._buffer,
+                matrix._buffer,
+            )
+        self._scratch = None if self._shared else self._buffer
+        self._set_buffer(scratch, self.rows_count, matrix.cols_count)
         return self
 
+    def _check_vector(
+        self,
+        vector: Iterable[int | float],
+        length: int,
+    ) -> Buffer:
+        """Pack the vector, checking that it can be multiplied by.
+
+        Raises:
+            ValueError: If the vector has not ``length`` values.
+        """
+        values = pack(vector)
+        if len(values) != length:
+            raise ValueError("Matrix and vector are not aligned")
+        return values
+
+    def matvec(self, vector: Iterable[int | float]) -> Buffer:
+        """Multiply the matrix by a column vector, ``A @ x``.
+
+        Unlike ``@`` with an ``n x 1`` matrix, it computes one dot
+        product per row straight into a flat buffer.
+
+        Args:
+            vector: Values of the vector, as many as columns.
+
+        Raises:
+            ValueError: If the vector has not as many values as columns.
+
+        Returns:
+            Buffer: Values of the product, an ``array`` or a list.
+        """
+        values = self._check_vector(vector, self.cols_count)
+        return pack_as(
+            kernels.matvec(list(self._rows()), values),
+            self._buffer,
+            values,
+        )
+
+    def vecmat(self, vector: Iterable[int | float]) -> Buffer:
+        """Multiply a row vector by the matrix, ``x @ A``.
+
+        Args:
+            vector: Values of the vector, as many as rows.
+
+        Raises:
+            ValueError: If the vector has not as many values as rows.
+
+        Returns:
+            Buffer: Values of the product, an ``array`` or a list.
+        """
+        values = self._check_vector(vector, self.rows_count)
+        return pack_as(
+            kernels.matvec(self._columns(), values),
+            self._buffer,
+            values,
+        )
+
+    def gemv(
+        self,
+        vector: Iterable[int | float],
+        out: Buffer,
+        alpha: int | float = 1,
+        beta: int | float = 0,
+        transpose: bool = False,
+    ) -> Buffer:
+        """Compute ``out = alpha * A @ x + beta * out`` in place.
+
+        The result is written into the given buffer, so iterative methods
+        (e.g. power iteration) can reuse two buffers instead of allocating
+        a new vector each step. With zero ``beta`` the values of ``out``
+        are not read.
+
+        Args:
+            vector: Values of the vector ``x``.
+            out: Buffer for the result, a list or an ``array``.
+            alpha: Factor of the product.
+            beta: Factor of the current values of ``out``.
+            transpose: Use the transposed matrix, ``x @ A`` instead.
+
+        Raises:
+            ValueError: If the vector or ``out`` have wrong lengths.
+            TypeError: If float values are written to an int64 buffer.
+            OverflowError: If the values do not fit the buffer.
+
+        Returns:
+            Buffer: The ``out`` buffer.
+        """
+        rows_count, cols_count = self.size
+        rows = list(self._rows())
+        if transpose:
+            rows_count, cols_count = cols_count, rows_count
+            rows = self._columns()
+        values = self._check_vector(vector, cols_count)
+        if len(out) != rows_count:
+            raise ValueError("Matrix and vector are not aligned")
+        kernels.gemv_into(out, rows, values, alpha, beta)
+        return out
+
     def transpose(self) -> Matrix:
         """Transpose the matrix.
 
         Returns:
-            Matrix: The transposes matrix.
+            Matrix: The transposes matrix, a view sharing the buffer.
         """
-        return Matrix(
-            [
-                [
-                    self.data[j][i] for j in range(self.rows_count)
-                ]
-                for i in range(self.cols_count)
-            ],
+        row_stride, col_stride = self._strides
+        return self._view(
+            self._offset,
+            (col_stride, row_stride),
+            self.cols_count,
+            self.rows_count,
+        )
+
+    @overload
+    def __getitem__(self, key: tuple[int, int]) -> int | float:
+        ...
+
+    @overload
+    def __getitem__(self, key: tuple[int | slice, slice]) -> Matrix:
+        ...
+
+    @overload
+    def __getitem__(self, key: tuple[slice, int]) -> Matrix:
+        ...
+
+    def __getitem__(
+        self,
+        key: tuple[int | slice, int | slice],
+    ) -> Matrix | int | float:
+        """Return an element or a view of a part of the matrix.
+
+        Example:
+            ``m[0, 1]`` is an element, ``m[0, :]`` is the first row,
+            ``m[:, 1]`` is the second column and ``m[1:3, ::2]`` is a
+            window of the matrix. The views share the buffer with the
+            matrix.
+
+        Returns:
+            Matrix | int | float: The element or view.
+        """
+        rows_key, cols_key = key
+        row_start, rows_count, row_step = _window(rows_key, self.rows_count)
+        col_start, cols_count, col_step = _window(cols_key, self.cols_count)
+        row_stride, col_stride = self._strides
+        offset = self._offset + row_start * row_stride + col_start * col_stride
+        if isinstance(rows_key, int) and isinstance(cols_key, int):
+            return self._buffer[offset]
+        return self._view(
+            offset,
+            (row_stride * row_step, col_stride * col_step),
+            rows_count,
+            cols_count,
         )
 
+    def __setitem__(self, key: tuple[int, int], value: int | float) -> None:
+        """Set an element of the matrix, e.g. ``m[0, 1] = 5``.
+
+        Raises:
+            ValueError: If the key is not a pair of indices.
+        """
+        rows_key, cols_key = key
+        if not isinstance(rows_key, int) or not isinstance(cols_key, int):
+            raise ValueError("Only single elements of a matrix can be set")
+        row = _window(rows_key, self.rows_count)[0]
+        col = _window(cols_key, self.cols_count)[0]
+        self._own()
+        row_stride, col_stride = self._strides
+        offset = self._offset + row * row_stride + col * col_stride
+        self._buffer = assign(self._buffer, offset, [value])
+        self._invalidate()
+
     def __pow__(self, power: int) -> Matrix:
         """Raise the matrix to the power.
 
+        Uses exponentiation by squaring, so only ``O(log(power))``
+        multiplications are done.
+
         Args:
             power (int): The power to raise the matrix to.
 
         Raises:
-            ValueError: If the power is negative.
+            ValueError: If the power is negative or the matrix is not
+                square.
 
         Returns:
             Matrix: The result of rising the matrix.
@@ -212,28 +949,210 @@ class Matrix:
             raise ValueError(
                 "Power must be a non-negative integer",
             )
+        if self.rows_count != self.cols_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        return product_cache.memoize(
+            "**",
+            (self, power),
+            lambda: self._power(power),
+        )
+
+    def _power(self, power: int) -> Matrix:
+        """Compute non-negative power of the matrix."""
         if power == 0:
-            return Matrix(
+            return Matrix.identity(self.rows_count, self.dtype)
+        square, exponent = self, 1
+        while not power & 1:
+            square = self._square_power(square, exponent)
+            power, exponent = power >> 1, exponent * 2
+        # The first factor may be the matrix itself or a cached square.
+        result = square._copy()
+        power >>= 1
+        while power:
+            square = self._square_power(square, exponent)
+            exponent *= 2
+            if power & 1:
+                result @= square
+            power >>= 1
+        return result
+
+    def _square_power(self, square: Matrix, exponent: int) -> Matrix:
+        """Return ``self ** (2 * exponent)`` given ``self ** exponent``.
+
+        The result is taken from the power cache, if it's turned on.
+        """
+        if self._power_cache is None:
+            return square @ square
+        cached = self._power_cache.get(2 * exponent)
+        if cached is None:
+            cached = square @ square
+            self._power_cache[2 * exponent] = cached
+        return cached
+
+    def matmul_mod(self, other: object, modulus: int) -> Matrix:
+        """Multiply integer matrices modulo the modulus.
+
+        Each dot product is computed exactly and reduced at once, so the
+        values of the result stay below the modulus.
+
+        Args:
+            other (Matrix): The right matrix.
+            modulus (int): The modulus.
+
+        Raises:
+            ValueError: If the matrices are not aligned or not integer ones,
+                or the modulus is not positive.
+
+        Returns:
+            Matrix: The product with values in ``range(modulus)``.
+        """
+        matrix = self._check_aligned(other)
+        self._check_modular(modulus)
+        matrix._check_modular(modulus)
+        return Matrix._from_buffer(
+            pack(
+                kernels.matmul(
+                    list(self._rows()),
+                    matrix._columns(),
+                    product=kernels.modular_dot(modulus),
+                ),
+            ),
+            self.rows_count,
+            matrix.cols_count,
+        )
+
+    def pow_mod(self, power: int, modulus: int) -> Matrix:
+        """Raise the integer matrix to the power modulo the modulus.
+
+        Uses exponentiation by squaring with ``matmul_mod``, so the values
+        never grow beyond the modulus. E.g. ``Matrix([[1, 1], [1, 0]])``
+        to the power ``n`` holds Fibonacci numbers modulo.
+
+        Args:
+            power (int): The power to raise the matrix to.
+            modulus (int): The modulus.
+
+        Raises:
+            ValueError: If the power is negative, the matrix is not square
+                or not integer one, or the modulus is not positive.
+
+        Returns:
+            Matrix: The result with values in ``range(modulus)``.
+        """
+        if power < 0:
+            raise ValueError("Power must be a non-negative integer")
+        if self.rows_count != self.cols_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        self._check_modular(modulus)
+        size = self.rows_count
+        result = Matrix._from_buffer(
+            pack(
                 [
-                    [
-                        1 if i == j else 0 for j in range(self.rows_count)
-                    ]
-                    for i in range(self.rows_count)
+                    int(i == j) % modulus
+                    for i in range(size)
+                    for j in range(size)
                 ],
-            )
-        result = Matrix(self.data)
-        for _ in range(power - 1):
-            result *= self
+            ),
+            size,
+            size,
+        )
+        square = Matrix._from_buffer(
+            pack([value % modulus for value in self._flat()]),
+            size,
+            size,
+        )
+        while power:
+            if power & 1:
+                result = result.matmul_mod(square, modulus)
+            power >>= 1
+            if power:
+                square = square.matmul_mod(square, modulus)
         return result
 
+    def _check_modular(self, modulus: int) -> None:
+        """Check that modular arithmetic can be done with the matrix.
+
+        Raises:
+            ValueError: If the matrix is a float one or the modulus is not
+                positive.
+        """
+        if modulus < 1:
+            raise ValueError("Modulus must be a positive integer")
+        if self.dtype == FLOAT64:
+            raise ValueError("Modular arithmetic needs integer matrices")
+
+    def lu(self) -> LU:
+        """Return LU factorization of the matrix with partial pivoting.
+
+        The factorization is computed once and kept until the matrix is
+        changed, so ``solve``, ``det`` and ``inverse`` reuse it.
+
+        Raises:
+            ValueError: If the matrix is not square.
+
+        Returns:
+            LU: The factorization.
+        """
+        if self.rows_count != self.cols_count:
+            raise ValueError("Matrix must be square")
+        if self._lu is None:
+            self._lu = LU(list(map(float, self._flat())), self.rows_count)
+        return self._lu
+
+    def solve(self, rhs: Matrix) -> Matrix:
+        """Solve the linear system ``self @ x = rhs``.
+
+        Each column of ``rhs`` costs ``O(n ** 2)`` once the matrix is
+        factorized.
+
+        Args:
+            rhs (Matrix): Right-hand sides of the system as columns.
+
+        Raises:
+            ValueError: If the matrix is singular, not square or has not
+                as many rows as ``rhs``.
+
+        Returns:
+            Matrix: Solutions of the system as columns.
+        """
+        if rhs.rows_count != self.rows_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        factorization = self.lu()
+        solutions = [factorization.solve(col) for col in rhs._columns()]
+        return Matrix._from_buffer(
+            pack(
+                [
+                    solution[row]
+                    for row in range(rhs.rows_count)
+                    for solution in solutions
+                ],
+            ),
+            rhs.rows_count,
+            rhs.cols_count,
+        )
+
+    def det(self) -> float:
+        """Return the determinant of the matrix.
+
+        Raises:
+            ValueError: If the matrix is not square.
+        """
+        return self.lu().det()
+
+    def inverse(self) -> Matrix:
+        """Return the inverse matrix.
+
+        Raises:
+            ValueError: If the matrix is singular or not square.
+        """
+        return self.solve(self ** 0)
+
     def __neg__(self) -> Matrix:
         """Negative the matrix."""
-        return Matrix(
-            [
-                [
-                    -self.data[i][j] for j in range(self.cols_count)
-                ] for i in range(self.rows_count)
-            ],
+        return Matrix._from_buffer(
+            pack_as(list(map(operator.neg, self._flat())), self._buffer),
+            self.rows_count,
+            self.cols_count,
         )
 
     def __eq__(self, other: object) -> bool:
@@ -245,6 +1164,204 @@ class Matrix:
         Returns:
             bool: Return True if the matrices are equal.
         """
-        if isinstance(other, Matrix):
-            return self.data == other.data
-        return False
+        if self._defers_to(other):
+            return NotImplemented
+        if not isinstance(other, Matrix) or self.size != other.size:
+            return False
+        if (
+            self._fingerprint is not None
+            and other._fingerprint is not None
+            and self._fingerprint != other._fingerprint
+        ):
+            return False
+        return same_values(self._flat(), other._flat())
+
+    def fingerprint(self) -> int:
+        """Return hash of the content of the matrix.
+
+        It's computed once and kept until the matrix is changed. Equal
+        matrices have equal fingerprints, even with different dtypes, and
+        ``==`` returns False at once for matrices with known different
+        fingerprints. It's only a hash, not an identity: different
+        matrices may have equal fingerprints, e.g. as ``hash(-1)`` is
+        ``hash(-2)``.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hash((self.size, tuple(self._flat())))
+        return self._fingerprint
+
+    def freeze(self) -> FrozenMatrix:
+        """Return an immutable hashable matrix with the same content.
+
+        The buffer is shared, it's copied when this matrix is changed.
+        """
+        frozen = FrozenMatrix._from_buffer(
+            self._buffer,
+            self.rows_count,
+            self.cols_count,
+        )
+        frozen._offset, frozen._strides = self._offset, self._strides
+        frozen._shared = self._shared = True
+        frozen._fingerprint = self._fingerprint
+        return frozen
+
+
+class FrozenMatrix(Matrix):
+    """Immutable matrix, which can be used as a dict key.
+
+    In-place operators make a new matrix instead (like ``+=`` of a
+    tuple), and ``data`` can't be set. The hash is the fingerprint of the
+    content.
+    """
+
+    __slots__ = ()
+
+    @property
+    def data(self) -> Matrix_data:
+        """Return the matrix as a list of rows."""
+        return super().data
+
+    @data.setter
+    def data(self, data: Matrix_data) -> None:
+        raise AttributeError("FrozenMatrix is immutable")
+
+    def __setitem__(self, key: tuple[int, int], value: int | float) -> None:
+        raise AttributeError("FrozenMatrix is immutable")
+
+    def __iadd__(self, other: object) -> Matrix:
+        return NotImplemented
+
+    def __isub__(self, other: object) -> Matrix:
+        return NotImplemented
+
+    def __imul__(self, other: object) -> Matrix:
+        return NotImplemented
+
+    def __imatmul__(self, other: object) -> Matrix:
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return self.fingerprint()
+
+    def thaw(self) -> Matrix:
+        """Return a mutable copy of the matrix."""
+        return self._copy()
+
+
+class _FixedList(list[T], ABC):
+    """List of values of a matrix, which may be changed but not resized.
+
+    Copies of it are plain lists.
+    """
+
+    __slots__ = ("_matrix",)
+
+    def __init__(self, values: Iterable[T], matrix: Matrix) -> None:
+        super().__init__(values)
+        self._matrix = matrix
+
+    @abstractmethod
+    def _write(self, index: int, value: T) -> None:
+        """Write the value at the index to the matrix."""
+
+    @overload
+    def __setitem__(self, key: SupportsIndex, value: T) -> None:
+        ...
+
+    @overload
+    def __setitem__(self, key: slice, value: Iterable[T]) -> None:
+        ...
+
+    def __setitem__(
+        self,
+        key: SupportsIndex | slice,
+        value: T | Iterable[T],
+    ) -> None:
+        """Set the values, writing them to the matrix.
+
+        Raises:
+            ValueError: If assignment to a slice changes the length.
+        """
+        indices = range(len(self))
+        if isinstance(key, slice):
+            values = list(value)  # type: ignore[arg-type]
+            if len(values) != len(indices[key]):
+                raise ValueError("Rows of a matrix can't be resized")
+            changes = list(zip(indices[key], values))
+        else:
+            changes = [(indices[key], value)]  # type: ignore[list-item]
+        for index, item in changes:
+            self._write(index, item)
+            super().__setitem__(index, self._written(index, item))
+
+    def _written(self, index: int, value: T) -> T:
+        """Return the value kept in the list after writing it."""
+        return value
+
+    def _resize(self, *args: object, **kwargs: object) -> NoReturn:
+        raise TypeError(
+            "Rows of a matrix can't be resized or reordered, "
+            "only their items can be set",
+        )
+
+    append = extend = insert = pop = remove = clear = _resize
+    sort = reverse = __delitem__ = __iadd__ = __imul__ = _resize
+
+    def __reduce__(self) -> tuple[type[list[T]], tuple[list[T]]]:
+        return list, (list(self),)
+
+
+class _DataRow(_FixedList[int | float]):
+    """Row of ``Matrix.data``, setting its items sets the elements."""
+
+    __slots__ = ("_index",)
+
+    def __init__(
+        self,
+        values: Iterable[int | float],
+        matrix: Matrix,
+        index: int,
+    ) -> None:
+        super().__init__(values, matrix)
+        self._index = index
+
+    def _write(self, index: int, value: int | float) -> None:
+        self._matrix[self._index, index] = value
+
+
+class _DataRows(_FixedList[list[int | float]]):
+    """Rows of ``Matrix.data``, setting a row sets its elements."""
+
+    __slots__ = ()
+
+    def _write(self, index: int, value: list[int | float]) -> None:
+        row = list(value)
+        if len(row) != self._matrix.cols_count:
+            raise ValueError("Rows of a matrix can't be resized")
+        for col, item in enumerate(row):
+            self._matrix[index, col] = item
+
+    def _written(
+        self,
+        index: int,
+        value: list[int | float],
+    ) -> list[int | float]:
+        return _DataRow(value, self._matrix, index)
+
+
+def _window(key: int | slice, length: int) -> tuple[int, int, int]:
+    """Convert index or slice of rows (columns) to start, count and step.
+
+    Raises:
+        IndexError: If the index is out of the matrix.
+        ValueError: If the slice has not positive step.
+    """
+    if isinstance(key, int):
+        index = key + length if key < 0 else key
+        if not 0 <= index < length:
+            raise IndexError("Matrix index out of range")
+        return index, 1, 1
+    start, stop, step = key.indices(length)
+    if step < 1:
+        raise ValueError("Only positive slice steps are supported")
+    return start, len(range(start, stop, step)), step
@@ -0,0 +1,472 @@
+from __future__ import annotations
+
+import math
+import mmap
+import operator
+import os
+import sys
+import tempfile
+from array import array
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from itertools import repeat
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from camp.matrix_task import kernels
+from camp.matrix_task.binary_format import (
+    HEADER,
+    pack_header,
+    payload_size,
+    swap_byte_order,
+    unpack_header,
+)
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.storage import (
+    FLOAT_TYPECODE,
+    INT64,
+    INT_TYPECODE,
+    Buffer,
+    allocate,
+    typecode_of,
+)
+
+# Number of values of one block held in memory by the operations.
+BLOCK_ITEMS = 1 << 19
+
+
+class MappedMatrix:
+    """Matrix stored in a memory-mapped binary file.
+
+    The file holds the header (see ``binary_format``) and row-major
+    values. Operations stream the values from and to files in blocks of
+    at most about ``block_items`` values, so memory used by them does not
+    depend on the size of the matrix. Results of the operators are kept
+    in temporary files next to the matrix, which are removed on
+    ``close``.
+
+    It's a class of its own rather than a storage of ``Matrix``, since
+    operations of ``Matrix`` take the values in memory. ``from_matrix``
+    and ``to_matrix`` convert between them.
+
+    Example:
+        ``with MappedMatrix("a.matrix") as a: (a @ a).to_matrix()``
+    """
+
+    block_items = BLOCK_ITEMS
+
+    def __init__(self, path: str | Path, writable: bool = False) -> None:
+        """Open the matrix file.
+
+        Args:
+            path: Path to the file.
+            writable: Open the file for writing too.
+
+        Raises:
+            ValueError: If the file is not a binary matrix.
+        """
+        self.path = Path(path)
+        self._temporary = False
+        self._file = self.path.open("r+b" if writable else "rb")
+        try:
+            self._mmap = mmap.mmap(
+                self._file.fileno(),
+                0,
+                access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ,
+            )
+        except ValueError:
+            self._file.close()
+            raise ValueError(
+                "Data is too short for a matrix header",
+            ) from None
+        try:
+            self.typecode, self.rows_count, self.cols_count = unpack_header(
+                self._mmap[:HEADER.size],
+            )
+            size = payload_size(self.typecode, *self.size)
+            if len(self._mmap) < HEADER.size + size:
+                raise ValueError("File is too short for the matrix")
+        except ValueError:
+            self.close()
+            raise
+        self.itemsize = array(self.typecode).itemsize
+
+    @classmethod
+    def create(
+        cls: type[MappedMatrix],
+        path: str | Path,
+        rows_count: int,
+        cols_count: int,
+        typecode: str = FLOAT_TYPECODE,
+    ) -> MappedMatrix:
+        """Create a file with a zero matrix and open it for writing.
+
+        Args:
+            path: Path to the file, overwritten if it exists.
+            rows_count: Number of rows.
+            cols_count: Number of columns.
+            typecode: ``q`` for int64 values or ``d`` for float64 ones.
+
+        Returns:
+            MappedMatrix: The new matrix.
+        """
+        header = pack_header(typecode, rows_count, cols_count)
+        with Path(path).open("wb") as file:
+            file.write(header)
+            file.truncate(
+                HEADER.size + payload_size(typecode, rows_count, cols_count),
+            )
+        return cls(path, writable=True)
+
+    @classmethod
+    def from_matrix(
+        cls: type[MappedMatrix],
+        matrix: Matrix,
+        path: str | Path,
+    ) -> MappedMatrix:
+        """Write the matrix to a file row by row.
+
+        Raises:
+            ValueError: If the values are not int64 or float64 ones.
+
+        Returns:
+            MappedMatrix: The matrix in the file, open for writing.
+        """
+        mapped = cls.create(
+            path,
+            *matrix.size,
+            typecode_of(matrix._buffer) or "",
+        )
+        for row, values in enumerate(matrix._rows()):
+            mapped._write(row * matrix.cols_count, values)
+        return mapped
+
+    def to_matrix(self) -> Matrix:
+        """Load the whole matrix into memory."""
+        return Matrix._from_buffer(
+            self._read(0, self.rows_count * self.cols_count),
+            self.rows_count,
+            self.cols_count,
+        )
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """Return size of the matrix."""
+        return self.rows_count, self.cols_count
+
+    def close(self) -> None:
+        """Close the file, removing it if it's a temporary result."""
+        self._mmap.close()
+        self._file.close()
+        if self._temporary:
+            self.path.unlink()
+
+    def __enter__(self) -> MappedMatrix:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _read(self, start: int, count: int) -> array[Any]:
+        """Read ``count`` values from the position ``start``."""
+        offset = HEADER.size + start * self.itemsize
+        values = array(self.typecode)
+        values.frombytes(self._mmap[offset:offset + count * self.itemsize])
+        swap_byte_order(values)
+        return values
+
+    def _write(self, start: int, values: Buffer) -> None:
+        """Write values to the position ``start``.
+
+        Raises:
+            TypeError: If float values are written to an int64 matrix.
+            OverflowError: If the values do not fit int64.
+        """
+        converted: array[Any] = (
+            values
+            if isinstance(values, array)
+            and values.typecode == self.typecode
+            and sys.byteorder == "little"
+            else array(self.typecode, values)
+        )
+        swap_byte_order(converted)
+        offset = HEADER.size + start * self.itemsize
+        with memoryview(converted) as view, view.cast("B") as data:
+            self._mmap[offset:offset + data.nbytes] = data
+
+    def _result(
+        self,
+        path: str | Path | None,
+        rows_count: int,
+        cols_count: int,
+        typecode: str,
+    ) -> MappedMatrix:
+        """Create matrix for a result, in a temporary file if no path."""
+        temporary = path is None
+        if path is None:
+            descriptor, path = tempfile.mkstemp(
+                suffix=".matrix",
+                dir=self.path.parent,
+            )
+            os.close(descriptor)
+        result = MappedMatrix.create(path, rows_count, cols_count, typecode)
+        result._temporary = temporary
+        result.block_items = self.block_items
+        return result
+
+    def _block_rows(self, cols_count: int) -> int:
+        """Return number of rows with ``cols_count`` values in a block."""
+        return max(1, self.block_items // max(1, cols_count))
+
+    def _elementwise(
+        self,
+        other: object,
+        operation: Callable[[int | float, int | float], int | float],
+        path: str | Path | None,
+        sign: str,
+    ) -> MappedMatrix:
+        """Apply the operation to each element and a matrix or scalar.
+
+        Raises:
+            ValueError: If other is not a mapped matrix of the same size
+                or a scalar, or the values do not fit int64.
+        """
+        if isinstance(other, MappedMatrix):
+            if self.size != other.size:
+                raise ValueError("Matrices must have the same size")
+            typecodes = {self.typecode, other.typecode}
+        elif isinstance(other, (int, float)):
+            typecodes = {
+                self.typecode,
+                FLOAT_TYPECODE if isinstance(other, float) else INT_TYPECODE,
+            }
+        else:
+            raise ValueError(
+                f"Unsupported operand for {sign}: "
+                f"'MappedMatrix' and '{type(other)}'",
+            )
+        typecode = (
+            FLOAT_TYPECODE if FLOAT_TYPECODE in typecodes else INT_TYPECODE
+        )
+        total = self.rows_count * self.cols_count
+        step = self._block_rows(self.cols_count) * self.cols_count
+        with _filling(self._result(path, *self.size, typecode)) as result:
+            for start in range(0, total, step):
+                count = min(step, total - start)
+                operands = (
+                    other._read(start, count)
+                    if isinstance(other, MappedMatrix)
+                    else repeat(other)
+                )
+                result._write(
+                    start,
+                    array(
+                        typecode,
+                        map(operation, self._read(start, count), operands),
+                    ),
+                )
+        return result
+
+    def add(
+        self,
+        other: MappedMatrix,
+        path: str | Path | None = None,
+    ) -> MappedMatrix:
+        """Add matrices block by block.
+
+        Args:
+            other: Matrix of the same size.
+            path: File for the result, a temporary one if not set.
+
+        Returns:
+            MappedMatrix: The sum.
+        """
+        return self._elementwise(other, operator.add, path, "+")
+
+    def sub(
+        self,
+        other: MappedMatrix,
+        path: str | Path | None = None,
+    ) -> MappedMatrix:
+        """Subtract matrices block by block.
+
+        Args:
+            other: Matrix of the same size.
+            path: File for the result, a temporary one if not set.
+
+        Returns:
+            MappedMatrix: The difference.
+        """
+        return self._elementwise(other, operator.sub, path, "-")
+
+    def mul(
+        self,
+        scalar: int | float,
+        path: str | Path | None = None,
+    ) -> MappedMatrix:
+        """Multiply the matrix by a number block by block.
+
+        Args:
+            scalar: The number.
+            path: File for the result, a temporary one if not set.
+
+        Returns:
+            MappedMatrix: The product.
+        """
+        return self._elementwise(scalar, operator.mul, path, "*")
+
+    def transpose(self, path: str | Path | None = None) -> MappedMatrix:
+        """Transpose the matrix by square tiles.
+
+        Args:
+            path: File for the result, a temporary one if not set.
+
+        Returns:
+            MappedMatrix: The transposed matrix.
+        """
+        rows_count, cols_count = self.size
+        tile = max(1, math.isqrt(self.block_items))
+        with _filling(
+            self._result(path, cols_count, rows_count, self.typecode),
+        ) as result:
+            for row_start in range(0, rows_count, tile):
+                row_stop = min(row_start + tile, rows_count)
+                for col_start in range(0, cols_count, tile):
+                    width = min(tile, cols_count - col_start)
+                    values = array(self.typecode)
+                    for row in range(row_start, row_stop):
+                        start = row * cols_count + col_start
+                        values.extend(self._read(start, width))
+                    for col in range(width):
+                        result._write(
+                            (col_start + col) * rows_count + row_start,
+                            values[col::width],
+                        )
+        return result
+
+    def matmul(
+        self,
+        other: MappedMatrix,
+        path: str | Path | None = None,
+    ) -> MappedMatrix:
+        """Multiply matrices by tiles of the result.
+
+        The right matrix is transposed into a temporary file first, so
+        both operands of a tile are read as contiguous rows.
+
+        Args:
+            other: The right matrix.
+            path: File for the result, a temporary one if not set.
+
+        Raises:
+            ValueError: If the matrices are not aligned or the values do
+                not fit int64.
+
+        Returns:
+            MappedMatrix: The product.
+        """
+        if self.cols_count != other.rows_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        inner, cols_count = other.size
+        typecode = (
+            FLOAT_TYPECODE
+            if FLOAT_TYPECODE in {self.typecode, other.typecode}
+            else INT_TYPECODE
+        )
+        block = min(
+            self._block_rows(2 * inner),
+            max(1, math.isqrt(self.block_items)),
+        )
+        with (
+            _filling(
+                self._result(path, self.rows_count, cols_count, typecode),
+            ) as result,
+            other.transpose() as transposed,
+        ):
+            for row_start in range(0, self.rows_count, block):
+                left = _split(
+                    self._read(
+                        row_start * inner,
+                        min(block, self.rows_count - row_start) * inner,
+                    ),
+                    inner,
+                )
+                for col_start in range(0, cols_count, block):
+                    right = _split(
+                        transposed._read(
+                            col_start * inner,
+                            min(block, cols_count - col_start) * inner,
+                        ),
+                        inner,
+                    )
+                    out = allocate(len(left) * len(right), typecode)
+                    kernels.matmul_into(out, left, right)
+                    for row in range(len(left)):
+                        result._write(
+                            (row_start + row) * cols_count + col_start,
+                            out[row * len(right):(row + 1) * len(right)],
+                        )
+        return result
+
+    def _check_operand(self, other: object, sign: str) -> MappedMatrix:
+        """Check that other is a mapped matrix.
+
+        Raises:
+            ValueError: If other is not a mapped matrix.
+        """
+        if not isinstance(other, MappedMatrix):
+            raise ValueError(
+                f"Unsupported operand for {sign}: "
+                f"'MappedMatrix' and '{type(other)}'",
+            )
+        return other
+
+    def __add__(self, other: object) -> MappedMatrix:
+        return self.add(self._check_operand(other, "+"))
+
+    def __sub__(self, other: object) -> MappedMatrix:
+        return self.sub(self._check_operand(other, "-"))
+
+    def __mul__(self, other: object) -> MappedMatrix:
+        if isinstance(other, MappedMatrix):
+            return self.matmul(other)
+        return self._elementwise(other, operator.mul, None, "*")
+
+    def __rmul__(self, other: object) -> MappedMatrix:
+        return self._elementwise(other, operator.mul, None, "*")
+
+    def __matmul__(self, other: object) -> MappedMatrix:
+        return self.matmul(self._check_operand(other, "*"))
+
+
+@contextmanager
+def _filling(result: MappedMatrix) -> Iterator[MappedMatrix]:
+    """Close and remove the result file if filling it fails.
+
+    Raises:
+        ValueError: If the values do not fit int64.
+    """
+    try:
+        yield result
+    except BaseException as error:
+        result._temporary = True
+        result.close()
+        if isinstance(error, OverflowError):
+            raise ValueError(f"Values do not fit {INT64}") from None
+        raise
+
+
+def _split(values: array[Any], length: int) -> list[array[Any]]:
+    """Split flat values into rows of the length."""
+    if not length:
+        return []
+    return [
+        values[start:start + length]
+        for start in range(0, len(values), length)
+    ]
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import os
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from itertools import repeat
+from multiprocessing.shared_memory import SharedMemory
+from typing import TypeAlias
+
+from camp.matrix_task import kernels
+from camp.matrix_task.storage import (
+    FLOAT_TYPECODE,
+    INT_TYPECODE,
+    Buffer,
+    allocate,
+    result_typecode,
+    typecode_of,
+)
+
+# Operations with less work (multiplications or elements) stay serial.
+PARALLEL_THRESHOLD = 4_000_000
+
+Operation: TypeAlias = Callable[[int | float, int | float], int | float]
+# Name of a shared memory block and typecode of the values in it.
+SharedBuffer: TypeAlias = tuple[str, str]
+
+
+class _Settings:
+    """Settings of the parallel execution mode."""
+
+    workers = 1
+    threshold = PARALLEL_THRESHOLD
+    executor: ProcessPoolExecutor | None = None
+
+
+def configure(
+    workers: int | None = None,
+    threshold: int = PARALLEL_THRESHOLD,
+) -> None:
+    """Turn on parallel execution of big matrix operations.
+
+    Args:
+        workers: Number of worker processes, all cpus by default.
+            Parallel mode is off for 1 worker.
+        threshold: Amount of work (multiplications for matmul, elements
+            for elementwise operations) below which operations stay serial.
+    """
+    shutdown()
+    _Settings.workers = workers or os.cpu_count() or 1
+    _Settings.threshold = threshold
+
+
+def shutdown() -> None:
+    """Stop worker processes and turn parallel mode off."""
+    if _Settings.executor is not None:
+        _Settings.executor.shutdown()
+    _Settings.executor = None
+    _Settings.workers = 1
+    _Settings.threshold = PARALLEL_THRESHOLD
+
+
+def accepts(work: int, *operands: Buffer | int | float) -> bool:
+    """Check if an operation should run in parallel.
+
+    Only ``array`` buffers can be shared between processes, lists of
+    python objects are always processed serially.
+    """
+    return (
+        _Settings.workers > 1
+        and work >= _Settings.threshold
+        and all(
+            isinstance(operand, (int, float)) or typecode_of(operand)
+            for operand in operands
+        )
+    )
+
+
+def matmul(
+    left: Buffer,
+    right: Buffer,
+    shape: tuple[int, int, int],
+) -> Buffer | None:
+    """Multiply matrices by bands of rows in worker processes.
+
+    Operands and result are passed through shared memory, so they are
+    not pickled. The right matrix is transposed once before sharing.
+
+    Args:
+        left: Flat row-major ``array`` of the left matrix.
+        right: Flat row-major ``array`` of the right matrix.
+        shape: Rows of left, columns of left and columns of right.
+
+    Returns:
+        Buffer | None: Values of the product, None if they don't fit into
+            the ``array`` and the product must be computed serially.
+    """
+    rows_count, _, cols_count = shape
+    transposed = allocate(0, typecode_of(right))
+    for col in range(cols_count):
+        transposed.extend(right[col::cols_count])
+    return _run(
+        _matmul_band,
+        [left, transposed],
+        result_typecode(left, right) or FLOAT_TYPECODE,
+        (rows_count, cols_count),
+        shape,
+    )
+
+
+def elementwise(
+    operation: Operation,
+    left: Buffer,
+    right: Buffer | int | float,
+) -> Buffer | None:
+    """Apply elementwise operation by bands in worker processes.
+
+    Args:
+        operation: Picklable operation, e.g. from ``operator``.
+        left: Flat ``array`` of the left matrix.
+        right: Flat ``array`` of the right matrix or a scalar.
+
+    Returns:
+        Buffer | None: Values of the result, None if they don't fit into
+            the ``array`` and must be computed serially.
+    """
+    if isinstance(right, (int, float)):
+        scalar_typecode = (
+            FLOAT_TYPECODE if isinstance(right, float) else INT_TYPECODE
+        )
+        return _run(
+            _elementwise_band,
+            [left],
+            result_typecode(left, allocate(0, scalar_typecode))
+            or FLOAT_TYPECODE,
+            (len(left), 1),
+            operation,
+            right,
+        )
+    return _run(
+        _elementwise_band,
+        [left, right],
+        result_typecode(left, right) or FLOAT_TYPECODE,
+        (len(left), 1),
+        operation,
+        0,
+    )
+
+
+def _executor() -> ProcessPoolExecutor:
+    if _Settings.executor is None:
+        _Settings.executor = ProcessPoolExecutor(_Settings.workers)
+    return _Settings.executor
+
+
+def _bands(count: int) -> Iterator[tuple[int, int]]:
+    """Split ``range(count)`` into a band for each worker."""
+    band = -(-count // _Settings.workers)
+    for start in range(0, count, band):
+        yield start, min(start + band, count)
+
+
+def _run(
+    task: Callable[..., None],
+    inputs: Sequence[Buffer],
+    typecode: str,
+    shape: tuple[int, int],
+    *args: object,
+) -> Buffer | None:
+    """Run the task for bands of rows of the result in worker processes.
+
+    Args:
+        task: Function computing a band of the result. It's called with
+            shared inputs, shared output, band and ``args``.
+        inputs: Buffers to share with the workers.
+        typecode: Typecode of the result.
+        shape: Number of rows and columns of the result.
+        args: Other arguments of the task.
+
+    Raises:
+        Exception: The error of a worker, other than the values not
+            fitting into the result.
+
+    Returns:
+        Buffer | None: Values of the result, None if a worker failed to
+            fit the values into the result.
+    """
+    rows_count, cols_count = shape
+    with ExitStack() as stack:
+        shared = [
+            (stack.enter_context(_shared(buffer)).name, typecode_of(buffer))
+            for buffer in inputs
+        ]
+        out = stack.enter_context(
+            _shared(allocate(rows_count * cols_count, typecode)),
+        )
+        futures = [
+            _executor().submit(
+                task,
+                shared,
+                (out.name, typecode),
+                band,
+                *args,
+            )
+            for band in _bands(rows_count)
+        ]
+        wait(futures)
+        errors = [
+            error
+            for error in (future.exception() for future in futures)
+            if error is not None
+        ]
+        for error in errors:
+            if not isinstance(error, (OverflowError, TypeError)):
+                if isinstance(error, BrokenProcessPool):
+                    _Settings.executor = None
+                raise error
+        if errors:
+            return None
+        result = array(typecode)
+        result.frombytes(
+            _view(out)[:rows_count * cols_count * result.itemsize],
+        )
+        return result
+
+
+@contextmanager
+def _shared(buffer: Buffer) -> Iterator[SharedMemory]:
+    """Copy the ``array`` into a new shared memory block."""
+    view = memoryview(buffer).cast("B")  # type: ignore[arg-type]
+    memory = SharedMemory(create=True, size=max(1, view.nbytes))
+    try:
+        _view(memory)[:view.nbytes] = view
+        view.release()
+        yield memory
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def _view(memory: SharedMemory) -> memoryview:
+    """Return the buffer of the shared memory block.
+
+    Raises:
+        ValueError: If the block is closed.
+    """
+    if memory.buf is None:
+        raise ValueError("Shared memory block is closed")
+    return memory.buf
+
+
+@contextmanager
+def _attached(shared: SharedBuffer) -> Iterator[memoryview]:
+    """Attach to a shared memory block created by the main process."""
+    name, typecode = shared
+    memory = SharedMemory(name=name)
+    view = _view(memory).cast(typecode)  # type: ignore[call-overload]
+    try:
+        yield view
+    finally:
+        view.release()
+        memory.close()
+
+
+def _matmul_band(
+    inputs: list[SharedBuffer],
+    output: SharedBuffer,
+    band: tuple[int, int],
+    shape: tuple[int, int, int],
+) -> None:
+    """Compute rows of the product in a worker.
+
+    Only the rows of the band and one tile of columns at a time are
+    converted to python numbers, so a worker does not hold the whole
+    right matrix.
+    """
+    _, inner, cols_count = shape
+    start, stop = band
+    product = kernels.dot_for(inputs[0][1], inputs[1][1])
+    with (
+        _attached(inputs[0]) as left,
+        _attached(inputs[1]) as transposed,
+        _attached(output) as out,
+    ):
+        rows = [
+            left[row * inner:(row + 1) * inner].tolist()
+            for row in range(start, stop)
+        ]
+        tile = kernels.tile_size(inner, transposed.itemsize)
+        for col_start in range(0, cols_count, tile):
+            col_stop = min(col_start + tile, cols_count)
+            width = col_stop - col_start
+            cols = [
+                transposed[col * inner:(col + 1) * inner].tolist()
+                for col in range(col_start, col_stop)
+            ]
+            values = kernels.matmul(rows, cols, product=product)
+            for index, row in enumerate(range(start, stop)):
+                position = row * cols_count
+                out[position + col_start:position + col_stop] = array(
+                    output[1],
+                    values[index * width:(index + 1) * width],
+                )
+
+
+def _elementwise_band(
+    inputs: list[SharedBuffer],
+    output: SharedBuffer,
+    band: tuple[int, int],
+    operation: Operation,
+    scalar: int | float,
+) -> None:
+    """Compute a band of an elementwise operation in a worker.
+
+    The scalar is used as the right operand if there is one input only.
+    """
+    start, stop = band
+    with ExitStack() as stack:
+        views = [stack.enter_context(_attached(shared)) for shared in inputs]
+        out = stack.enter_context(_attached(output))
+        left: Sequence[int | float] = views[0][start:stop].tolist()
+        right: Iterable[int | float] = (
+            views[1][start:stop].tolist()
+            if len(views) > 1
+            else repeat(scalar)
+        )
+        out[start:stop] = array(output[1], map(operation, left, right))
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, TypeAlias
+
+from camp.matrix_task.kernels import itemsize
+
+if TYPE_CHECKING:
+    from camp.matrix_task.main import Matrix
+
+# Default memory budget of the cached products, in bytes.
+MEMORY_BUDGET = 64 * 1024 * 1024
+
+Key: TypeAlias = tuple[Hashable, ...]
+Operands: TypeAlias = tuple["Matrix | int", ...]
+
+
+class ProductCache:
+    """LRU cache of matrix products limited by the memory they take.
+
+    Products are keyed by the operation and the content fingerprints of
+    the operands, so equal operands hit the cache even if they are
+    different objects, and a changed operand misses it. A fingerprint is
+    only a hash, so frozen operands are kept with the product and
+    compared on a hit, and a collision is a miss. When the budget is
+    exceeded, the least recently used products are evicted.
+    """
+
+    def __init__(self, budget: int = MEMORY_BUDGET) -> None:
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[
+            Key,
+            tuple[Operands, Matrix],
+        ] = OrderedDict()
+
+    def get(self, key: Key, operands: Operands = ()) -> Matrix | None:
+        """Return the cached product, marking it as recently used.
+
+        The product is returned only if it was cached for equal operands.
+        """
+        entry = self._entries.get(key)
+        if entry is None or not _same_operands(entry[0], operands):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(
+        self,
+        key: Key,
+        product: Matrix,
+        operands: Operands = (),
+    ) -> None:
+        """Cache the product, evicting the least recently used ones.
+
+        Operands are frozen, so changing them later does not change the
+        entry. A product cached for other operands with a colliding key
+        is replaced. Products bigger than the whole budget are not cached.
+        """
+        operands = tuple(
+            operand if isinstance(operand, int) else operand.freeze()
+            for operand in operands
+        )
+        size = _size_of(product, operands)
+        if size > self.budget:
+            return
+        if key in self._entries:
+            replaced_operands, replaced = self._entries.pop(key)
+            self.used -= _size_of(replaced, replaced_operands)
+        while self.used + size > self.budget:
+            _, (evicted_operands, evicted) = self._entries.popitem(
+                last=False,
+            )
+            self.used -= _size_of(evicted, evicted_operands)
+            self.evictions += 1
+        self._entries[key] = operands, product
+        self.used += size
+
+    def clear(self) -> None:
+        """Remove all products, keeping the statistics."""
+        self._entries.clear()
+        self.used = 0
+
+    def stats(self) -> dict[str, int | float]:
+        """Return statistics of the cache for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "used_bytes": self.used,
+            "budget_bytes": self.budget,
+        }
+
+
+class _Settings:
+    """Cache used by matrix operations, None if caching is off."""
+
+    cache: ProductCache | None = None
+
+
+def enable(budget: int = MEMORY_BUDGET) -> ProductCache:
+    """Turn on caching of products of ``@`` and ``**``.
+
+    Args:
+        budget: Memory for the cached products, in bytes.
+
+    Returns:
+        ProductCache: The new cache, e.g. to read its statistics.
+    """
+    _Settings.cache = ProductCache(budget)
+    return _Settings.cache
+
+
+def disable() -> None:
+    """Turn off caching of products and drop the cache."""
+    _Settings.cache = None
+
+
+def stats() -> dict[str, int | float] | None:
+    """Return statistics of the cache, None if caching is off."""
+    if _Settings.cache is None:
+        return None
+    return _Settings.cache.stats()
+
+
+def memoize(
+    operation: str,
+    operands: tuple[Matrix, Matrix | int],
+    compute: Callable[[], Matrix],
+) -> Matrix:
+    """Return product of the operands from the cache or compute it.
+
+    The caller gets a copy-on-write view of the cached matrix, so
+    changing it in place does not change the cache.
+
+    Args:
+        operation: Name of the operation.
+        operands: The matrix and the right operand (a matrix or a power).
+        compute: Function computing the product.
+
+    Returns:
+        Matrix: The product.
+    """
+    cache = _Settings.cache
+    if cache is None:
+        return compute()
+    key: Key = (operation, *map(_key_of, operands))
+    product = cache.get(key, operands)
+    if product is None:
+        product = compute()
+        cache.put(key, product, operands)
+    return product._view(product._offset, product._strides, *product.size)
+
+
+def _key_of(operand: Matrix | int) -> Hashable:
+    if isinstance(operand, int):
+        return operand
+    return operand.fingerprint(), operand.size, operand.dtype
+
+
+def _same_operands(cached: Operands, operands: Operands) -> bool:
+    """Check that the operands are equal to the cached ones."""
+    return len(cached) == len(operands) and all(
+        first == second for first, second in zip(cached, operands)
+    )
+
+
+def _size_of(product: Matrix, operands: Operands = ()) -> int:
+    """Return approximate size of the values of the entry in bytes.
+
+    Frozen operands share buffers with the original ones, but keep them
+    alive when the originals are changed, so they are counted too.
+    """
+    return sum(
+        len(matrix._buffer) * itemsize(matrix._buffer)
+        for matrix in (product, *operands)
+        if not isinstance(matrix, int)
+    )
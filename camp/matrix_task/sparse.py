@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import operator
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from itertools import repeat
+from typing import TypeAlias
+
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.storage import INT_TYPECODE, Buffer, pack
+
+# Results with a bigger share of nonzero elements are returned dense.
+DENSITY_THRESHOLD = 0.25
+
+Row: TypeAlias = dict[int, int | float]
+Operation: TypeAlias = Callable[[int | float, int | float], int | float]
+
+
+class SparseMatrix:
+    """Represent a matrix with few nonzero elements.
+
+    Elements are stored in compressed sparse row (CSR) format: nonzero
+    values of row ``i`` and their columns are
+    ``values[indptr[i]:indptr[i + 1]]`` and
+    ``indices[indptr[i]:indptr[i + 1]]``. Coordinate (COO) format is
+    supported for construction and export.
+
+    Operations accept sparse and dense matrices. Their results are
+    converted by ``auto``: they stay sparse while less than
+    ``DENSITY_THRESHOLD`` of the elements are nonzero.
+    """
+
+    __matrix_priority__ = 1
+
+    __slots__ = ("indptr", "indices", "values", "rows_count", "cols_count")
+
+    def __init__(
+        self,
+        indptr: Sequence[int],
+        indices: Sequence[int],
+        values: Iterable[int | float],
+        size: tuple[int, int],
+    ) -> None:
+        """Initialize a sparse matrix with data in CSR format.
+
+        Args:
+            indptr: Positions where the rows start in indices and values.
+            indices: Columns of the nonzero elements.
+            values: Nonzero elements.
+            size: Number of rows and columns.
+        """
+        self.indptr = array(INT_TYPECODE, indptr)
+        self.indices = array(INT_TYPECODE, indices)
+        self.values: Buffer = pack(values)
+        self.rows_count, self.cols_count = size
+
+    @classmethod
+    def from_dense(cls: type[SparseMatrix], matrix: Matrix) -> SparseMatrix:
+        """Create a sparse matrix with nonzero elements of a dense one."""
+        return cls._from_rows(
+            (
+                {col: value for col, value in enumerate(row) if value}
+                for row in matrix._rows()
+            ),
+            matrix.size,
+        )
+
+    @classmethod
+    def from_coo(
+        cls: type[SparseMatrix],
+        rows: Iterable[int],
+        cols: Iterable[int],
+        values: Iterable[int | float],
+        size: tuple[int, int],
+    ) -> SparseMatrix:
+        """Create a sparse matrix from data in coordinate (COO) format.
+
+        Values with the same coordinates are summed up.
+
+        Args:
+            rows: Rows of the elements.
+            cols: Columns of the elements.
+            values: Elements.
+            size: Number of rows and columns.
+
+        Raises:
+            ValueError: If coordinates are out of the matrix.
+        """
+        dict_rows: list[Row] = [{} for _ in range(size[0])]
+        for row, col, value in zip(rows, cols, values):
+            if not (0 <= row < size[0] and 0 <= col < size[1]):
+                raise ValueError(
+                    f"Element ({row}, {col}) is out of the matrix",
+                )
+            dict_rows[row][col] = dict_rows[row].get(col, 0) + value
+        return cls._from_rows(dict_rows, size)
+
+    @classmethod
+    def identity(cls: type[SparseMatrix], size: int) -> SparseMatrix:
+        """Create an identity sparse matrix."""
+        return cls(range(size + 1), range(size), repeat(1, size), (size, size))
+
+    @classmethod
+    def _from_rows(
+        cls: type[SparseMatrix],
+        rows: Iterable[Row],
+        size: tuple[int, int],
+    ) -> SparseMatrix:
+        """Create a sparse matrix from rows as dicts of column to value."""
+        indptr, indices, values = [0], [], []
+        for row in rows:
+            for col in sorted(row):
+                if row[col]:
+                    indices.append(col)
+                    values.append(row[col])
+            indptr.append(len(indices))
+        return cls(indptr, indices, values, size)
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """Return size of the matrix."""
+        return self.rows_count, self.cols_count
+
+    @property
+    def nnz(self) -> int:
+        """Return number of stored nonzero elements."""
+        return len(self.values)
+
+    @property
+    def density(self) -> float:
+        """Return share of nonzero elements."""
+        return self.nnz / max(1, self.rows_count * self.cols_count)
+
+    def _row(self, row: int) -> Iterator[tuple[int, int | float]]:
+        """Iterate over columns and values of nonzero elements of the row."""
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        return zip(self.indices[start:stop], self.values[start:stop])
+
+    def _dict_rows(self) -> Iterator[Row]:
+        for row in range(self.rows_count):
+            yield dict(self._row(row))
+
+    def to_coo(self) -> tuple[list[int], list[int], list[int | float]]:
+        """Return the elements in coordinate (COO) format.
+
+        Returns:
+            tuple: Rows, columns and values of the nonzero elements.
+        """
+        rows = [
+            row
+            for row in range(self.rows_count)
+            for _ in range(self.indptr[row], self.indptr[row + 1])
+        ]
+        return rows, list(self.indices), list(self.values)
+
+    def to_dense(self) -> Matrix:
+        """Convert to a dense matrix."""
+        return Matrix._from_buffer(
+            pack(self._scatter([0] * (self.rows_count * self.cols_count))),
+            self.rows_count,
+            self.cols_count,
+        )
+
+    def _scatter(self, buffer: list[int | float]) -> list[int | float]:
+        """Add the nonzero elements to a flat row-major buffer in place."""
+        for row in range(self.rows_count):
+            offset = row * self.cols_count
+            for col, value in self._row(row):
+                position = offset + col
+                buffer[position] += value
+        return buffer
+
+    def __add__(self, other: object) -> Matrix | SparseMatrix:
+        return self._combine(other, operator.add, "+")
+
+    def __radd__(self, other: object) -> Matrix | SparseMatrix:
+        return self._combine(other, operator.add, "+")
+
+    def __sub__(self, other: object) -> Matrix | SparseMatrix:
+        return self._combine(other, operator.sub, "-")
+
+    def __rsub__(self, other: object) -> Matrix | SparseMatrix:
+        return (-self)._combine(other, operator.add, "+")
+
+    def _combine(
+        self,
+        other: object,
+        operation: Operation,
+        sign: str,
+    ) -> Matrix | SparseMatrix:
+        """Apply elementwise operation to the matrix and other one.
+
+        Raises:
+            ValueError: If the other is not a matrix.
+            ValueError: If the matrices have different sizes.
+        """
+        if not isinstance(other, (Matrix, SparseMatrix)):
+            raise ValueError(
+                f"Unsupported operand for {sign}: "
+                f"'SparseMatrix' and '{type(other)}'",
+            )
+        if self.size != other.size:
+            raise ValueError("Matrices must have the same size")
+        if isinstance(other, Matrix):
+            base = list(map(operation, repeat(0), other._flat()))
+            return auto(
+                Matrix._from_buffer(
+                    pack(self._scatter(base)),
+                    self.rows_count,
+                    self.cols_count,
+                ),
+            )
+        rows = []
+        for row, other_row in zip(self._dict_rows(), other._dict_rows()):
+            for col, value in other_row.items():
+                row[col] = operation(row.get(col, 0), value)
+            rows.append(row)
+        return auto(SparseMatrix._from_rows(rows, self.size))
+
+    def __mul__(self, other: object) -> Matrix | SparseMatrix:
+        """Multiply the matrix by a scalar or another matrix.
+
+        Raises:
+            ValueError: If the other is not a scalar or matrix.
+        """
+        if isinstance(other, (int, float)):
+            if not other:
+                return SparseMatrix.from_coo([], [], [], self.size)
+            return auto(
+                SparseMatrix(
+                    self.indptr,
+                    self.indices,
+                    map(operator.mul, self.values, repeat(other)),
+                    self.size,
+                ),
+            )
+        if isinstance(other, (Matrix, SparseMatrix)):
+            return self.__matmul__(other)
+        raise ValueError(
+            f"Unsupported operand for *: 'SparseMatrix' and '{type(other)}'",
+        )
+
+    def __rmul__(self, other: object) -> Matrix | SparseMatrix:
+        if isinstance(other, Matrix):
+            return self.__rmatmul__(other)
+        return self.__mul__(other)
+
+    def __neg__(self) -> SparseMatrix:
+        return SparseMatrix(
+            self.indptr,
+            self.indices,
+            map(operator.neg, self.values),
+            self.size,
+        )
+
+    def __matmul__(self, other: object) -> Matrix | SparseMatrix:
+        """Multiply the matrix by a sparse or dense matrix.
+
+        Raises:
+            ValueError: If the other is not a matrix.
+            ValueError: If the cols are not equal rows
+        """
+        if not isinstance(other, (Matrix, SparseMatrix)):
+            raise ValueError(
+                "Unsupported operand for *: "
+                f"'SparseMatrix' and '{type(other)}'",
+            )
+        if self.cols_count != other.rows_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        if isinstance(other, Matrix):
+            return auto(self._matmul_dense(other))
+        return auto(self._matmul_sparse(other))
+
+    def __rmatmul__(self, other: object) -> Matrix | SparseMatrix:
+        """Multiply a dense matrix by the sparse one, as ``(B.T @ A.T).T``.
+
+        Raises:
+            ValueError: If the other is not a matrix.
+        """
+        if not isinstance(other, Matrix):
+            raise ValueError(
+                "Unsupported operand for *: "
+                f"'{type(other)}' and 'SparseMatrix'",
+            )
+        return (self.transpose() @ other.transpose()).transpose()
+
+    def _matmul_sparse(self, other: SparseMatrix) -> SparseMatrix:
+        """Multiply sparse matrices row by row (Gustavson's algorithm)."""
+        other_rows = list(other._dict_rows())
+        rows = []
+        for row in range(self.rows_count):
+            result: Row = {}
+            for inner, value in self._row(row):
+                for col, other_value in other_rows[inner].items():
+                    result[col] = result.get(col, 0) + value * other_value
+            rows.append(result)
+        return SparseMatrix._from_rows(
+            rows,
+            (self.rows_count, other.cols_count),
+        )
+
+    def _matmul_dense(self, other: Matrix) -> Matrix:
+        """Multiply by a dense matrix, combining only the needed rows."""
+        other_rows = list(other._rows())
+        buffer: list[int | float] = []
+        for row in range(self.rows_count):
+            result: list[int | float] = [0] * other.cols_count
+            for inner, value in self._row(row):
+                result = list(
+                    map(
+                        operator.add,
+                        result,
+                        map(operator.mul, other_rows[inner], repeat(value)),
+                    ),
+                )
+            buffer.extend(result)
+        return Matrix._from_buffer(
+            pack(buffer),
+            self.rows_count,
+            other.cols_count,
+        )
+
+    def matvec(self, vector: Sequence[int | float]) -> list[int | float]:
+        """Multiply the matrix by a column vector, touching only nonzeros.
+
+        Raises:
+            ValueError: If the vector has not as many values as columns.
+
+        Returns:
+            list: Values of the product.
+        """
+        if len(vector) != self.cols_count:
+            raise ValueError("Matrix and vector are not aligned")
+        indptr, indices, values = self.indptr, self.indices, self.values
+        return [
+            sum(
+                map(
+                    operator.mul,
+                    values[start:stop],
+                    map(vector.__getitem__, indices[start:stop]),
+                ),
+            )
+            for start, stop in zip(indptr, indptr[1:])
+        ]
+
+    def transpose(self) -> SparseMatrix:
+        """Transpose the matrix.
+
+        Returns:
+            SparseMatrix: The transposed matrix, in CSR format as well.
+        """
+        rows, cols, values = self.to_coo()
+        counts = [0] * (self.cols_count + 1)
+        for col in cols:
+            counts[col + 1] += 1
+        for col in range(self.cols_count):
+            counts[col + 1] += counts[col]
+        indptr = counts[:]
+        indices = [0] * self.nnz
+        new_values: list[int | float] = [0] * self.nnz
+        for row, col, value in zip(rows, cols, values):
+            position = counts[col]
+            indices[position], new_values[position] = row, value
+            counts[col] += 1
+        return SparseMatrix(
+            indptr,
+            indices,
+            new_values,
+            (self.cols_count, self.rows_count),
+        )
+
+    def __pow__(self, power: int) -> Matrix | SparseMatrix:
+        """Raise the matrix to the power by squaring.
+
+        Raises:
+            ValueError: If the power is negative or the matrix is not
+                square.
+        """
+        if power < 0:
+            raise ValueError(
+                "Power must be a non-negative integer",
+            )
+        if self.rows_count != self.cols_count:
+            raise ValueError("Matrices are not aligned for multiplication")
+        result: Matrix | SparseMatrix = SparseMatrix.identity(self.rows_count)
+        square: Matrix | SparseMatrix = self
+        while power:
+            if power & 1:
+                result = result @ square
+            power >>= 1
+            if power:
+                square = square @ square
+        return auto(result)
+
+    def __eq__(self, other: object) -> bool:
+        """Check if the matrix equals to a sparse or dense one."""
+        if isinstance(other, Matrix):
+            return self.to_dense() == other
+        if isinstance(other, SparseMatrix):
+            return (
+                self.size == other.size
+                and self.indptr == other.indptr
+                and self.indices == other.indices
+                and list(self.values) == list(other.values)
+            )
+        return False
+
+
+def auto(
+    matrix: Matrix | SparseMatrix,
+    threshold: float = DENSITY_THRESHOLD,
+) -> Matrix | SparseMatrix:
+    """Pick sparse or dense representation of the matrix by its density.
+
+    Args:
+        matrix: Sparse or dense matrix.
+        threshold: Share of nonzero elements above which matrix is dense.
+
+    Returns:
+        Matrix | SparseMatrix: The same matrix in the better format.
+    """
+    if isinstance(matrix, SparseMatrix):
+        return matrix.to_dense() if matrix.density > threshold else matrix
+    flat = matrix._flat()
+    nonzero = len(flat) - flat.count(0)
+    if nonzero > threshold * len(flat):
+        return matrix
+    return SparseMatrix.from_dense(matrix)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, MutableSequence, Sequence
+from typing import Any, TypeAlias
+
+Buffer: TypeAlias = MutableSequence[Any]
+
+INT_TYPECODE = "q"
+FLOAT_TYPECODE = "d"
+
+# Dtypes of matrices: values of the ``array`` typecodes, or any python
+# numbers (e.g. big integers for exact arithmetic) kept in a list.
+INT64 = "int64"
+FLOAT64 = "float64"
+OBJECT = "object"
+TYPECODES = {INT64: INT_TYPECODE, FLOAT64: FLOAT_TYPECODE}
+
+
+def pack(values: Iterable[int | float]) -> Buffer:
+    """Pack values into the most compact flat buffer that holds them exactly.
+
+    Integers are stored in a signed 64-bit ``array``, floats in a double
+    ``array``. Values that fit none of them (e.g. big integers) are kept
+    in a plain list, so no precision is lost. An ``array`` is returned
+    as is.
+
+    Args:
+        values: Values of the matrix in row-major order.
+
+    Returns:
+        Buffer: Flat buffer with the values.
+    """
+    if isinstance(values, array):
+        return values
+    values = values if isinstance(values, list) else list(values)
+    try:
+        return array(INT_TYPECODE, values)
+    except OverflowError:
+        return values
+    except TypeError:
+        pass
+    try:
+        return array(FLOAT_TYPECODE, values)
+    except (OverflowError, TypeError):
+        return values
+
+
+def pack_as(values: Buffer, *sources: Buffer) -> Buffer:
+    """Pack values computed from the sources.
+
+    Values computed from an ``object`` buffer stay in a list, even if
+    they fit an ``array``, so exact arithmetic goes on. Others are packed
+    by ``pack``.
+    """
+    if result_typecode(*sources) is None:
+        return values if isinstance(values, list) else list(values)
+    return pack(values)
+
+
+def convert(values: Iterable[int | float], dtype: str) -> Buffer:
+    """Convert values to a buffer of the dtype.
+
+    Floats are truncated to integers for ``int64``.
+
+    Raises:
+        ValueError: If the dtype is unknown or the values do not fit it.
+    """
+    typecode = typecode_for(dtype)
+    if typecode is None:
+        return list(values)
+    cast = int if dtype == INT64 else float
+    try:
+        return array(typecode, map(cast, values))
+    except OverflowError:
+        raise ValueError(f"Values do not fit {dtype}") from None
+
+
+def typecode_for(dtype: str) -> str | None:
+    """Return typecode of buffers of the dtype, None for a plain list.
+
+    Raises:
+        ValueError: If the dtype is unknown.
+    """
+    if dtype == OBJECT:
+        return None
+    if dtype not in TYPECODES:
+        raise ValueError(f"Unknown dtype {dtype!r}")
+    return TYPECODES[dtype]
+
+
+def pack_rows(
+    rows: Iterable[Iterable[int | float]],
+) -> tuple[Buffer, int, int]:
+    """Pack rows into one flat buffer, like ``pack`` does for values.
+
+    Each row is appended to the buffer right away, without building a
+    list of all values. The buffer is repacked only if a row does not fit
+    it.
+
+    Raises:
+        ValueError: If the rows have different lengths.
+
+    Returns:
+        tuple[Buffer, int, int]: The buffer, number of rows and columns.
+    """
+    buffer: Buffer = array(INT_TYPECODE)
+    rows_count, cols_count = 0, 0
+    for row in rows:
+        values = row if isinstance(row, (list, tuple, array)) else list(row)
+        if not rows_count:
+            cols_count = len(values)
+        elif len(values) != cols_count:
+            raise ValueError(
+                f"Row {rows_count} has {len(values)} elements, "
+                f"expected {cols_count}",
+            )
+        rows_count += 1
+        typecode = typecode_of(buffer)
+        if typecode is None:
+            buffer.extend(values)
+            continue
+        try:
+            buffer.extend(array(typecode, values))
+        except (OverflowError, TypeError):
+            buffer = pack([*buffer, *values])
+    return buffer, rows_count, cols_count
+
+
+def dtype_of(buffer: Buffer) -> str:
+    """Return dtype of the values of the buffer."""
+    typecode = typecode_of(buffer)
+    for dtype, dtype_typecode in TYPECODES.items():
+        if typecode == dtype_typecode:
+            return dtype
+    return OBJECT
+
+
+def same_values(first: Buffer, second: Buffer) -> bool:
+    """Check that two flat buffers of the same length hold equal values."""
+    if type(first) is type(second):
+        return first == second
+    return list(first) == list(second)
+
+
+def widen(buffer: Buffer, value: int | float) -> Buffer:
+    """Return a copy of the buffer that is able to hold the value too.
+
+    Integer ``array`` gets widened to a double one for a float value,
+    anything else that does not fit falls back to a plain list.
+    """
+    if (
+        isinstance(value, float)
+        and typecode_of(buffer) == INT_TYPECODE
+    ):
+        return array(FLOAT_TYPECODE, buffer)
+    return list(buffer)
+
+
+def assign(buffer: Buffer, start: int, values: list[Any]) -> Buffer:
+    """Write the values into the buffer from the start.
+
+    An ``array`` gets the values as an ``array`` of its typecode, so they
+    are written by one slice assignment. It's widened like by ``widen``
+    only if they do not fit it.
+
+    Returns:
+        Buffer: The buffer, or its widened copy with the values.
+    """
+    typecode = typecode_of(buffer)
+    stop = start + len(values)
+    if typecode is None:
+        buffer[start:stop] = values
+        return buffer
+    try:
+        buffer[start:stop] = array(typecode, values)
+    except (OverflowError, TypeError):
+        if (
+            typecode == INT_TYPECODE
+            and typecode_of(pack(values)) == FLOAT_TYPECODE
+        ):
+            return assign(array(FLOAT_TYPECODE, buffer), start, values)
+        return assign(list(buffer), start, values)
+    return buffer
+
+
+def typecode_of(buffer: Sequence[Any]) -> str | None:
+    """Return typecode of the buffer, None for a plain list."""
+    return getattr(buffer, "typecode", None)
+
+
+def result_typecode(*sources: Buffer) -> str | None:
+    """Return typecode of a buffer for values computed from the sources.
+
+    Returns:
+        str | None: Typecode of ``array`` or None for a plain list.
+    """
+    typecodes = {typecode_of(source) for source in sources}
+    if None in typecodes:
+        return None
+    if FLOAT_TYPECODE in typecodes:
+        return FLOAT_TYPECODE
+    return INT_TYPECODE
+
+
+def allocate(size: int, typecode: str | None) -> Buffer:
+    """Allocate a zeroed buffer.
+
+    Args:
+        size: Number of elements in the buffer.
+        typecode: Typecode of ``array`` or None for a plain list.
+
+    Returns:
+        Buffer: New buffer.
+    """
+    if typecode is None:
+        return [0] * size
+    return array(typecode, [0]) * size
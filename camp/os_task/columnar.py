@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import bz2
+import itertools
+import json
+import lzma
+import struct
+import sys
+import typing
+import zlib
+from array import array
+from pathlib import Path
+
+# Columnar layout of records: the magic and version, row groups of
+# column chunks, the footer (JSON with the schema, the compression and
+# offsets of the chunks), its length and the magic again. Numbers are
+# little-endian. Readers seek to the chunks of the needed columns only.
+MAGIC = b"CCOL"
+VERSION = 1
+FOOTER_LENGTH = struct.Struct("<Q")
+# Encoding of the values, whether there are nulls, number of rows.
+CHUNK_HEADER = struct.Struct("<BBQ")
+# Number of records written at once.
+ROW_GROUP_SIZE = 10_000
+
+# Types of columns, they are also the encodings of the chunks. Values of
+# ``bool``, ``int64`` and ``float64`` chunks are an ``array``, ones of
+# ``str`` and ``json`` (anything else) are lengths and UTF-8 bytes.
+BOOL = "bool"
+INT64 = "int64"
+FLOAT64 = "float64"
+STR = "str"
+JSON = "json"
+ENCODINGS = (BOOL, INT64, FLOAT64, STR, JSON)
+TYPECODES = {BOOL: "b", INT64: "q", FLOAT64: "d"}
+LENGTH_TYPECODE = "q"
+INT64_RANGE = range(-(2**63), 2**63)
+# Integers stored exactly in float64 columns.
+FLOAT64_INT_RANGE = range(-(2**53), 2**53 + 1)
+
+Record: typing.TypeAlias = dict[str, typing.Any]
+Codec: typing.TypeAlias = tuple[
+    typing.Callable[[bytes], bytes],
+    typing.Callable[[bytes], bytes],
+]
+
+COMPRESSIONS: dict[str, Codec] = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def write(
+    records: typing.Iterable[Record],
+    file_path: Path,
+    compression: str | None = "zlib",
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> None:
+    """Write records to a columnar file by row groups.
+
+    Columns and their types are inferred from the first row group. A
+    chunk with values not matching the type of its column, e.g. integers
+    a float64 column can't hold exactly, is stored as JSON. Missing
+    values and None are stored as nulls. The file is removed if writing
+    fails.
+
+    Args:
+        records: Records to write.
+        file_path: Path to the file.
+        compression: ``zlib``, ``bz2``, ``lzma`` or None.
+        row_group_size: Number of records in a row group.
+
+    Raises:
+        ValueError: If the compression is unknown, there are no records
+            or a record has columns missing in the first row group.
+
+    """
+    compress = _codec(compression)[0]
+    iterator = iter(records)
+    group = list(itertools.islice(iterator, row_group_size))
+    if not group:
+        raise ValueError("No data to save")
+    schema = _infer_schema(group)
+    names = {name for name, _ in schema}
+    row_groups = []
+    try:
+        with file_path.open("wb") as file:
+            file.write(MAGIC + bytes([VERSION]))
+            while group:
+                for record in group:
+                    if record.keys() - names:
+                        raise ValueError(
+                            "Record has columns not in the schema: "
+                            f"{sorted(record.keys() - names)}",
+                        )
+                chunks = []
+                for name, column_type in schema:
+                    values = [record.get(name) for record in group]
+                    chunk = compress(_encode(values, column_type))
+                    chunks.append((file.tell(), len(chunk)))
+                    file.write(chunk)
+                row_groups.append({"rows": len(group), "chunks": chunks})
+                group = list(itertools.islice(iterator, row_group_size))
+            footer = json.dumps(
+                {
+                    "schema": schema,
+                    "compression": compression,
+                    "row_groups": row_groups,
+                },
+            ).encode()
+            file.write(footer)
+            file.write(FOOTER_LENGTH.pack(len(footer)) + MAGIC)
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
+
+
+def read(
+    file_path: Path,
+    columns: typing.Sequence[str] | None = None,
+) -> typing.Iterator[Record]:
+    """Read records from a columnar file by row groups.
+
+    Args:
+        file_path: Path to the file.
+        columns: Names of the columns to read, all if not set. Chunks of
+            other columns are not read at all.
+
+    Raises:
+        ValueError: If the file is not a columnar one or has no column.
+
+    Yields:
+        Record: Record with the columns, None for nulls.
+
+    """
+    with file_path.open("rb") as file:
+        footer = read_footer(file)
+        decompress = _codec(footer["compression"])[1]
+        positions = {
+            name: index for index, (name, _) in enumerate(footer["schema"])
+        }
+        names = list(positions) if columns is None else list(columns)
+        for name in names:
+            if name not in positions:
+                raise ValueError(f"No column {name!r} in the file")
+        for group in footer["row_groups"]:
+            values = []
+            for name in names:
+                offset, length = group["chunks"][positions[name]]
+                file.seek(offset)
+                values.append(_decode(decompress(file.read(length))))
+            if not names:
+                values.append([None] * group["rows"])
+            for row in zip(*values):
+                yield dict(zip(names, row))
+
+
+def read_footer(file: typing.BinaryIO) -> dict[str, typing.Any]:
+    """Read the footer with the schema and offsets of the chunks.
+
+    Raises:
+        ValueError: If the file is not a columnar one.
+
+    """
+    head = file.read(len(MAGIC) + 1)
+    tail_size = FOOTER_LENGTH.size + len(MAGIC)
+    size = file.seek(0, 2)
+    if head[:len(MAGIC)] != MAGIC or size < len(head) + tail_size:
+        raise ValueError("File is not a columnar one")
+    if head[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported columnar version {head[len(MAGIC)]}")
+    file.seek(size - tail_size)
+    tail = file.read(tail_size)
+    if tail[FOOTER_LENGTH.size:] != MAGIC:
+        raise ValueError("File is not a columnar one")
+    (length,) = FOOTER_LENGTH.unpack_from(tail)
+    file.seek(size - tail_size - length)
+    return json.loads(file.read(length))
+
+
+def _codec(compression: str | None) -> Codec:
+    """Return functions compressing and decompressing chunks.
+
+    Raises:
+        ValueError: If the compression is unknown.
+
+    """
+    if compression is None:
+        return bytes, bytes
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}")
+    return COMPRESSIONS[compression]
+
+
+def _infer_schema(records: list[Record]) -> list[tuple[str, str]]:
+    """Return names and types of the columns of the records.
+
+    Columns are in order of their first appearance. A column gets the
+    narrowest type holding all its not null values.
+    """
+    kinds: dict[str, set[type]] = {}
+    for record in records:
+        for name, value in record.items():
+            column = kinds.setdefault(name, set())
+            if value is not None:
+                column.add(type(value))
+    return [(name, _column_type(column)) for name, column in kinds.items()]
+
+
+def _column_type(kinds: set[type]) -> str:
+    """Return type of a column with values of the python types."""
+    if kinds == {bool}:
+        return BOOL
+    if kinds == {int}:
+        return INT64
+    if kinds and kinds <= {int, float}:
+        return FLOAT64
+    if kinds == {str}:
+        return STR
+    return JSON
+
+
+def _matches(value: object, column_type: str) -> bool:
+    """Check if a not null value can be stored as the column type."""
+    kind = type(value)
+    if column_type == BOOL:
+        return kind is bool
+    if column_type == INT64:
+        return kind is int and value in INT64_RANGE
+    if column_type == FLOAT64:
+        return kind is float or (kind is int and value in FLOAT64_INT_RANGE)
+    if column_type == STR:
+        return kind is str
+    return True
+
+
+def _encode(values: list[typing.Any], column_type: str) -> bytes:
+    """Encode values of a column chunk."""
+    present = [value for value in values if value is not None]
+    has_nulls = len(present) < len(values)
+    if not all(_matches(value, column_type) for value in present):
+        column_type = JSON
+    parts = [
+        CHUNK_HEADER.pack(
+            ENCODINGS.index(column_type),
+            has_nulls,
+            len(values),
+        ),
+    ]
+    if has_nulls:
+        parts.append(bytes(value is not None for value in values))
+    if column_type in TYPECODES:
+        parts.append(_to_bytes(array(TYPECODES[column_type], present)))
+        return b"".join(parts)
+    texts = [
+        (value if column_type == STR else json.dumps(value)).encode()
+        for value in present
+    ]
+    parts.append(_to_bytes(array(LENGTH_TYPECODE, map(len, texts))))
+    parts.extend(texts)
+    return b"".join(parts)
+
+
+def _decode(chunk: bytes) -> list[typing.Any]:
+    """Decode values of a column chunk, None for nulls."""
+    encoding, has_nulls, count = CHUNK_HEADER.unpack_from(chunk)
+    column_type = ENCODINGS[encoding]
+    position = CHUNK_HEADER.size
+    validity = b""
+    if has_nulls:
+        validity = chunk[position:position + count]
+        position += count
+        count = sum(validity)
+    present: list[typing.Any]
+    if column_type in TYPECODES:
+        present = _from_bytes(TYPECODES[column_type], chunk, position, count)
+        if column_type == BOOL:
+            present = list(map(bool, present))
+    else:
+        lengths = _from_bytes(LENGTH_TYPECODE, chunk, position, count)
+        position += count * array(LENGTH_TYPECODE).itemsize
+        texts = []
+        for length in lengths:
+            texts.append(chunk[position:position + length].decode())
+            position += length
+        present = texts if column_type == STR else list(map(json.loads, texts))
+    if not has_nulls:
+        return present
+    values = iter(present)
+    return [next(values) if valid else None for valid in validity]
+
+
+def _to_bytes(values: array[typing.Any]) -> bytes:
+    """Return little-endian bytes of the values."""
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(
+    typecode: str,
+    chunk: bytes,
+    position: int,
+    count: int,
+) -> list[typing.Any]:
+    """Read ``count`` little-endian values of the typecode at the position."""
+    values = array(typecode)
+    end = position + count * values.itemsize
+    values.frombytes(chunk[position:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
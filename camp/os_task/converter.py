@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import contextlib
 import csv
+import itertools
 import json
+import math
+import operator
+import os
+import secrets
+import textwrap
 import typing
 from pathlib import Path
 
@@ -9,16 +16,36 @@ import click
 import yaml
 from tabulate import tabulate
 
-FileData: typing.TypeAlias = list[
-    dict[
-        str,
-        typing.Any,
-    ]
+from camp.os_task import columnar, parallel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+Record: typing.TypeAlias = dict[
+    str,
+    typing.Any,
 ]
+FileData: typing.TypeAlias = list[Record]
+
+# Size of the chunks the streamed files are read by.
+CHUNK_SIZE = 64 * 1024
+# Number of the first CSV rows the types of the columns are inferred by.
+SAMPLE_ROWS = 100
+
+Value: typing.TypeAlias = bool | int | float | str
+Converter: typing.TypeAlias = typing.Callable[[str], Value]
+
+_BOOLEANS = {"true": True, "false": False}
 
 
 class DataLoader(typing.Protocol):
-    """Interface for loading and saving data in vaious formats."""
+    """Interface for loading and saving data in vaious formats.
+
+    ``iter_records`` and ``write_records`` stream the records one by one,
+    so converting a file takes memory of one record, not of the file.
+    """
 
     def load_data(self, file_path: Path) -> FileData:
         pass
@@ -26,10 +53,46 @@ class DataLoader(typing.Protocol):
     def save_data(self, data: FileData, file_path: Path) -> None:
         pass
 
+    def iter_records(self, file_path: Path) -> typing.Iterator[Record]:
+        pass
+
+    def write_records(
+        self,
+        records: typing.Iterable[Record],
+        file_path: Path,
+    ) -> None:
+        pass
+
+
+def _peek(
+    records: typing.Iterable[Record],
+) -> tuple[Record, typing.Iterator[Record]]:
+    """Return the first record and an iterator over all the records.
+
+    Raises:
+        ValueError: If there are no records.
+
+    """
+    iterator = iter(records)
+    first = next(iterator, None)
+    if first is None:
+        raise ValueError("No data to save")
+    return first, itertools.chain([first], iterator)
+
 
 class CSVDataLoader(DataLoader):
     """Class for loading and saving data in CSV format."""
 
+    def __init__(self, workers: int = 1) -> None:
+        """Set options of reading.
+
+        Args:
+            workers: Number of processes parsing big files (see
+                ``parallel``), they are parsed serially for 1.
+
+        """
+        self.workers = workers
+
     def load_data(
         self,
         file_path: Path,
@@ -39,25 +102,130 @@ class CSVDataLoader(DataLoader):
         Returns:
             FileData: List of dictionaries with data from the file.
 
+        """
+        return list(self.iter_records(file_path))
+
+    def iter_records(
+        self,
+        file_path: Path,
+    ) -> typing.Iterator[Record]:
+        """Read records from CSV file one by one.
+
+        Types of the columns are inferred by the first ``SAMPLE_ROWS``
+        rows (see ``_infer_kinds``), then each row is converted by the
+        converters of its columns. Files of ``parallel.PARALLEL_THRESHOLD``
+        bytes and more are parsed by ``workers`` processes, if there are
+        several ones.
+
+        Raises:
+            ValueError: If a row has not as many values as the header.
+
+        Yields:
+            Record: Dictionary with data of a row.
+
         """
         with file_path.open(newline="", encoding="utf-8") as csvfile:
             sample = csvfile.read(1024)
             delimiter = self._detect_delimiter(sample)
             csvfile.seek(0)
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-            data = [
-                {
-                    key: self._convert_value(value)
-                    for key, value in row.items()
-                } for row in reader
-            ]
-            return data
+            reader = csv.reader(csvfile, delimiter=delimiter)
+            header = next(reader, None)
+            if header is None:
+                return
+            rows = filter(None, reader)
+            head = list(itertools.islice(rows, SAMPLE_ROWS))
+            kinds = self._infer_kinds(head, len(header))
+            if (
+                self.workers > 1
+                and file_path.stat().st_size >= parallel.PARALLEL_THRESHOLD
+            ):
+                converted = parallel.iter_rows(
+                    file_path,
+                    delimiter,
+                    kinds,
+                    self._converter_for,
+                    self.workers,
+                )
+                for number, row in enumerate(converted, 1):
+                    if len(row) != len(header):
+                        raise ValueError(
+                            f"Row {number} has {len(row)} values, "
+                            f"expected {len(header)}",
+                        )
+                    yield dict(zip(header, row))
+                return
+            converters = [self._converter_for(column) for column in kinds]
+            for number, row in enumerate(itertools.chain(head, rows), 1):
+                if len(row) != len(header):
+                    raise ValueError(
+                        f"Row {number} has {len(row)} values, "
+                        f"expected {len(header)}",
+                    )
+                yield dict(zip(header, map(operator.call, converters, row)))
 
     def _detect_delimiter(self, sample: str) -> str:
         sniffer = csv.Sniffer()
         return sniffer.sniff(sample).delimiter
 
-    def _convert_value(self, value: str) -> int | float | str:
+    def _infer_kinds(
+        self,
+        rows: list[list[str]],
+        width: int,
+    ) -> list[set[type]]:
+        """Collect types of the not empty values of each column.
+
+        The types are of the values converted by ``_convert_value``, and
+        ``_converter_for`` picks a converter of a column by them.
+
+        Returns:
+            list[set[type]]: Types of the values of the columns.
+
+        """
+        kinds: list[set[type]] = [set() for _ in range(width)]
+        for row in rows:
+            for column, value in zip(kinds, row):
+                if value:
+                    column.add(type(self._convert_value(value)))
+        return kinds
+
+    def _converter_for(self, kinds: set[type]) -> Converter:
+        """Return converter of a column with values of the types.
+
+        A column gets the narrowest of ``bool``, ``int``, ``float`` and
+        ``str`` types holding all its values. Converters of ``bool``,
+        ``int`` and ``float`` columns fall back to ``_convert_value`` for
+        values not matching the type (e.g. empty ones). Values of ``str``
+        columns are kept as they are. Columns mixing other types keep
+        converting each value by ``_convert_value``.
+        """
+        fallback = self._convert_value
+        if kinds == {str}:
+            return str
+        if kinds == {bool}:
+
+            def convert_bool(value: str) -> Value:
+                converted = _BOOLEANS.get(value.lower())
+                return fallback(value) if converted is None else converted
+
+            return convert_bool
+        if kinds == {int}:
+
+            def convert_int(value: str) -> Value:
+                return int(value) if value.isdigit() else fallback(value)
+
+            return convert_int
+        if kinds and kinds <= {int, float}:
+
+            def convert_float(value: str) -> Value:
+                try:
+                    return float(value)
+                except ValueError:
+                    return fallback(value)
+
+            return convert_float
+        return fallback
+
+    def _convert_value(self, value: str) -> Value:
         """Convert value to the appropriate type."""
         lower_value = value.lower()
         if lower_value == "true":
@@ -83,14 +251,33 @@ class CSVDataLoader(DataLoader):
 
         """
         self._check_for_nested_data(data)
+        self.write_records(data, file_path)
+
+    def write_records(
+        self,
+        records: typing.Iterable[Record],
+        file_path: Path,
+    ) -> None:
+        """Write records to CSV file one by one.
+
+        Columns are the keys of the first record.
+
+        Raises:
+            ValueError: If there is no data to save or a record contains
+                nested structures.
+
+        """
+        first, records = _peek(records)
         with file_path.open("w", newline="", encoding="utf-8") as csvfile:
             writer = csv.DictWriter(
                 csvfile,
-                fieldnames=data[0].keys(),
+                fieldnames=first.keys(),
                 delimiter=";",
             )
             writer.writeheader()
-            writer.writerows(data)
+            for record in records:
+                self._check_for_nested_data([record])
+                writer.writerow(record)
 
     def _check_for_nested_data(
         self,
@@ -127,6 +314,57 @@ class JSONDataLoader(DataLoader):
         with file_path.open("r", encoding="utf-8") as jsonfile:
             return json.load(jsonfile)
 
+    def iter_records(
+        self,
+        file_path: Path,
+    ) -> typing.Iterator[Record]:
+        """Read records of the top-level JSON array one by one.
+
+        The file is read by chunks and each element is decoded as soon as
+        it's complete. A file holding something else than an array is
+        loaded at once and yielded as one record.
+
+        Raises:
+            ValueError: If the file is not valid JSON.
+
+        Yields:
+            Record: Element of the array.
+
+        """
+        decoder = json.JSONDecoder()
+        with file_path.open("r", encoding="utf-8") as jsonfile:
+            buffer = jsonfile.read(CHUNK_SIZE).lstrip()
+            if not buffer.startswith("["):
+                yield json.loads(buffer + jsonfile.read())
+                return
+            buffer, position, eof = buffer[1:], 0, False
+            while True:
+                position = self._skip(buffer, position, ",")
+                if buffer.startswith("]", position):
+                    return
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = -1
+                if end < 0 or (end == len(buffer) and not eof):
+                    # The element may go on in the next chunk.
+                    chunk = jsonfile.read(CHUNK_SIZE)
+                    eof = not chunk
+                    buffer, position = buffer[position:] + chunk, 0
+                    continue
+                yield record
+                position = end
+
+    def _skip(self, buffer: str, position: int, separator: str) -> int:
+        """Return position of the first char after spaces and a separator."""
+        while position < len(buffer) and (
+            buffer[position].isspace() or buffer[position] == separator
+        ):
+            position += 1
+        return position
+
     def save_data(
         self,
         data: FileData,
@@ -143,6 +381,149 @@ class JSONDataLoader(DataLoader):
         with file_path.open("w", encoding="utf-8") as jsonfile:
             json.dump(data, jsonfile, indent=4)
 
+    def write_records(
+        self,
+        records: typing.Iterable[Record],
+        file_path: Path,
+    ) -> None:
+        """Write records to JSON file as an array, one by one.
+
+        The output is the same as of ``save_data``.
+
+        Raises:
+            ValueError: If there is no data to save.
+
+        """
+        _, records = _peek(records)
+        with file_path.open("w", encoding="utf-8") as jsonfile:
+            separator = "[\n"
+            for record in records:
+                jsonfile.write(separator)
+                jsonfile.write(
+                    textwrap.indent(json.dumps(record, indent=4), " " * 4),
+                )
+                separator = ",\n"
+            jsonfile.write("\n]")
+
+
+def _loads(line: bytes) -> Record:
+    """Decode a JSON record, by ``orjson`` if it's installed.
+
+    Records ``orjson`` rejects, e.g. with ``NaN``, are decoded by the
+    ``json`` module.
+    """
+    if orjson is not None:
+        with contextlib.suppress(orjson.JSONDecodeError):
+            return orjson.loads(line)
+    return json.loads(line)
+
+
+def _has_non_finite(value: object) -> bool:
+    """Check if the value has ``NaN`` or infinite floats."""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(map(_has_non_finite, value.values()))
+    if isinstance(value, (list, tuple)):
+        return any(map(_has_non_finite, value))
+    return False
+
+
+def _dumps(record: Record) -> bytes:
+    """Encode a record as compact UTF-8 JSON, by ``orjson`` if installed.
+
+    Records ``orjson`` can't encode like the ``json`` module are encoded
+    by the ``json`` module: ones with integers out of the 64-bit range,
+    which ``orjson`` rejects, and ones with ``NaN`` and infinities, which
+    it writes as ``null``. Floats are formatted by each encoder its own
+    way, e.g. ``1e16`` by ``orjson`` and ``1e+16`` by ``json``.
+    """
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(record)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            # Values are checked only if there may be a non-finite float
+            # written as null.
+            if b"null" not in encoded or not _has_non_finite(record):
+                return encoded
+    return json.dumps(
+        record,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+class NDJSONDataLoader(DataLoader):
+    """Class for loading and saving data in JSON Lines (NDJSON) format.
+
+    Each line holds one record, so files are read and written record by
+    record and may be appended to. ``orjson`` is used if it's installed.
+    """
+
+    def load_data(
+        self,
+        file_path: Path,
+    ) -> FileData:
+        """Load data from JSON Lines file.
+
+        Returns:
+            FileData: List of dictionaries with data from the file.
+
+        """
+        return list(self.iter_records(file_path))
+
+    def iter_records(
+        self,
+        file_path: Path,
+    ) -> typing.Iterator[Record]:
+        """Read records from JSON Lines file one by one.
+
+        Blank lines are skipped.
+
+        Raises:
+            ValueError: If a line is not valid JSON.
+
+        Yields:
+            Record: Record of a line.
+
+        """
+        with file_path.open("rb") as jsonfile:
+            for line in jsonfile:
+                if line.strip():
+                    yield _loads(line)
+
+    def save_data(
+        self,
+        data: FileData,
+        file_path: Path,
+    ) -> None:
+        """Save data to JSON Lines file.
+
+        Raises:
+            ValueError: If there is no data to save.
+
+        """
+        self.write_records(data, file_path)
+
+    def write_records(
+        self,
+        records: typing.Iterable[Record],
+        file_path: Path,
+    ) -> None:
+        """Write records to JSON Lines file, one per line.
+
+        Raises:
+            ValueError: If there is no data to save.
+
+        """
+        _, records = _peek(records)
+        with file_path.open("wb") as jsonfile:
+            for record in records:
+                jsonfile.write(_dumps(record))
+                jsonfile.write(b"\n")
+
 
 class YAMLDataLoader(DataLoader):
     """Class for loading and saving data in YAML format."""
@@ -160,6 +541,42 @@ class YAMLDataLoader(DataLoader):
         with file_path.open("r", encoding="utf-8") as yamlfile:
             return yaml.safe_load(yamlfile)
 
+    def iter_records(
+        self,
+        file_path: Path,
+    ) -> typing.Iterator[Record]:
+        """Read records from YAML file one by one.
+
+        Elements of a top-level sequence are composed and constructed one
+        at a time from the parser events. Other documents (e.g. of a
+        multi-document stream) are yielded as records.
+
+        Yields:
+            Record: Element of the sequence or a document.
+
+        """
+        with file_path.open("r", encoding="utf-8") as yamlfile:
+            loader = yaml.SafeLoader(yamlfile)
+            try:
+                loader.get_event()
+                while not loader.check_event(yaml.StreamEndEvent):
+                    loader.get_event()
+                    if loader.check_event(yaml.SequenceStartEvent):
+                        loader.get_event()
+                        while not loader.check_event(yaml.SequenceEndEvent):
+                            yield self._construct(loader)
+                        loader.get_event()
+                    else:
+                        yield self._construct(loader)
+                    loader.get_event()
+            finally:
+                loader.dispose()
+
+    def _construct(self, loader: yaml.SafeLoader) -> Record:
+        """Compose and construct the next node of the stream."""
+        node = loader.compose_node(None, None)  # type: ignore[arg-type]
+        return loader.construct_document(node)
+
     def save_data(
         self,
         data: FileData,
@@ -176,14 +593,123 @@ class YAMLDataLoader(DataLoader):
         with file_path.open("w", encoding="utf-8") as yamlfile:
             yaml.safe_dump(data, yamlfile)
 
+    def write_records(
+        self,
+        records: typing.Iterable[Record],
+        file_path: Path,
+    ) -> None:
+        """Write records to YAML file as a block sequence, one by one.
+
+        Each record is dumped as a one element sequence, and together they
+        make the same output as ``save_data``.
+
+        Raises:
+            ValueError: If there is no data to save.
+
+        """
+        _, records = _peek(records)
+        with file_path.open("w", encoding="utf-8") as yamlfile:
+            for record in records:
+                yaml.safe_dump([record], yamlfile)
+
+
+class ColumnarDataLoader(DataLoader):
+    """Class for loading and saving data in the columnar binary format.
+
+    Values are stored by columns with types inferred from the records
+    (see ``columnar``), so reading is cheap and may be limited to some
+    of the columns.
+    """
+
+    def __init__(
+        self,
+        compression: str | None = "zlib",
+        row_group_size: int = columnar.ROW_GROUP_SIZE,
+    ) -> None:
+        """Set options of writing.
+
+        Args:
+            compression: ``zlib``, ``bz2``, ``lzma`` or None.
+            row_group_size: Number of records written at once.
+
+        """
+        self.compression = compression
+        self.row_group_size = row_group_size
+
+    def load_data(
+        self,
+        file_path: Path,
+    ) -> FileData:
+        """Load data from columnar file.
+
+        Returns:
+            FileData: List of dictionaries with data from the file.
+
+        """
+        return list(self.iter_records(file_path))
+
+    def iter_records(
+        self,
+        file_path: Path,
+        columns: typing.Sequence[str] | None = None,
+    ) -> typing.Iterator[Record]:
+        """Read records from columnar file by row groups.
+
+        Args:
+            columns: Names of the columns to read, all if not set.
+
+        Raises:
+            ValueError: If the file is not a columnar one or has no column.
+
+        Returns:
+            Iterator[Record]: Records with the columns, None for nulls.
+
+        """
+        return columnar.read(file_path, columns)
+
+    def save_data(
+        self,
+        data: FileData,
+        file_path: Path,
+    ) -> None:
+        """Save data to columnar file.
+
+        Raises:
+            ValueError: If there is no data to save.
+
+        """
+        self.write_records(data, file_path)
+
+    def write_records(
+        self,
+        records: typing.Iterable[Record],
+        file_path: Path,
+    ) -> None:
+        """Write records to columnar file by row groups.
+
+        Raises:
+            ValueError: If there is no data to save or a record has columns
+                missing in the first row group.
+
+        """
+        columnar.write(
+            records,
+            file_path,
+            self.compression,
+            self.row_group_size,
+        )
+
 
 class Data:
     """Class for loading and saving data in various formats."""
     loaders: dict[str, type[DataLoader]] = {
         "json": JSONDataLoader,
+        "ndjson": NDJSONDataLoader,
+        "jsonl": NDJSONDataLoader,
         "csv": CSVDataLoader,
         "yaml": YAMLDataLoader,
         "yml": YAMLDataLoader,
+        "columnar": ColumnarDataLoader,
     }
 
     @classmethod
@@ -249,6 +775,70 @@ class Data:
         loader = cls._get_loader(file_path, file_format)
         return loader.save_data(data, file_path)
 
+    @classmethod
+    def iter_records(
+        cls: type[Data],
+        file_path: Path,
+        file_format: str | None = None,
+        workers: int = 1,
+    ) -> typing.Iterator[Record]:
+        """Read records from a file in the specified format one by one.
+
+        Args:
+            file_format: File format. If no format, set them by file extension.
+            workers: Number of processes parsing a big CSV file. Files of
+                other formats are read serially.
+
+        Raises:
+            ValueError: If the file is empty or its format is not supported.
+
+        Returns:
+            Iterator[Record]: Records read lazily from the file.
+
+        """
+        if file_path.stat().st_size == 0:
+            raise ValueError(
+                "File is empty.",
+            )
+
+        loader = cls._get_loader(file_path, file_format)
+        if isinstance(loader, CSVDataLoader):
+            loader.workers = workers
+
+        return loader.iter_records(file_path)
+
+    @classmethod
+    def write_records(
+        cls: type[Data],
+        records: typing.Iterable[Record],
+        file_path: Path,
+        file_format: str | None = None,
+    ) -> None:
+        """Write records to a file with specified format one by one.
+
+        Records are written to a temporary file next to the output one,
+        which replaces the output when all of them are written. So the
+        output may be the file the records are read from, and it is not
+        left half-written if a record fails.
+
+        Args:
+            file_format: File format. If no format, set them by file extension.
+
+        Raises:
+            ValueError: If the file format is not supported or there is no
+                data to save.
+
+        """
+        loader = cls._get_loader(file_path, file_format)
+        temporary_path = file_path.with_name(
+            f".{file_path.name}.{secrets.token_hex(4)}.tmp",
+        )
+        try:
+            loader.write_records(records, temporary_path)
+            os.replace(temporary_path, file_path)
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
 
 @click.command()
 @click.argument(
@@ -264,40 +854,58 @@ class Data:
 @click.option(
     "--input-format",
     type=click.Choice(
-        ["csv", "json", "yaml"],
+        ["csv", "json", "ndjson", "jsonl", "yaml", "columnar"],
         case_sensitive=False,
     ),
     default=None,
-    help="Specify input file format (csv, json, yaml)",
+    help=(
+        "Specify input file format "
+        "(csv, json, ndjson, jsonl, yaml, columnar)"
+    ),
 )
 @click.option(
     "--output-format",
     type=click.Choice(
-        ["csv", "json", "yaml"],
+        ["csv", "json", "ndjson", "jsonl", "yaml", "columnar"],
         case_sensitive=False,
     ),
     default=None,
-    help="Specify output file format (csv, json, yaml)",
+    help=(
+        "Specify output file format "
+        "(csv, json, ndjson, jsonl, yaml, columnar)"
+    ),
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes parsing a big CSV input file",
 )
 def main(
     input_file: str,
     output: str | None,
     input_format: str,
     output_format: str,
+    workers: int,
 ) -> None:
-    """Convert data between CSV, JSON, and YAML formats."""
-    data = Data.load_data(
+    """Convert data between CSV, JSON, JSON Lines, YAML and columnar formats.
+
+    Records are streamed from the input to the output one by one, so the
+    memory used does not depend on the size of the file.
+    """
+    records = Data.iter_records(
         Path(input_file),
         input_format,
+        workers,
     )
     if output:
-        Data.save_data(
-            data,
+        Data.write_records(
+            records,
             Path(output),
             output_format,
         )
     else:
-        print(tabulate(data, headers="keys", tablefmt="grid"))
+        print(tabulate(list(records), headers="keys", tablefmt="grid"))
 
 
 if __name__ == "__main__":
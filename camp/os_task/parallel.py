@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import csv
+import io
+import operator
+import os
+import typing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+# Files smaller than this are parsed serially.
+PARALLEL_THRESHOLD = 4 * 1024 * 1024
+# Number of chunks per worker, so that the workers are evenly loaded.
+CHUNKS_PER_WORKER = 4
+# Chunks are not bigger than this, so memory does not grow with the file.
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+# Size of the blocks the file is scanned by.
+BLOCK_SIZE = 1024 * 1024
+QUOTE = b'"'
+NEWLINE = b"\n"
+
+Row: typing.TypeAlias = list[typing.Any]
+Kinds: typing.TypeAlias = list[set[type]]
+ConverterFactory: typing.TypeAlias = typing.Callable[
+    [set[type]],
+    typing.Callable[[str], typing.Any],
+]
+# Path, byte range, delimiter, kinds of the columns and their converters.
+Task: typing.TypeAlias = tuple[
+    Path,
+    int,
+    int,
+    str,
+    Kinds,
+    ConverterFactory,
+]
+
+
+class RecordScanner:
+    """Find boundaries of CSV records in a binary file.
+
+    A newline ends a record unless it's inside a quoted value, i.e. after
+    an odd number of quotes since the start of the record (an escaped
+    quote ``""`` does not change that). Quotes are counted block by block
+    with ``bytes.count``, so the file is scanned at the speed of C.
+    """
+
+    def __init__(self, file: typing.BinaryIO, position: int = 0) -> None:
+        """Start scanning at the position, which must start a record."""
+        self.file = file
+        self.position = position
+        self.quoted = 0
+        file.seek(position)
+
+    def skip_to(self, target: int) -> None:
+        """Move to the target, keeping track of quotes."""
+        while self.position < target:
+            block = self.file.read(min(BLOCK_SIZE, target - self.position))
+            if not block:
+                return
+            self.quoted ^= block.count(QUOTE) & 1
+            self.position += len(block)
+
+    def next_record(self) -> int:
+        """Move to the start of the next record.
+
+        Returns:
+            int: Position of the record, the size of the file at its end.
+
+        """
+        while block := self.file.read(BLOCK_SIZE):
+            index = 0
+            while (newline := block.find(NEWLINE, index)) >= 0:
+                self.quoted ^= block.count(QUOTE, index, newline) & 1
+                index = newline + 1
+                if not self.quoted:
+                    self.position += index
+                    self.file.seek(self.position)
+                    return self.position
+            self.quoted ^= block.count(QUOTE, index) & 1
+            self.position += len(block)
+        return self.position
+
+
+def split(file_path: Path, start: int, chunk_size: int) -> list[range]:
+    """Split the file from the start into byte ranges of whole records.
+
+    Args:
+        file_path: Path to the CSV file.
+        start: Position of the first record.
+        chunk_size: Approximate size of a range.
+
+    Returns:
+        list[range]: Consecutive ranges covering the file from the start.
+
+    """
+    with file_path.open("rb") as file:
+        size = file.seek(0, os.SEEK_END)
+        scanner = RecordScanner(file, start)
+        boundaries = [start]
+        while boundaries[-1] < size:
+            scanner.skip_to(boundaries[-1] + chunk_size)
+            boundaries.append(scanner.next_record())
+    return [range(*bounds) for bounds in zip(boundaries, boundaries[1:])]
+
+
+def header_end(file_path: Path) -> int:
+    """Return position of the first record after the header."""
+    with file_path.open("rb") as file:
+        return RecordScanner(file).next_record()
+
+
+def parse_chunk(task: Task) -> list[Row]:
+    """Parse and convert the records of a byte range.
+
+    Rows not matching the header are returned as they are, so the caller
+    reports them. Blank lines are skipped.
+    """
+    file_path, start, stop, delimiter, kinds, converter_for = task
+    with file_path.open("rb") as file:
+        file.seek(start)
+        text = file.read(stop - start).decode("utf-8")
+    converters = [converter_for(column) for column in kinds]
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+    return [
+        list(map(operator.call, converters, row))
+        if len(row) == len(converters)
+        else row
+        for row in reader
+        if row
+    ]
+
+
+def iter_rows(
+    file_path: Path,
+    delimiter: str,
+    kinds: Kinds,
+    converter_for: ConverterFactory,
+    workers: int,
+) -> typing.Iterator[Row]:
+    """Parse rows of the CSV file in worker processes, in order.
+
+    The file after the header is split into chunks of whole records,
+    which are parsed and converted by ``workers`` processes. At most two
+    chunks per worker are in flight, so memory does not depend on the
+    size of the file.
+
+    Args:
+        file_path: Path to the CSV file.
+        delimiter: Delimiter of the values.
+        kinds: Types of the values of each column.
+        converter_for: Picklable function returning converter of a column
+            with values of the types.
+        workers: Number of worker processes.
+
+    Yields:
+        Row: Converted values of a row, in order of the file.
+
+    """
+    start = header_end(file_path)
+    size = file_path.stat().st_size
+    chunk_size = min(
+        MAX_CHUNK_SIZE,
+        max(BLOCK_SIZE, (size - start) // (workers * CHUNKS_PER_WORKER)),
+    )
+    tasks = (
+        (file_path, chunk.start, chunk.stop, delimiter, kinds, converter_for)
+        for chunk in split(file_path, start, chunk_size)
+    )
+    executor = ProcessPoolExecutor(workers)
+    pending: deque[Future[list[Row]]] = deque()
+    try:
+        for task in tasks:
+            pending.append(executor.submit(parse_chunk, task))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,84 @@
+from collections.abc import Callable
+
+import pytest
+
+from camp.matrix_task.batch import MatrixBatch
+from camp.matrix_task.main import Matrix
+
+MATRICES = [
+    Matrix([[1, 2], [3, 4]]),
+    Matrix([[0, 1], [1, 1]]),
+    Matrix([[0.5, 0], [2, -1]]),
+]
+
+
+@pytest.fixture
+def batch() -> MatrixBatch:
+    """Batch of matrices of different dtypes."""
+    return MatrixBatch(MATRICES)
+
+
+def test_batch_round_trip(batch: MatrixBatch) -> None:
+    """Test conversion from and to a list of matrices."""
+    assert len(batch) == 3
+    assert batch.size == (2, 2)
+    assert batch.to_list() == MATRICES
+    assert batch[-1] == MATRICES[-1]
+    with pytest.raises(IndexError):
+        batch[3]
+
+
+def test_batch_rejects_different_sizes() -> None:
+    """Test that matrices of a batch must have one size."""
+    with pytest.raises(ValueError, match="same size"):
+        MatrixBatch([Matrix([[1]]), Matrix([[1, 2]])])
+    with pytest.raises(ValueError, match="at least one"):
+        MatrixBatch([])
+
+
+@pytest.mark.parametrize(
+    ["operation", "expected"],
+    [
+        [lambda batch: batch + batch, lambda matrix: matrix + matrix],
+        [lambda batch: batch - batch, lambda matrix: matrix - matrix],
+        [lambda batch: batch @ batch, lambda matrix: matrix @ matrix],
+        [
+            lambda batch: batch @ MATRICES[0],
+            lambda matrix: matrix @ MATRICES[0],
+        ],
+        [lambda batch: batch.transpose(), lambda matrix: matrix.transpose()],
+        [lambda batch: batch ** 0, lambda matrix: matrix ** 0],
+        [lambda batch: batch ** 5, lambda matrix: matrix ** 5],
+    ],
+)
+def test_batch_operations(
+    batch: MatrixBatch,
+    operation: Callable[[MatrixBatch], MatrixBatch],
+    expected: Callable[[Matrix], Matrix],
+) -> None:
+    """Test that batched operations equal operations on each matrix."""
+    assert operation(batch).to_list() == [
+        expected(matrix) for matrix in MATRICES
+    ]
+
+
+def test_batch_not_square_operations() -> None:
+    """Test transposition and product of not square matrices."""
+    batch = MatrixBatch([Matrix([[1, 2, 3]]), Matrix([[4, 5, 6]])])
+    transposed = batch.transpose()
+    assert transposed.size == (3, 1)
+    assert (batch @ transposed).to_list() == [Matrix([[14]]), Matrix([[77]])]
+    with pytest.raises(ValueError, match="not aligned"):
+        batch @ batch
+    with pytest.raises(ValueError, match="not aligned"):
+        batch ** 2
+
+
+def test_batch_invalid_operands(batch: MatrixBatch) -> None:
+    """Test operations with unsupported operands."""
+    with pytest.raises(ValueError, match="Unsupported operand"):
+        batch + 1
+    with pytest.raises(ValueError, match="same size"):
+        batch + MatrixBatch(MATRICES[:2])
+    with pytest.raises(ValueError, match="non-negative"):
+        batch ** -1
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from camp.matrix_task import benchmark
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.sparse import SparseMatrix
+
+
+def test_make_operand() -> None:
+    """Test kinds and dtypes of benchmark operands."""
+    sparse = benchmark.make_operand(32, "float", "sparse", seed=0)
+    assert isinstance(sparse, SparseMatrix)
+    assert sparse.density < 0.2
+    dense = benchmark.make_operand(4, "int", "dense", seed=0)
+    assert isinstance(dense, Matrix)
+    assert all(isinstance(value, int) for row in dense.data for value in row)
+
+
+def test_run_covers_all_cases() -> None:
+    """Test that each operation is measured for each kind of matrices."""
+    results = list(benchmark.run(sizes=(2,), min_time=0))
+    assert len(results) == len(benchmark.OPERATIONS) * len(
+        benchmark.DTYPES,
+    ) * len(benchmark.KINDS)
+    assert "matmul[sparse-float-2]" in {result["name"] for result in results}
+    assert all(result["ops_per_sec"] > 0 for result in results)
+    assert all(result["peak_bytes"] >= 0 for result in results)
+
+
+@pytest.mark.parametrize(
+    ["ops_per_sec", "count"],
+    [
+        [100, 0],
+        [85, 0],
+        [70, 1],
+    ],
+)
+def test_regressions(ops_per_sec: float, count: int) -> None:
+    """Test detection of slowdowns beyond the threshold."""
+    baseline = [
+        {"name": "add", "ops_per_sec": 100},
+        {"name": "sub", "ops_per_sec": 100},
+    ]
+    results = [
+        {"name": "add", "ops_per_sec": ops_per_sec},
+        {"name": "eq", "ops_per_sec": 1},
+    ]
+    assert len(benchmark.regressions(results, baseline, 0.2)) == count
+
+
+def test_run_serialization() -> None:
+    """Test that the binary format is compared with JSON and pickle."""
+    results = {
+        result["name"]: result
+        for result in benchmark.run_serialization(size=8, min_time=0)
+    }
+    assert set(results) == {
+        f"{name}_{step}[float-8]"
+        for name in ("binary", "json", "pickle")
+        for step in ("dump", "load")
+    }
+    assert results["binary_dump[float-8]"]["size_bytes"] < results[
+        "json_dump[float-8]"
+    ]["size_bytes"]
+
+
+def test_cli_saves_and_compares(tmp_path: Path) -> None:
+    """Test saving of results and failure on regression."""
+    output = tmp_path / "results.json"
+    runner = CliRunner()
+    args = ["--size", "2", "--serialization-size", "2", "--min-time", "0"]
+    saved = runner.invoke(benchmark.main, [*args, "-o", str(output)])
+    assert saved.exit_code == 0
+    results = json.loads(output.read_text())
+    assert len(results) == 28 + 6
+
+    for result in results:
+        result["ops_per_sec"] *= 1000
+    output.write_text(json.dumps(results))
+    failed = runner.invoke(
+        benchmark.main,
+        [*args, "--baseline", str(output)],
+    )
+    assert failed.exit_code == 1
+    assert "Performance regressions" in failed.output
@@ -0,0 +1,74 @@
+import pytest
+
+from camp.matrix_task.eigen import power_iteration
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.sparse import SparseMatrix
+
+MARKOV_CHAIN = Matrix([[0.9, 0.1, 0.0], [0.2, 0.7, 0.1], [0.0, 0.5, 0.5]])
+
+
+@pytest.mark.parametrize(
+    "matrix",
+    [MARKOV_CHAIN, SparseMatrix.from_dense(MARKOV_CHAIN)],
+)
+def test_power_iteration_stationary_distribution(
+    matrix: Matrix | SparseMatrix,
+) -> None:
+    """Test that the left eigenvector agrees with a high matrix power."""
+    result = power_iteration(matrix, transpose=True)
+    assert result.converged
+    assert result.value == pytest.approx(1.0)
+    assert 1 < result.iterations < 1000
+    assert result.elapsed >= 0
+    distribution = [value / sum(result.vector) for value in result.vector]
+    assert distribution == pytest.approx((MARKOV_CHAIN ** 64).data[0])
+
+
+@pytest.mark.parametrize(
+    ["data", "value", "vector"],
+    [
+        [[[2, 1], [1, 2]], 3.0, [0.5**0.5, 0.5**0.5]],
+        [[[-3, 0], [0, 1]], -3.0, [1.0, 0.0]],
+        [[[0, 0], [0, 0]], 0.0, [0.5**0.5, 0.5**0.5]],
+    ],
+)
+def test_power_iteration_dominant_eigenpair(
+    data: list[list[int | float]],
+    value: float,
+    vector: list[float],
+) -> None:
+    """Test dominant eigenpairs, including a negative and a zero one."""
+    result = power_iteration(Matrix(data), tolerance=1e-12)
+    assert result.converged
+    assert result.value == pytest.approx(value)
+    assert [abs(item) for item in result.vector] == pytest.approx(vector)
+
+
+def test_power_iteration_stops_early() -> None:
+    """Test that the iteration stops at the tolerance or the limit."""
+    matrix = Matrix([[1, 0], [0, -1]])
+    result = power_iteration(matrix, max_iterations=5)
+    assert not result.converged
+    assert result.iterations == 5
+    loose = power_iteration(MARKOV_CHAIN, tolerance=1e-2, transpose=True)
+    tight = power_iteration(MARKOV_CHAIN, tolerance=1e-12, transpose=True)
+    assert loose.converged
+    assert loose.iterations < tight.iterations
+
+
+@pytest.mark.parametrize(
+    ["matrix", "start", "message"],
+    [
+        [Matrix([[1, 2, 3]]), None, "must be square"],
+        [MARKOV_CHAIN, [1, 2], "not aligned"],
+        [MARKOV_CHAIN, [0, 0, 0], "must not be zero"],
+    ],
+)
+def test_power_iteration_invalid(
+    matrix: Matrix,
+    start: list[float] | None,
+    message: str,
+) -> None:
+    """Test errors of invalid matrices and start vectors."""
+    with pytest.raises(ValueError, match=message):
+        power_iteration(matrix, start=start)
@@ -0,0 +1,178 @@
+import random
+import typing
+from array import array
+
+import pytest
+
+from camp.matrix_task import kernels
+from camp.matrix_task.main import Matrix
+
+
+def naive_matmul(
+    left: list[list[float]],
+    right: list[list[float]],
+) -> list[list[float]]:
+    """Multiply matrices with the schoolbook algorithm."""
+    return [
+        [
+            sum(left[i][k] * right[k][j] for k in range(len(right)))
+            for j in range(len(right[0]))
+        ]
+        for i in range(len(left))
+    ]
+
+
+@pytest.mark.parametrize(
+    ["inner", "expected_tile"],
+    [
+        [1, kernels.MAX_TILE],
+        [2048, 8],
+        [10**7, kernels.MIN_TILE],
+    ],
+)
+def test_tile_size(
+    inner: int,
+    expected_tile: int,
+) -> None:
+    """Test automatic choice of tile size."""
+    assert kernels.tile_size(inner, 8) == expected_tile
+
+
+@pytest.mark.parametrize(
+    "tile",
+    [None, 1, 2, 3, 100],
+)
+@pytest.mark.parametrize(
+    "value_factory",
+    [
+        lambda: random.randint(-10, 10),
+        lambda: random.uniform(-10, 10),
+    ],
+)
+def test_blocked_matmul(
+    tile: int | None,
+    value_factory: typing.Callable[[], float],
+) -> None:
+    """Test that the blocked kernel agrees with the schoolbook one."""
+    left = [[value_factory() for _ in range(7)] for _ in range(5)]
+    right = [[value_factory() for _ in range(6)] for _ in range(7)]
+    expected = naive_matmul(left, right)
+    result = kernels.matmul(
+        left,
+        [list(col) for col in zip(*right)],
+        tile,
+    )
+    assert result == pytest.approx(
+        [value for row in expected for value in row],
+    )
+
+
+def test_matrix_matmul_not_square() -> None:
+    """Test multiplication of not square matrices."""
+    left = Matrix([[1, 2, 3], [4, 5, 6]])
+    right = Matrix([[1], [2], [3]])
+    assert left @ right == Matrix([[14], [32]])
+    assert (right.transpose() @ left.transpose()) == Matrix([[14, 32]])
+
+
+@pytest.mark.parametrize(
+    "size",
+    [1, 2, 3, 4, 5, 7, 8, 12],
+)
+@pytest.mark.parametrize(
+    "cutoff",
+    [1, 2, 3],
+)
+def test_strassen_int(
+    size: int,
+    cutoff: int,
+) -> None:
+    """Test that Strassen gives exact results for integers."""
+    left = [random.randint(-100, 100) for _ in range(size * size)]
+    right = [random.randint(-100, 100) for _ in range(size * size)]
+    expected = kernels.matmul(
+        [left[row:row + size] for row in range(0, size * size, size)],
+        [right[col::size] for col in range(size)],
+    )
+    assert kernels.strassen(left, right, size, cutoff) == expected
+
+
+@pytest.mark.parametrize(
+    "size",
+    [6, 9, 16],
+)
+def test_strassen_float(
+    size: int,
+) -> None:
+    """Test that Strassen agrees with the blocked kernel for floats."""
+    left = [random.uniform(-1, 1) for _ in range(size * size)]
+    right = [random.uniform(-1, 1) for _ in range(size * size)]
+    expected = kernels.matmul(
+        [left[row:row + size] for row in range(0, size * size, size)],
+        [right[col::size] for col in range(size)],
+    )
+    assert kernels.strassen(left, right, size, 2) == pytest.approx(expected)
+
+
+def test_matrix_matmul_selects_strassen(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that big square matrices are multiplied by Strassen."""
+    monkeypatch.setattr(kernels, "STRASSEN_THRESHOLD", 4)
+    monkeypatch.setattr(kernels, "STRASSEN_CUTOFF", 2)
+    data: list[list[float]] = [
+        [random.randint(-9, 9) for _ in range(5)] for _ in range(5)
+    ]
+    matrix = Matrix(data)
+    expected = Matrix(naive_matmul(data, data))
+    sizes = []
+    strassen = kernels.strassen
+
+    def spy(
+        left: kernels.Vector,
+        right: kernels.Vector,
+        size: int,
+        cutoff: int | None = None,
+        product: kernels.DotProduct | None = None,
+    ) -> list[int | float]:
+        sizes.append(size)
+        return strassen(left, right, size, cutoff, product)
+
+    monkeypatch.setattr(kernels, "strassen", spy)
+    assert matrix @ matrix == expected
+    matrix @= matrix
+    assert matrix == expected
+    assert sizes.count(5) == 2
+    assert Matrix([[1, 2]]) @ Matrix([[1], [2]]) == Matrix([[5]])
+    assert sizes.count(5) == 2
+    assert 1 not in sizes
+
+
+def test_float_dot_is_accurate() -> None:
+    """Test that float products do not accumulate rounding errors."""
+    left = array("d", [1e16, 1.0, -1e16])
+    right = array("d", [1.0, 1.0, 1.0])
+    assert kernels.float_dot(left, right) == 1.0
+    assert kernels.dot_for("q", "d") is kernels.float_dot
+    assert kernels.dot_for("q", None) is kernels.dot
+    assert kernels.modular_dot(7)([3, 4], [5, 6]) == 39 % 7
+
+
+def test_matvec_kernels() -> None:
+    """Test that mat-vec kernels agree with the schoolbook product."""
+    rows: list[list[float]] = [
+        [random.randint(-9, 9) for _ in range(4)] for _ in range(3)
+    ]
+    vector: list[float] = [random.randint(-9, 9) for _ in range(4)]
+    expected = [
+        value
+        for row in naive_matmul(rows, [[value] for value in vector])
+        for value in row
+    ]
+    assert kernels.matvec(rows, vector) == expected
+    assert kernels.matvec([], vector) == []
+    out = array("q", [1, 2, 3])
+    kernels.gemv_into(out, rows, vector, alpha=3, beta=2)
+    assert list(out) == [
+        3 * value + 2 * old for value, old in zip(expected, [1, 2, 3])
+    ]
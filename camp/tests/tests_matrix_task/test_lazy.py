@@ -0,0 +1,127 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from camp.matrix_task import lazy as lazy_module
+from camp.matrix_task.lazy import LazyMatrix, MatMulChain, chain_order, lazy
+from camp.matrix_task.main import Matrix
+
+
+@pytest.fixture
+def matrices() -> tuple[Matrix, Matrix, Matrix]:
+    """Return matrices for lazy expressions."""
+    return (
+        Matrix([[1, 2], [3, 4]]),
+        Matrix([[5, 6], [7, 8]]),
+        Matrix([[0.5, 1], [1.5, 2]]),
+    )
+
+
+def test_lazy_expression(
+    matrices: tuple[Matrix, Matrix, Matrix],
+) -> None:
+    """Test that lazy expression gives the same result as eager one."""
+    a, b, c = matrices
+    expression = -((lazy(a) + b) * 2 - c) + 3 * a
+    assert isinstance(expression, LazyMatrix)
+    assert expression == -((a + b) * 2 - c) + a * 3
+    assert expression.data == (-((a + b) * 2 - c) + a * 3).data
+
+
+def test_lazy_expression_with_matrix_on_the_left(
+    matrices: tuple[Matrix, Matrix, Matrix],
+) -> None:
+    """Test operations of a matrix and a lazy expression."""
+    a, b, c = matrices
+    assert a - lazy(b) == a - b
+    assert isinstance(a + lazy(b), LazyMatrix)
+    assert a @ lazy(b) == a @ b
+    assert a * lazy(b) == a @ b
+    assert a == lazy(a)
+
+
+def test_lazy_expression_single_pass(
+    mocker: MockerFixture,
+    matrices: tuple[Matrix, Matrix, Matrix],
+) -> None:
+    """Test that elementwise operations are fused."""
+    a, b, c = matrices
+    expression = (lazy(a) + b) * 2 - c
+    spy = mocker.spy(lazy_module, "pack_as")
+    expression.evaluate()
+    expression.evaluate()
+    assert spy.call_count == 1
+
+
+def test_lazy_result_is_not_shared(
+    matrices: tuple[Matrix, Matrix, Matrix],
+) -> None:
+    """Test that changing results does not change the kept ones."""
+    a, b, _ = matrices
+    expression = lazy(a) + b
+    product = lazy(a) @ b
+    for result in (expression, product):
+        changed = result.evaluate()
+        changed *= 10
+    leaf = lazy(a).evaluate()
+    leaf += b
+    assert a == Matrix([[1, 2], [3, 4]])
+    assert expression.evaluate() == a + b
+    assert product.evaluate() == a @ b
+
+
+def test_lazy_keeps_object_dtype() -> None:
+    """Test that values computed from big integers stay exact."""
+    big = Matrix([[2**70, 1]])
+    assert (lazy(big) - Matrix([[2**70, 0]])).evaluate().dtype == "object"
+    assert (lazy(big) * 2).data == [[2**71, 2]]
+    assert (lazy(Matrix([[1, 2]])) * 0.5).evaluate().dtype == "float64"
+
+
+def test_lazy_invalid_operands(
+    matrices: tuple[Matrix, Matrix, Matrix],
+) -> None:
+    """Test building expressions of invalid operands."""
+    a, _, _ = matrices
+    with pytest.raises(
+        ValueError,
+        match=r"Unsupported operand for \+: 'LazyMatrix' and '.*'",
+    ):
+        assert lazy(a) + "Not a matrix"
+    with pytest.raises(
+        ValueError,
+        match="Matrices must have the same size",
+    ):
+        assert lazy(a) + Matrix([[1]])
+    with pytest.raises(
+        ValueError,
+        match="Matrices are not aligned for multiplication",
+    ):
+        assert lazy(a) @ Matrix([[1]])
+
+
+@pytest.mark.parametrize(
+    ["dims", "expected_split"],
+    [
+        # (10x100 @ 100x5) @ 5x50
+        [[10, 100, 5, 50], 1],
+        # 50x5 @ (5x100 @ 100x10) is worse than (50x5 @ 5x100) @ 100x10
+        [[50, 5, 100, 10], 0],
+    ],
+)
+def test_chain_order(
+    dims: list[int],
+    expected_split: int,
+) -> None:
+    """Test the order of multiplication of a matrix chain."""
+    assert chain_order(dims)[0][len(dims) - 2] == expected_split
+
+
+def test_lazy_matmul_chain() -> None:
+    """Test that a chain of products is evaluated right."""
+    a = Matrix([[1] * 100 for _ in range(10)])
+    b = Matrix([[2] * 5 for _ in range(100)])
+    c = Matrix([[3] * 50 for _ in range(5)])
+    expression = lazy(a) @ b @ c
+    assert isinstance(expression, MatMulChain)
+    assert len(expression.operands) == 3
+    assert expression == (a @ b) @ c
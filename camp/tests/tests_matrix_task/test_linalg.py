@@ -0,0 +1,77 @@
+import pytest
+
+from camp.matrix_task.linalg import LU
+from camp.matrix_task.main import Matrix
+
+
+def assert_close(matrix: Matrix, expected: Matrix) -> None:
+    """Compare matrices with a tolerance."""
+    assert matrix.size == expected.size
+    assert list(matrix._flat()) == pytest.approx(list(expected._flat()))
+
+
+@pytest.mark.parametrize(
+    ["data", "det"],
+    [
+        [[[4, 3], [6, 3]], -6],
+        [[[0, 1, 2], [1, 0, 3], [4, -3, 8]], -2],
+        [[[2.5]], 2.5],
+        [[[1, 2], [2, 4]], 0],
+    ],
+)
+def test_det(data: list[list[int | float]], det: float) -> None:
+    """Test determinants, including the ones needing row swaps."""
+    assert Matrix(data).det() == pytest.approx(det)
+
+
+def test_lu_factors() -> None:
+    """Test that P @ A equals L @ U."""
+    data: list[list[int | float]] = [[1, 2, 0], [3, 1, 4], [0, 5, 6]]
+    factorization = LU([float(value) for row in data for value in row], 3)
+    lower = [
+        [
+            factorization.factors[row * 3 + col] if col < row else float(
+                col == row,
+            )
+            for col in range(3)
+        ]
+        for row in range(3)
+    ]
+    upper = [
+        [
+            factorization.factors[row * 3 + col] if col >= row else 0.0
+            for col in range(3)
+        ]
+        for row in range(3)
+    ]
+    permuted = Matrix([data[row] for row in factorization.pivots])
+    assert_close(Matrix(lower) @ Matrix(upper), permuted)
+
+
+def test_solve_and_inverse() -> None:
+    """Test solution of a system and the inverse matrix."""
+    matrix = Matrix([[2, 1, 1], [1, 3, 2], [1, 0, 0]])
+    solution = matrix.solve(Matrix([[4, 1], [5, 2], [6, 3]]))
+    assert_close(matrix @ solution, Matrix([[4, 1], [5, 2], [6, 3]]))
+    assert_close(matrix @ matrix.inverse(), matrix ** 0)
+
+
+def test_factorization_is_cached() -> None:
+    """Test that LU is reused until the matrix changes."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    factorization = matrix.lu()
+    assert matrix.det() == pytest.approx(-2)
+    assert matrix.lu() is factorization
+    matrix *= 2
+    assert matrix.lu() is not factorization
+    assert matrix.det() == pytest.approx(-8)
+
+
+def test_invalid_systems() -> None:
+    """Test singular, not square and not aligned matrices."""
+    with pytest.raises(ValueError, match="singular"):
+        Matrix([[1, 2], [2, 4]]).inverse()
+    with pytest.raises(ValueError, match="square"):
+        Matrix([[1, 2]]).det()
+    with pytest.raises(ValueError, match="not aligned"):
+        Matrix([[1, 2], [3, 4]]).solve(Matrix([[1]]))
@@ -0,0 +1,137 @@
+import random
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.mapped import MappedMatrix
+
+
+def random_matrix(rows: int, cols: int, dtype: type) -> Matrix:
+    """Build a matrix of random ints or floats."""
+    generator = random.Random(rows * cols)
+    return Matrix(
+        [
+            [dtype(generator.randint(-9, 9)) for _ in range(cols)]
+            for _ in range(rows)
+        ],
+    )
+
+
+@pytest.fixture
+def matrices() -> tuple[Matrix, Matrix, Matrix]:
+    """Matrices 7x5 (int), 7x5 (float) and 5x6 (int)."""
+    return (
+        random_matrix(7, 5, int),
+        random_matrix(7, 5, float),
+        random_matrix(5, 6, int),
+    )
+
+
+def test_mapped_round_trip(tmp_path: Path) -> None:
+    """Test writing and reading of a matrix file."""
+    matrix = random_matrix(3, 4, float)
+    MappedMatrix.from_matrix(matrix, tmp_path / "m.matrix").close()
+    with MappedMatrix(tmp_path / "m.matrix") as mapped:
+        assert mapped.size == (3, 4)
+        assert mapped.typecode == "d"
+        assert mapped.to_matrix() == matrix
+
+
+@pytest.mark.parametrize(
+    "block_items",
+    [
+        3,
+        1 << 19,
+    ],
+)
+def test_mapped_operations(
+    tmp_path: Path,
+    matrices: tuple[Matrix, Matrix, Matrix],
+    block_items: int,
+) -> None:
+    """Test that blocked operations equal in-memory ones."""
+    first, second, third = matrices
+    mapped = [
+        MappedMatrix.from_matrix(matrix, tmp_path / f"{index}.matrix")
+        for index, matrix in enumerate(matrices)
+    ]
+    for matrix in mapped:
+        matrix.block_items = block_items
+    results = {
+        "add": (mapped[0] + mapped[1], first + second),
+        "sub": (mapped[0] - mapped[1], first - second),
+        "mul": (mapped[0] * 3, first * 3),
+        "rmul": (0.5 * mapped[0], first * 0.5),
+        "transpose": (mapped[2].transpose(), third.transpose()),
+        "matmul": (mapped[0] @ mapped[2], first @ third),
+    }
+    for name, (result, expected) in results.items():
+        assert result.to_matrix() == expected, name
+        result.close()
+        assert not result.path.exists()
+    for matrix in mapped:
+        matrix.close()
+
+
+def test_mapped_result_path(tmp_path: Path) -> None:
+    """Test that a result with the given path is kept."""
+    with MappedMatrix.from_matrix(
+        Matrix([[1, 2], [3, 4]]),
+        tmp_path / "m.matrix",
+    ) as mapped:
+        mapped.matmul(mapped, tmp_path / "square.matrix").close()
+    with MappedMatrix(tmp_path / "square.matrix") as square:
+        assert square.to_matrix() == Matrix([[7, 10], [15, 22]])
+
+
+def test_mapped_memory_is_bounded(tmp_path: Path) -> None:
+    """Test that operations do not load the whole matrix."""
+    size = 300
+    with (
+        MappedMatrix.create(tmp_path / "tall.matrix", size, 4) as tall,
+        MappedMatrix.create(tmp_path / "wide.matrix", 4, size) as wide,
+    ):
+        tall.block_items = 1024
+        tracemalloc.start()
+        try:
+            square = tall @ wide
+            (square + square).close()
+            square.transpose().close()
+            square.close()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert peak < size * size * 8 / 8
+
+
+def test_mapped_invalid(tmp_path: Path) -> None:
+    """Test invalid files and operands."""
+    path = tmp_path / "bad.matrix"
+    path.write_bytes(b"not a matrix at all, definitely not")
+    with pytest.raises(ValueError, match="not a binary matrix"):
+        MappedMatrix(path)
+    path.write_bytes(b"")
+    with pytest.raises(ValueError, match="too short"):
+        MappedMatrix(path)
+    with pytest.raises(ValueError, match="int64 and float64"):
+        MappedMatrix.from_matrix(Matrix([[2**70]]), tmp_path / "big.matrix")
+    with MappedMatrix.create(tmp_path / "m.matrix", 2, 3) as mapped:
+        with pytest.raises(ValueError, match="not aligned"):
+            mapped @ mapped
+        with pytest.raises(ValueError, match="Unsupported operand"):
+            mapped + 1
+
+
+def test_mapped_overflow_removes_result(tmp_path: Path) -> None:
+    """Test that a result not fitting int64 is not left on disk."""
+    path = tmp_path / "m.matrix"
+    with MappedMatrix.from_matrix(Matrix([[2**62, 1], [1, 1]]), path) as m:
+        with pytest.raises(ValueError, match="Values do not fit int64"):
+            m + m
+        with pytest.raises(ValueError, match="Values do not fit int64"):
+            m.mul(4, tmp_path / "product.matrix")
+        with pytest.raises(ValueError, match="Values do not fit int64"):
+            m @ m
+        assert list(tmp_path.iterdir()) == [path]
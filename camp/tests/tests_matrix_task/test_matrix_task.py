@@ -1,7 +1,10 @@
-
+from array import array
+from pathlib import Path
 
 import pytest
+from pytest_mock import MockerFixture
 
+from camp.matrix_task import main
 from camp.matrix_task.main import Matrix
 
 MatrixType = list[tuple[Matrix, Matrix]]
@@ -640,3 +643,461 @@ def test_matrix_negation(
     """Test matrix negation."""
     result_matrix = -matrix
     assert result_matrix == result
+
+
+@pytest.mark.parametrize(
+    "power",
+    [1, 2, 5, 8, 13],
+)
+def test_matrix_pow_by_squaring(
+    power: int,
+) -> None:
+    """Test matrix power against repeated multiplication."""
+    matrix = Matrix(
+        [
+            [1, 1],
+            [1, 0],
+        ],
+    )
+    expected = matrix
+    for _ in range(power - 1):
+        expected = expected @ matrix
+    assert matrix ** power == expected
+
+
+def test_matrix_pow_returns_copy() -> None:
+    """Test that matrix power does not share data with the matrix."""
+    matrix = Matrix([[2]])
+    result = matrix ** 1
+    result += Matrix([[1]])
+    assert matrix == Matrix([[2]])
+
+
+def test_matrix_pow_cache() -> None:
+    """Test caching of computed matrix powers."""
+    matrix = Matrix(
+        [
+            [1, 1],
+            [1, 0],
+        ],
+    )
+    matrix.cache_powers()
+    assert matrix ** 12 == Matrix([[233, 144], [144, 89]])
+    assert matrix._power_cache is not None
+    assert set(matrix._power_cache) == {2, 4, 8}
+    squared = matrix ** 2
+    squared += squared
+    assert matrix ** 2 == Matrix([[2, 1], [1, 1]])
+
+    matrix += matrix
+    assert not matrix._power_cache
+    assert matrix ** 2 == Matrix([[8, 4], [4, 4]])
+
+    matrix.cache_powers(enabled=False)
+    assert matrix._power_cache is None
+
+
+def test_matrix_inplace_operations_keep_buffer() -> None:
+    """Test that in-place operations do not allocate a new buffer."""
+    matrix = Matrix(
+        [
+            [1, 2],
+            [3, 4],
+        ],
+    )
+    buffer = matrix._buffer
+    matrix += matrix
+    matrix -= Matrix([[1, 1], [1, 1]])
+    matrix *= 3
+    assert matrix._buffer is buffer
+    assert matrix == Matrix([[3, 9], [15, 21]])
+
+
+@pytest.mark.parametrize(
+    ["matrix", "other", "result"],
+    [
+        [
+            Matrix([[1, 2]]),
+            Matrix([[0.5, 0.5]]),
+            Matrix([[1.5, 2.5]]),
+        ],
+        [
+            Matrix([[2**62, 2]]),
+            Matrix([[2**62, 2]]),
+            Matrix([[2**63, 4]]),
+        ],
+    ],
+)
+def test_matrix_inplace_addition_widens_buffer(
+    matrix: Matrix,
+    other: Matrix,
+    result: Matrix,
+) -> None:
+    """Test in-place addition of values not fitting the buffer."""
+    matrix += other
+    assert matrix == result
+    assert matrix.data == result.data
+
+
+def test_matrix_inplace_update_by_blocks(mocker: MockerFixture) -> None:
+    """Test widening the buffer by a block after the first ones."""
+    mocker.patch.object(main, "UPDATE_BLOCK_SIZE", 2)
+    matrix = Matrix([[1, 2, 3], [4, 5, 6]])
+    matrix += Matrix([[1, 1, 1], [2**63, 0, 1]])
+    assert matrix == Matrix([[2, 3, 4], [2**63 + 4, 5, 7]])
+    assert matrix.dtype == "object"
+    matrix = Matrix([[1, 2, 3], [4, 5, 6]])
+    matrix *= 0.5
+    assert matrix == Matrix([[0.5, 1, 1.5], [2, 2.5, 3]])
+    assert matrix.dtype == "float64"
+
+
+def test_matrix_inplace_matmul_reuses_scratch() -> None:
+    """Test that @= swaps the buffer with a scratch one."""
+    matrix = Matrix(
+        [
+            [1, 1],
+            [1, 0],
+        ],
+    )
+    buffer = matrix._buffer
+    matrix @= matrix
+    matrix @= matrix
+    assert matrix._buffer is buffer
+    assert matrix == Matrix([[5, 3], [3, 2]])
+
+
+def test_matrix_inplace_matmul_changes_size() -> None:
+    """Test @= with a not square matrix."""
+    matrix = Matrix([[1, 2]])
+    matrix @= Matrix([[3], [4]])
+    assert matrix == Matrix([[11]])
+    assert matrix.size == (1, 1)
+
+
+def test_matrix_transpose_is_view() -> None:
+    """Test that transposition shares the buffer with the matrix."""
+    matrix = Matrix([[1, 2, 3], [4, 5, 6]])
+    transposed = matrix.transpose()
+    assert transposed._buffer is matrix._buffer
+    assert transposed.data == [[1, 4], [2, 5], [3, 6]]
+    assert transposed.transpose() == matrix
+    assert transposed @ matrix == Matrix(
+        [
+            [17, 22, 27],
+            [22, 29, 36],
+            [27, 36, 45],
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    ["key", "result"],
+    [
+        [(1, slice(None)), [[4, 5, 6]]],
+        [(slice(None), -1), [[3], [6], [9]]],
+        [(slice(1, 3), slice(0, 2)), [[4, 5], [7, 8]]],
+        [(slice(None, None, 2), slice(None, None, 2)), [[1, 3], [7, 9]]],
+    ],
+)
+def test_matrix_slice_view(
+    key: tuple[int | slice, slice],
+    result: list[list[int | float]],
+) -> None:
+    """Test rows, columns and windows of the matrix."""
+    matrix = Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    view = matrix[key]
+    assert view._buffer is matrix._buffer
+    assert view.data == result
+    assert view.transpose().transpose() == Matrix(result)
+    assert view + view == Matrix(result) * 2
+
+
+def test_matrix_element_access() -> None:
+    """Test reading of an element and invalid keys."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    assert matrix[1, 0] == 3
+    assert matrix.transpose()[1, 0] == 2
+    with pytest.raises(IndexError):
+        matrix[2, 0]
+    with pytest.raises(ValueError, match="positive slice steps"):
+        matrix[::-1, 0]
+
+
+def test_matrix_view_copy_on_write() -> None:
+    """Test that writes to a view and its matrix do not affect each other."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    buffer = matrix._buffer
+    row = matrix[0, :]
+    row += Matrix([[10, 10]])
+    assert row == Matrix([[11, 12]])
+    assert matrix == Matrix([[1, 2], [3, 4]])
+    assert matrix._buffer is buffer
+
+    column = matrix[:, 1]
+    matrix *= 2
+    assert matrix == Matrix([[2, 4], [6, 8]])
+    assert column == Matrix([[2], [4]])
+    assert column._buffer is buffer
+
+
+@pytest.mark.parametrize(
+    "matrix",
+    [
+        Matrix([[1, -2, 3], [4, 5, 2**62]]),
+        Matrix([[0.5], [-1e300]]),
+        Matrix([[1, 2, 3], [4, 5, 6]]).transpose()[1:, :],
+    ],
+)
+def test_matrix_binary_round_trip(matrix: Matrix, tmp_path: Path) -> None:
+    """Test serialization to bytes and files."""
+    data = matrix.to_bytes()
+    assert len(data) == 24 + 8 * matrix.size[0] * matrix.size[1]
+    assert Matrix.from_bytes(data) == matrix
+    assert Matrix.from_bytes(memoryview(bytearray(data))) == matrix
+    matrix.save(tmp_path / "matrix.bin")
+    loaded = Matrix.load(tmp_path / "matrix.bin")
+    assert loaded == matrix
+    assert loaded.size == matrix.size
+
+
+def test_matrix_binary_invalid(tmp_path: Path) -> None:
+    """Test errors of the binary format."""
+    with pytest.raises(ValueError, match="int64 and float64"):
+        Matrix([[2**64]]).to_bytes()
+    data = Matrix([[1, 2]]).to_bytes()
+    with pytest.raises(ValueError, match="too short"):
+        Matrix.from_bytes(data[:-1])
+    with pytest.raises(ValueError, match="not a binary matrix"):
+        Matrix.from_bytes(b"x" * len(data))
+    (tmp_path / "matrix.bin").write_bytes(data[:-1])
+    with pytest.raises(ValueError, match="too short"):
+        Matrix.load(tmp_path / "matrix.bin")
+
+
+@pytest.mark.parametrize(
+    ["matrix", "dtype"],
+    [
+        [Matrix([[1, 2]]), "int64"],
+        [Matrix([[1, 2.5]]), "float64"],
+        [Matrix([[1, 2**64]]), "object"],
+    ],
+)
+def test_matrix_dtype(matrix: Matrix, dtype: str) -> None:
+    """Test dtype of the values of a matrix."""
+    assert matrix.dtype == dtype
+    assert (matrix @ matrix.transpose()).dtype == dtype
+    assert (-matrix).dtype == dtype
+
+
+def test_matrix_astype() -> None:
+    """Test conversion between dtypes."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    exact = matrix.astype("object")
+    assert exact.dtype == "object"
+    assert (exact + exact).dtype == "object"
+    assert (exact @ exact) == matrix @ matrix
+    assert (exact ** 3).dtype == "object"
+    assert exact ** 3 == matrix ** 3
+    assert matrix.astype("float64").data == [[1.0, 2.0], [3.0, 4.0]]
+    assert Matrix([[1.7, -2.5]]).astype("int64").data == [[1, -2]]
+    with pytest.raises(ValueError, match="do not fit"):
+        Matrix([[2**64]]).astype("int64")
+    with pytest.raises(ValueError, match="Unknown dtype"):
+        matrix.astype("int8")
+
+
+def test_matrix_int_matmul_stays_exact() -> None:
+    """Test that integer products overflowing int64 stay exact."""
+    matrix = Matrix([[2**40, 1], [1, 2**40]])
+    square = matrix @ matrix
+    assert square.dtype == "object"
+    assert square.data == [[2**80 + 1, 2**41], [2**41, 2**80 + 1]]
+
+
+def test_matrix_modular_operations() -> None:
+    """Test modular matmul and pow."""
+    fibonacci = Matrix([[1, 1], [1, 0]])
+    modulus = 10**9 + 7
+    power = fibonacci.pow_mod(1000, modulus)
+    exact = fibonacci.astype("object") ** 1000
+    assert power.data == [
+        [value % modulus for value in row] for row in exact.data
+    ]
+    assert power.dtype == "int64"
+    assert fibonacci.pow_mod(0, 1) == Matrix([[0, 0], [0, 0]])
+    assert Matrix([[5, 6]]).matmul_mod(Matrix([[7], [8]]), 10) == Matrix(
+        [[3]],
+    )
+    with pytest.raises(ValueError, match="integer matrices"):
+        Matrix([[0.5]]).pow_mod(2, 7)
+    with pytest.raises(ValueError, match="positive"):
+        fibonacci.pow_mod(2, 0)
+
+
+def test_matrix_fingerprint() -> None:
+    """Test that fingerprint follows the content of the matrix."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    fingerprint = matrix.fingerprint()
+    assert Matrix([[1.0, 2.0], [3.0, 4.0]]).fingerprint() == fingerprint
+    assert matrix.transpose().transpose().fingerprint() == fingerprint
+    assert Matrix([[1, 2, 3, 4]]).fingerprint() != fingerprint
+    matrix += Matrix([[1, 0], [0, 0]])
+    assert matrix._fingerprint is None
+    assert matrix.fingerprint() != fingerprint
+
+
+def test_matrix_eq_short_circuits_on_fingerprint(
+    mocker: MockerFixture,
+) -> None:
+    """Test that values are not compared for different fingerprints."""
+    compare = mocker.patch(
+        "camp.matrix_task.main.same_values",
+        return_value=True,
+    )
+    first, second = Matrix([[1, 2]]), Matrix([[1, 3]])
+    first.fingerprint()
+    second.fingerprint()
+    assert first != second
+    compare.assert_not_called()
+    assert first == Matrix([[1, 2]])
+    compare.assert_called_once()
+
+
+def test_frozen_matrix() -> None:
+    """Test that frozen matrices are immutable and hashable."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    frozen = matrix.freeze()
+    memo = {frozen: "value"}
+    assert memo[Matrix([[1, 2], [3, 4]]).freeze()] == "value"
+    assert frozen == matrix
+
+    matrix *= 2
+    assert frozen == Matrix([[1, 2], [3, 4]])
+    result: Matrix = frozen
+    result += frozen
+    assert result == Matrix([[2, 4], [6, 8]])
+    assert frozen == Matrix([[1, 2], [3, 4]])
+    with pytest.raises(AttributeError, match="immutable"):
+        frozen.data = [[1]]
+    thawed = frozen.thaw()
+    thawed @= thawed
+    assert thawed == Matrix([[7, 10], [15, 22]])
+    assert hash(frozen) == frozen.fingerprint()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [[1, 2], [3]],
+        [[1], [2, 3]],
+        [[], [1]],
+    ],
+)
+def test_matrix_rejects_ragged_rows(data: list[list[int | float]]) -> None:
+    """Test that rows of different lengths are rejected at once."""
+    with pytest.raises(ValueError, match="Row 1 has"):
+        Matrix(data)
+
+
+@pytest.mark.parametrize(
+    ["dtype", "expected"],
+    [
+        ["int64", [[1, 0], [0, 1]]],
+        ["float64", [[1.0, 0.0], [0.0, 1.0]]],
+        ["object", [[1, 0], [0, 1]]],
+    ],
+)
+def test_matrix_zeros_and_identity(
+    dtype: str,
+    expected: list[list[int | float]],
+) -> None:
+    """Test bulk constructors of zero and identity matrices."""
+    zeros = Matrix.zeros(2, 3, dtype)
+    assert zeros.data == [[0, 0, 0], [0, 0, 0]]
+    assert zeros.dtype == dtype
+    identity = Matrix.identity(2, dtype)
+    assert identity.data == expected
+    assert identity.dtype == dtype
+    with pytest.raises(ValueError, match="Unknown dtype"):
+        Matrix.zeros(1, 1, "int8")
+
+
+def test_matrix_from_flat() -> None:
+    """Test construction from row-major values."""
+    buffer = array("d", [1, 2, 3, 4, 5, 6])
+    matrix = Matrix.from_flat(buffer, (2, 3))
+    assert matrix._buffer is buffer
+    assert matrix.data == [[1, 2, 3], [4, 5, 6]]
+    assert Matrix.from_flat(range(4), (2, 2)) == Matrix([[0, 1], [2, 3]])
+    with pytest.raises(ValueError, match="2x2 matrix of 3 values"):
+        Matrix.from_flat([1, 2, 3], (2, 2))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [array("q", [1, 1, 1, 0]), [2**63, 1, 1, 0]],
+)
+def test_matrix_from_flat_does_not_change_values(
+    values: "array[int] | list[int]",
+) -> None:
+    """Test that in-place operations copy the adopted buffer."""
+    original = list(values)
+    matrix = Matrix.from_flat(values, (2, 2))
+    matrix @= matrix
+    matrix @= matrix
+    matrix += matrix
+    matrix *= 2
+    assert list(values) == original
+    assert matrix == Matrix.from_flat(original, (2, 2)) ** 4 * 4
+
+
+def test_matrix_from_iterable() -> None:
+    """Test construction from rows given by generators."""
+    matrix = Matrix.from_iterable(
+        (value * factor for value in range(3)) for factor in (1, 0.5, 10**400)
+    )
+    assert matrix.size == (3, 3)
+    assert matrix.dtype == "object"
+    assert matrix.data == [
+        [0, 1, 2],
+        [0, 0.5, 1.0],
+        [0, 10**400, 2 * 10**400],
+    ]
+    assert Matrix.from_iterable([]).size == (0, 0)
+    with pytest.raises(ValueError, match="Row 2 has 2 elements, expected 1"):
+        Matrix.from_iterable(iter([(1,), (2,), (3, 4)]))
+
+
+def test_matrix_matvec_and_vecmat() -> None:
+    """Test products of a matrix and a vector."""
+    matrix = Matrix([[1, 2, 3], [4, 5, 6]])
+    assert matrix.matvec([1, 0, -1]) == array("q", [-2, -2])
+    assert matrix.vecmat((1, 2)) == array("q", [9, 12, 15])
+    assert matrix.transpose().matvec(array("q", [1, 2])) == array(
+        "q",
+        [9, 12, 15],
+    )
+    assert matrix.matvec([0.5, 0, 0]) == array("d", [0.5, 2.0])
+    assert matrix.astype("object").matvec([1, 1, 1]) == [6, 15]
+    with pytest.raises(ValueError, match="not aligned"):
+        matrix.matvec([1, 2])
+    with pytest.raises(ValueError, match="not aligned"):
+        matrix.vecmat([1, 2, 3])
+
+
+def test_matrix_gemv() -> None:
+    """Test in-place ``out = alpha * A @ x + beta * out``."""
+    matrix = Matrix([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    out = array("d", [float("nan")] * 3)
+    assert matrix.gemv([1, 1], out) is out
+    assert out == array("d", [3.0, 7.0, 11.0])
+    matrix.gemv([1, 0], out, alpha=2, beta=-1)
+    assert out == array("d", [-1.0, -1.0, -1.0])
+    result = [1, 1]
+    matrix.gemv([1, 0, 0], result, alpha=0.5, beta=1, transpose=True)
+    assert result == [1.5, 2.0]
+    with pytest.raises(ValueError, match="not aligned"):
+        matrix.gemv([1, 1], [0, 0])
+    with pytest.raises(TypeError):
+        matrix.gemv([1, 1], array("q", [0, 0, 0]))
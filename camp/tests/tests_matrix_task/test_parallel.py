@@ -0,0 +1,88 @@
+import operator
+import random
+import typing
+from array import array
+from collections.abc import Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from camp.matrix_task import kernels, parallel
+from camp.matrix_task.main import Matrix
+
+
+@pytest.fixture
+def parallel_mode() -> Iterator[None]:
+    """Turn on parallel mode for small matrices."""
+    parallel.configure(workers=2, threshold=1)
+    yield
+    parallel.shutdown()
+
+
+@pytest.mark.usefixtures("parallel_mode")
+@pytest.mark.parametrize(
+    "value_factory",
+    [
+        lambda: random.randint(-10, 10),
+        lambda: random.uniform(-10, 10),
+    ],
+)
+def test_parallel_operations(
+    value_factory: typing.Callable[[], float],
+) -> None:
+    """Test that parallel operations agree with serial ones."""
+    left_data = [[value_factory() for _ in range(7)] for _ in range(5)]
+    right_data = [[value_factory() for _ in range(3)] for _ in range(7)]
+    left, right = Matrix(left_data), Matrix(right_data)
+    product = left @ right
+    total = left + left
+    scaled = left * 2.5
+    assert parallel._Settings.executor is not None
+    parallel.shutdown()
+    assert list(product._buffer) == pytest.approx(
+        list((left @ right)._buffer),
+    )
+    assert total == left + left
+    assert scaled == left * 2.5
+
+
+@pytest.mark.usefixtures("parallel_mode")
+def test_parallel_overflow_falls_back() -> None:
+    """Test that values not fitting int64 are computed serially."""
+    matrix = Matrix([[2**62, 2**62], [1, 1]])
+    assert (matrix + matrix).data == [[2**63, 2**63], [2, 2]]
+    assert (matrix @ matrix).data == [
+        [2**124 + 2**62, 2**124 + 2**62],
+        [2**62 + 1, 2**62 + 1],
+    ]
+
+
+def test_parallel_accepts(parallel_mode: None) -> None:
+    """Test choosing between serial and parallel execution."""
+    buffer = Matrix([[1.5]])._buffer
+    assert parallel.accepts(10, buffer, 2)
+    assert not parallel.accepts(10, [2**70])
+    parallel.configure(workers=2, threshold=100)
+    assert not parallel.accepts(10, buffer)
+    parallel.shutdown()
+    assert not parallel.accepts(10**9, buffer)
+
+
+def test_parallel_matmul_by_tiles(
+    parallel_mode: None,
+    mocker: MockerFixture,
+) -> None:
+    """Test workers converting the right matrix by tiles of columns."""
+    mocker.patch.object(kernels, "MAX_TILE", 2)
+    left = Matrix([[row * 7 + col for col in range(7)] for row in range(5)])
+    right = left.transpose()
+    product = left @ right
+    parallel.shutdown()
+    assert product == left @ right
+
+
+@pytest.mark.usefixtures("parallel_mode")
+def test_parallel_worker_error_is_raised() -> None:
+    """Test that errors other than overflow are not hidden."""
+    with pytest.raises(ZeroDivisionError, match="division by zero"):
+        parallel.elementwise(operator.truediv, array("d", [1, 2]), 0)
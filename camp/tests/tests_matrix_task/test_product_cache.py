@@ -0,0 +1,95 @@
+from collections.abc import Iterator
+
+import pytest
+
+from camp.matrix_task import product_cache
+from camp.matrix_task.main import Matrix
+
+
+@pytest.fixture
+def cache() -> Iterator[product_cache.ProductCache]:
+    """Turn on the product cache."""
+    yield product_cache.enable()
+    product_cache.disable()
+
+
+def test_cache_hits_equal_operands(
+    cache: product_cache.ProductCache,
+) -> None:
+    """Test that products of equal operands are reused."""
+    basis = Matrix([[1, 2], [3, 4]])
+    first = basis @ Matrix([[1], [1]])
+    second = Matrix([[1, 2], [3, 4]]) @ Matrix([[1], [1]])
+    assert first == second == Matrix([[3], [7]])
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+    assert basis ** 3 == Matrix([[37, 54], [81, 118]])
+    assert basis ** 3 == Matrix([[37, 54], [81, 118]])
+    stats = product_cache.stats()
+    assert stats is not None
+    assert stats["hits"] >= 2
+    assert 0 < stats["hit_rate"] < 1
+
+
+def test_cache_misses_changed_operand(
+    cache: product_cache.ProductCache,
+) -> None:
+    """Test that a changed operand is not matched with the old product."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    assert matrix @ matrix == Matrix([[7, 10], [15, 22]])
+    matrix *= 2
+    assert matrix @ matrix == Matrix([[28, 40], [60, 88]])
+    assert cache.hits == 0
+
+
+def test_cached_product_is_not_changed_by_caller(
+    cache: product_cache.ProductCache,
+) -> None:
+    """Test that changing a returned product does not change the cache."""
+    matrix = Matrix([[1, 1], [1, 0]])
+    product = matrix @ matrix
+    product += matrix
+    assert matrix @ matrix == Matrix([[2, 1], [1, 1]])
+    assert cache.hits == 1
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Test eviction by the memory budget."""
+    cache = product_cache.ProductCache(budget=3 * 8)
+    matrices = [Matrix([[value]]) for value in range(4)]
+    for index, matrix in enumerate(matrices[:3]):
+        cache.put((index,), matrix)
+    assert cache.get((0,)) is matrices[0]
+    cache.put((3,), matrices[3])
+    assert cache.get((1,)) is None
+    assert cache.get((0,)) is matrices[0]
+    assert cache.evictions == 1
+    assert cache.used == 3 * 8
+
+    cache.put((4,), Matrix([[1, 2, 3, 4]]))
+    assert cache.get((4,)) is None
+    assert cache.stats()["entries"] == 3
+
+
+def test_cache_is_off_by_default() -> None:
+    """Test that nothing is cached unless the cache is enabled."""
+    assert product_cache.stats() is None
+    matrix = Matrix([[1]])
+    assert matrix @ matrix is not matrix @ matrix
+
+
+def test_cache_misses_colliding_fingerprints(
+    cache: product_cache.ProductCache,
+) -> None:
+    """Test that operands with equal fingerprints get their own products."""
+    first = Matrix([[1, -1], [0, 1]])
+    second = Matrix([[1, -2], [0, 1]])
+    assert first.fingerprint() == second.fingerprint()
+    vector = Matrix([[1], [1]])
+    assert first @ vector == Matrix([[0], [1]])
+    assert second @ vector == Matrix([[-1], [1]])
+    assert first ** 3 == Matrix([[1, -3], [0, 1]])
+    assert second ** 3 == Matrix([[1, -6], [0, 1]])
+    assert second ** 3 == Matrix([[1, -6], [0, 1]])
+    assert cache.hits == 1
@@ -0,0 +1,169 @@
+import pytest
+
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.sparse import SparseMatrix, auto
+
+
+@pytest.fixture
+def dense() -> Matrix:
+    """Return a dense matrix with a lot of zeros."""
+    return Matrix(
+        [
+            [0, 2, 0, 0],
+            [0, 0, 0, 0],
+            [1, 0, 0, 3],
+            [0, 0, 4, 0],
+        ],
+    )
+
+
+@pytest.fixture
+def other_dense() -> Matrix:
+    """Return another dense matrix with a lot of zeros."""
+    return Matrix(
+        [
+            [0, 0, 0, 1],
+            [5, 0, 0, 0],
+            [0, 0, 0, -3],
+            [0, 0, 0, 0],
+        ],
+    )
+
+
+def test_sparse_csr(dense: Matrix) -> None:
+    """Test CSR representation of a matrix."""
+    sparse = SparseMatrix.from_dense(dense)
+    assert list(sparse.indptr) == [0, 1, 1, 3, 4]
+    assert list(sparse.indices) == [1, 0, 3, 2]
+    assert list(sparse.values) == [2, 1, 3, 4]
+    assert sparse.nnz == 4
+    assert sparse.density == 0.25
+    assert sparse.to_dense() == dense
+
+
+def test_sparse_coo(dense: Matrix) -> None:
+    """Test conversion from and to COO format."""
+    sparse = SparseMatrix.from_coo(
+        [2, 0, 3, 2, 2],
+        [0, 1, 2, 3, 3],
+        [1, 2, 4, 1, 2],
+        (4, 4),
+    )
+    assert sparse == SparseMatrix.from_dense(dense)
+    assert sparse.to_coo() == ([0, 2, 2, 3], [1, 0, 3, 2], [2, 1, 3, 4])
+
+
+def test_sparse_coo_out_of_matrix() -> None:
+    """Test COO element out of the matrix."""
+    with pytest.raises(
+        ValueError,
+        match=r"Element \(2, 0\) is out of the matrix",
+    ):
+        SparseMatrix.from_coo([2], [0], [1], (2, 2))
+
+
+def test_sparse_elementwise(dense: Matrix, other_dense: Matrix) -> None:
+    """Test addition and subtraction of sparse and dense matrices."""
+    sparse = SparseMatrix.from_dense(dense)
+    other_sparse = SparseMatrix.from_dense(other_dense)
+    assert sparse + other_sparse == dense + other_dense
+    assert sparse - other_sparse == dense - other_dense
+    assert sparse + other_dense == dense + other_dense
+    assert sparse - other_dense == dense - other_dense
+    assert dense + other_sparse == dense + other_dense
+    assert dense - other_sparse == dense - other_dense
+    difference = sparse - sparse
+    assert isinstance(difference, SparseMatrix)
+    assert difference.nnz == 0
+
+
+def test_sparse_scalar_multiplication(dense: Matrix) -> None:
+    """Test multiplication of a sparse matrix by scalar."""
+    sparse = SparseMatrix.from_dense(dense)
+    assert sparse * 2 == dense * 2
+    assert 2.5 * sparse == dense * 2.5
+    zero = sparse * 0
+    assert isinstance(zero, SparseMatrix)
+    assert zero.nnz == 0
+    assert -sparse == -dense
+
+
+def test_sparse_matmul(dense: Matrix, other_dense: Matrix) -> None:
+    """Test multiplication of sparse and dense matrices."""
+    sparse = SparseMatrix.from_dense(dense)
+    other_sparse = SparseMatrix.from_dense(other_dense)
+    expected = dense @ other_dense
+    assert sparse @ other_sparse == expected
+    assert sparse @ other_dense == expected
+    assert dense @ other_sparse == expected
+    assert dense * other_sparse == expected
+    assert sparse * other_sparse == expected
+
+
+def test_sparse_matvec(dense: Matrix) -> None:
+    """Test multiplication of a sparse matrix by a vector."""
+    sparse = SparseMatrix.from_dense(dense)
+    vector = list(range(dense.cols_count))
+    assert sparse.matvec(vector) == list(dense.matvec(vector))
+    with pytest.raises(ValueError, match="not aligned"):
+        sparse.matvec([*vector, 1])
+
+
+def test_sparse_transpose_and_pow(dense: Matrix) -> None:
+    """Test transpose and power of a sparse matrix."""
+    sparse = SparseMatrix.from_dense(dense)
+    assert sparse.transpose() == dense.transpose()
+    for power in range(6):
+        assert sparse ** power == dense ** power
+
+
+@pytest.mark.parametrize(
+    "power",
+    [0, 1, 2],
+)
+def test_sparse_pow_of_not_square(power: int) -> None:
+    """Test that only square matrices are raised to a power."""
+    dense = Matrix([[0, 1, 0], [2, 0, 0]])
+    for matrix in (SparseMatrix.from_dense(dense), dense):
+        with pytest.raises(
+            ValueError,
+            match="Matrices are not aligned for multiplication",
+        ):
+            assert matrix ** power
+
+
+def test_sparse_auto_conversion(dense: Matrix) -> None:
+    """Test choosing dense or sparse format by density."""
+    sparse = SparseMatrix.from_dense(dense)
+    assert isinstance(auto(dense), SparseMatrix)
+    assert isinstance(auto(sparse, threshold=0.1), Matrix)
+    full = Matrix([[1, 2], [3, 4]])
+    assert isinstance(auto(full), Matrix)
+    assert isinstance(SparseMatrix.from_dense(full) * 2, Matrix)
+
+
+@pytest.mark.parametrize(
+    "invalid_matrix",
+    [None, "Not a matrix"],
+)
+def test_sparse_invalid_operands(
+    dense: Matrix,
+    invalid_matrix: None | str,
+) -> None:
+    """Test operations with invalid operands."""
+    sparse = SparseMatrix.from_dense(dense)
+    with pytest.raises(
+        ValueError,
+        match=r"Unsupported operand for \+: 'SparseMatrix' and '.*'",
+    ):
+        assert sparse + invalid_matrix
+    with pytest.raises(
+        ValueError,
+        match=r"Unsupported operand for \*: 'SparseMatrix' and '.*'",
+    ):
+        assert sparse @ invalid_matrix
+    with pytest.raises(
+        ValueError,
+        match="Matrices are not aligned for multiplication",
+    ):
+        assert sparse @ Matrix([[1]])
@@ -0,0 +1,113 @@
+import copy
+from array import array
+
+import pytest
+
+from camp.matrix_task.main import Matrix
+from camp.matrix_task.storage import pack
+
+
+@pytest.mark.parametrize(
+    ["values", "expected_type", "expected_typecode"],
+    [
+        [[1, 2, 3], array, "q"],
+        [[1, 2.5, 3], array, "d"],
+        [[1, 2**70, 3], list, None],
+    ],
+)
+def test_pack(
+    values: list[int | float],
+    expected_type: type,
+    expected_typecode: str | None,
+) -> None:
+    """Test packing values into the most compact buffer."""
+    buffer = pack(values)
+    assert type(buffer) is expected_type
+    assert getattr(buffer, "typecode", None) == expected_typecode
+    assert list(buffer) == values
+
+
+def test_matrix_data_view() -> None:
+    """Test that values set in data are written to the matrix."""
+    matrix = Matrix(
+        [
+            [1, 2],
+            [3, 4],
+        ],
+    )
+    view = matrix.transpose()
+    data = matrix.data
+    data[0][0] = 100
+    data[1][-1] += 0.5
+    assert matrix.data == [[100, 2], [3, 4.5]]
+    assert matrix[1, 1] == 4.5
+    assert view.data == [[1, 3], [2, 4]]
+    data[0] = [5, 6]
+    data[0][1:] = [7]
+    data[1:] = [[8, 9]]
+    assert matrix == Matrix([[5, 7], [8, 9]])
+    assert matrix.dtype == "float64"
+    copied = copy.deepcopy(data)
+    copied[0].append(1)
+    assert type(copied[0]) is list
+    assert matrix.size == (2, 2)
+
+
+def test_matrix_data_is_not_resized() -> None:
+    """Test that data rows can't be resized."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    with pytest.raises(TypeError, match="can't be resized"):
+        matrix.data[0].append(5)
+    with pytest.raises(TypeError, match="can't be resized"):
+        matrix.data.pop()
+    with pytest.raises(ValueError, match="can't be resized"):
+        matrix.data[0] = [1, 2, 3]
+    with pytest.raises(ValueError, match="can't be resized"):
+        matrix.data[0][:] = [1]
+    with pytest.raises(AttributeError, match="immutable"):
+        matrix.freeze().data[0][0] = 5
+    assert matrix == Matrix([[1, 2], [3, 4]])
+
+
+def test_matrix_set_element() -> None:
+    """Test setting an element by indices."""
+    matrix = Matrix([[1, 2], [3, 4]])
+    frozen = matrix.freeze()
+    matrix[0, -1] = 2**70
+    assert matrix.data == [[1, 2**70], [3, 4]]
+    assert frozen == Matrix([[1, 2], [3, 4]])
+    with pytest.raises(IndexError, match="out of range"):
+        matrix[2, 0] = 1
+    with pytest.raises(ValueError, match="Only single elements"):
+        matrix[0, :] = 1  # type: ignore[index]
+
+
+def test_matrix_data_setter() -> None:
+    """Test that assigning data replaces the storage."""
+    matrix = Matrix([[1, 2]])
+    matrix.data = [[1.5], [2.5]]
+    assert matrix.size == (2, 1)
+    assert matrix.data == [[1.5], [2.5]]
+
+
+def test_matrix_equal_between_buffers() -> None:
+    """Test equality of matrices stored in different buffers."""
+    assert Matrix([[1, 2]]) == Matrix([[1.0, 2.0]])
+    assert Matrix([[2**70, 2]]) == Matrix([[2**70, 2]])
+    assert Matrix([[2**70, 2]]) != Matrix([[1, 2]])
+    assert Matrix([[1, 2]]) != Matrix([[1], [2]])
+
+
+def test_matrix_has_no_dict() -> None:
+    """Test that the matrix uses slots."""
+    with pytest.raises(AttributeError):
+        Matrix([[1]]).extra = 1  # type: ignore[attr-defined]
+
+
+def test_matrix_different_size_addition() -> None:
+    """Test addition of matrices with different sizes."""
+    with pytest.raises(
+        ValueError,
+        match="Matrices must have the same size",
+    ):
+        assert Matrix([[1, 2]]) + Matrix([[1]])
@@ -103,3 +103,16 @@ def tmp_csv_no_extension_path(tmpdir: Path) -> Path:
     )
     path.write_text(csv_content, encoding="utf-8")
     return path
+
+
+@pytest.fixture
+def tmp_ndjson_path(tmpdir: Path) -> Path:
+    """JSON Lines file for test."""
+    path = tmpdir / "test.ndjson"
+    ndjson_content = (
+        '{"birthday": "1988-12-12", "name": "john", "salary": 100}\n'
+        "\n"
+        '{"birthday": "1972-12-12", "name": "kevin", "salary": 200}\n'
+    )
+    path.write_text(ndjson_content, encoding="utf-8")
+    return path
@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from camp.os_task import columnar
+from camp.os_task.converter import FileData
+
+
+@pytest.fixture
+def records() -> FileData:
+    """Return records with columns of all types and nulls."""
+    return [
+        {
+            "flag": index % 2 == 0,
+            "count": index,
+            "price": index / 4,
+            "name": f"name {index}",
+            "tags": ["a"] * (index % 3),
+            "note": None if index % 2 else "even",
+        }
+        for index in range(25)
+    ]
+
+
+@pytest.mark.parametrize(
+    "compression",
+    [None, "zlib", "bz2", "lzma"],
+)
+def test_round_trip(
+    tmp_path: Path,
+    records: FileData,
+    compression: str | None,
+) -> None:
+    """Test writing and reading records by row groups."""
+    path = tmp_path / "data.columnar"
+    columnar.write(iter(records), path, compression, row_group_size=10)
+    with path.open("rb") as file:
+        footer = columnar.read_footer(file)
+    assert footer["schema"] == [
+        ["flag", "bool"],
+        ["count", "int64"],
+        ["price", "float64"],
+        ["name", "str"],
+        ["tags", "json"],
+        ["note", "str"],
+    ]
+    assert [group["rows"] for group in footer["row_groups"]] == [10, 10, 5]
+    assert list(columnar.read(path)) == records
+
+
+def test_read_selected_columns(
+    tmp_path: Path,
+    records: FileData,
+    mocker: MockerFixture,
+) -> None:
+    """Test that only chunks of the selected columns are decoded."""
+    path = tmp_path / "data.columnar"
+    columnar.write(records, path, row_group_size=10)
+    decode = mocker.spy(columnar, "_decode")
+    assert list(columnar.read(path, ["name", "count"])) == [
+        {"name": record["name"], "count": record["count"]}
+        for record in records
+    ]
+    assert decode.call_count == 2 * 3
+    assert list(columnar.read(path, [])) == [{}] * len(records)
+    with pytest.raises(ValueError, match="No column 'missing'"):
+        list(columnar.read(path, ["missing"]))
+
+
+def test_values_not_matching_column_type(tmp_path: Path) -> None:
+    """Test chunks with values not matching the inferred types."""
+    path = tmp_path / "data.columnar"
+    records: FileData = [
+        {"count": 1, "price": 1},
+        {"count": 2, "price": 2.5},
+        {"count": "n/a"},
+        {"count": 2**70, "price": None},
+        {"count": 3, "price": 1.5},
+        {"count": 4, "price": 10**400},
+        {"count": 5, "price": 1.5},
+        {"count": 6, "price": 2**53 + 1},
+    ]
+    columnar.write(records, path, row_group_size=2)
+    assert list(columnar.read(path)) == [
+        {"count": 1, "price": 1.0},
+        {"count": 2, "price": 2.5},
+        {"count": "n/a", "price": None},
+        {"count": 2**70, "price": None},
+        {"count": 3, "price": 1.5},
+        {"count": 4, "price": 10**400},
+        {"count": 5, "price": 1.5},
+        {"count": 6, "price": 2**53 + 1},
+    ]
+
+
+@pytest.mark.parametrize(
+    ["records", "compression", "message"],
+    [
+        [[], None, "No data to save"],
+        [[{"a": 1}], "snappy", "Unknown compression 'snappy'"],
+        [[{"a": 1}, {"b": 2}], None, r"not in the schema: \['b'\]"],
+    ],
+)
+def test_write_invalid(
+    tmp_path: Path,
+    records: FileData,
+    compression: str | None,
+    message: str,
+) -> None:
+    """Test errors of writing."""
+    path = tmp_path / "data.columnar"
+    with pytest.raises(ValueError, match=message):
+        columnar.write(records, path, compression, row_group_size=1)
+    assert not path.exists()
+
+
+def test_read_invalid(tmp_path: Path) -> None:
+    """Test reading a file of another format."""
+    path = tmp_path / "data.columnar"
+    path.write_bytes(b"not a columnar file")
+    with pytest.raises(ValueError, match="not a columnar one"):
+        list(columnar.read(path))
@@ -1,8 +1,11 @@
+import math
 import typing
 from pathlib import Path
 
 import pytest
+from click.testing import CliRunner
 from pytest_lazy_fixtures import lf as lazy_fixture
+from pytest_mock import MockerFixture
 
 from camp.os_task import converter
 from camp.os_task.converter import FileData
@@ -22,6 +25,9 @@ PathType: typing.TypeAlias = Path | str
         pytest.param(
             lazy_fixture("tmp_yaml_path"),
         ),
+        pytest.param(
+            lazy_fixture("tmp_ndjson_path"),
+        ),
     ],
 )
 def test_load_data(
@@ -62,7 +68,7 @@ def test_save_empty_data(
 
 @pytest.mark.parametrize(
     argnames="output_format",
-    argvalues=["csv", "json", "yaml"],
+    argvalues=["csv", "json", "ndjson", "jsonl", "yaml", "columnar"],
 )
 def test_save_data(
     tmp_path: Path,
@@ -128,3 +134,236 @@ def test_save_incorrect_type(
             file_path=Path(tmp_csv_no_extension_path),
             file_format=file_format,
         )
+
+
+@pytest.mark.parametrize(
+    argnames="path",
+    argvalues=[
+        pytest.param(
+            lazy_fixture("tmp_json_path"),
+        ),
+        pytest.param(
+            lazy_fixture("tmp_csv_path"),
+        ),
+        pytest.param(
+            lazy_fixture("tmp_yaml_path"),
+        ),
+        pytest.param(
+            lazy_fixture("tmp_ndjson_path"),
+        ),
+    ],
+)
+def test_iter_records(
+    path: PathType,
+    expected_data: FileData,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test streaming records, with elements split between chunks."""
+    monkeypatch.setattr(converter, "CHUNK_SIZE", 7)
+    records = converter.Data.iter_records(Path(str(path)))
+    assert next(records) == expected_data[0]
+    assert list(records) == expected_data[1:]
+
+
+def test_iter_records_of_yaml_documents(tmp_path: Path) -> None:
+    """Test streaming documents of a multi-document YAML file."""
+    path = tmp_path / "documents.yaml"
+    path.write_text("name: john\n---\nname: kevin\n", encoding="utf-8")
+    assert list(converter.Data.iter_records(path)) == [
+        {"name": "john"},
+        {"name": "kevin"},
+    ]
+
+
+def test_iter_records_of_invalid_json(tmp_path: Path) -> None:
+    """Test streaming a truncated JSON array."""
+    path = tmp_path / "invalid.json"
+    path.write_text('[{"name": "john"}, {"name": ', encoding="utf-8")
+    records = converter.Data.iter_records(path)
+    assert next(records) == {"name": "john"}
+    with pytest.raises(ValueError, match="Expecting value"):
+        next(records)
+
+
+@pytest.mark.parametrize(
+    argnames="output_format",
+    argvalues=["csv", "json", "ndjson", "jsonl", "yaml", "columnar"],
+)
+def test_write_records(
+    tmp_path: Path,
+    output_format: str,
+    expected_data: FileData,
+) -> None:
+    """Test that streamed output is the same as the saved one."""
+    saved_path = tmp_path / f"saved.{output_format}"
+    streamed_path = tmp_path / f"streamed.{output_format}"
+    converter.Data.save_data(expected_data, saved_path)
+    converter.Data.write_records(iter(expected_data), streamed_path)
+    assert streamed_path.read_bytes() == saved_path.read_bytes()
+    with pytest.raises(ValueError, match="No data to save"):
+        converter.Data.write_records(iter([]), streamed_path)
+
+
+def test_main_streams_records(
+    tmp_csv_path: PathType,
+    tmp_path: Path,
+    expected_data: FileData,
+) -> None:
+    """Test conversion by the command line interface."""
+    output_path = tmp_path / "output.json"
+    result = CliRunner().invoke(
+        converter.main,
+        [str(tmp_csv_path), "-o", str(output_path)],
+    )
+    assert result.exit_code == 0
+    assert converter.Data.load_data(output_path) == expected_data
+
+
+@pytest.mark.parametrize(
+    argnames="file_format",
+    argvalues=["csv", "json", "ndjson", "yaml", "columnar"],
+)
+def test_main_overwrites_input(tmp_path: Path, file_format: str) -> None:
+    """Test converting a file into itself."""
+    path = tmp_path / f"data.{file_format}"
+    data = [{"id": index, "name": f"name {index}"} for index in range(3000)]
+    converter.Data.save_data(data, path)
+    result = CliRunner().invoke(converter.main, [str(path), "-o", str(path)])
+    assert result.exit_code == 0
+    assert converter.Data.load_data(path) == data
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_write_records_failure_keeps_output(
+    tmp_path: Path,
+    expected_data: FileData,
+    nested_data: FileData,
+) -> None:
+    """Test that a failed write leaves the output file as it was."""
+    path = tmp_path / "output.csv"
+    converter.Data.save_data(expected_data, path)
+    content = path.read_bytes()
+    with pytest.raises(
+        ValueError,
+        match="Nested data structures are not supported for CSV format",
+    ):
+        converter.Data.write_records(
+            iter(expected_data + nested_data),
+            path,
+        )
+    assert path.read_bytes() == content
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_csv_column_types(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test converting CSV columns by the types inferred from a sample."""
+    monkeypatch.setattr(converter, "SAMPLE_ROWS", 2)
+    path = tmp_path / "types.csv"
+    path.write_text(
+        "flag;count;price;name;mixed\n"
+        "true;1;1.5;john;1\n"
+        "FALSE;2;2;kevin;n/a\n"
+        "yes;;3;42;2\n",
+        encoding="utf-8",
+    )
+    assert converter.Data.load_data(path) == [
+        {"flag": True, "count": 1, "price": 1.5, "name": "john", "mixed": 1},
+        {
+            "flag": False,
+            "count": 2,
+            "price": 2.0,
+            "name": "kevin",
+            "mixed": "n/a",
+        },
+        {"flag": "yes", "count": "", "price": 3.0, "name": "42", "mixed": 2},
+    ]
+
+
+def test_csv_rows_of_wrong_length(tmp_path: Path) -> None:
+    """Test loading CSV with a row not matching the header."""
+    path = tmp_path / "ragged.csv"
+    rows = "".join(f"name{row};{row}\n\n" for row in range(100))
+    path.write_text(f"name;salary\n{rows}bob\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Row 101 has 1 values, expected 2"):
+        converter.Data.load_data(path)
+
+
+@pytest.mark.parametrize(
+    argnames="fast_encoder",
+    argvalues=[True, False],
+)
+def test_ndjson_without_orjson(
+    tmp_path: Path,
+    fast_encoder: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that JSON Lines are the same with and without orjson."""
+    if not fast_encoder:
+        monkeypatch.setattr(converter, "orjson", None)
+    data: FileData = [{"name": "Jürgen", "salary": 1.5, "tags": ["a"]}]
+    output_path = tmp_path / "output.jsonl"
+    converter.Data.save_data(data, output_path)
+    assert output_path.read_text(encoding="utf-8") == (
+        '{"name":"Jürgen","salary":1.5,"tags":["a"]}\n'
+    )
+    assert converter.Data.load_data(output_path) == data
+
+
+@pytest.mark.parametrize(
+    argnames="fast_encoder",
+    argvalues=[True, False],
+)
+def test_ndjson_values_orjson_does_not_encode(
+    tmp_path: Path,
+    fast_encoder: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test JSON Lines with big integers and NaN, as JSON files have them."""
+    if not fast_encoder:
+        monkeypatch.setattr(converter, "orjson", None)
+    input_path = tmp_path / "ids.csv"
+    input_path.write_text(
+        "id;name;score\n12345678901234567890123;bob;nan\n",
+        encoding="utf-8",
+    )
+    output_path = tmp_path / "output.jsonl"
+    result = CliRunner().invoke(
+        converter.main,
+        [str(input_path), "-o", str(output_path)],
+    )
+    assert result.exit_code == 0
+    assert output_path.read_text(encoding="utf-8") == (
+        '{"id":12345678901234567890123,"name":"bob","score":NaN}\n'
+    )
+    (record,) = converter.Data.load_data(output_path)
+    assert record["id"] == 12345678901234567890123
+    assert math.isnan(record["score"])
+
+
+@pytest.mark.parametrize(
+    ["fast_encoder", "expected"],
+    [
+        [True, '{"name":null,"note":"null","value":1e16}\n'],
+        [False, '{"name":null,"note":"null","value":1e+16}\n'],
+    ],
+)
+def test_ndjson_encoders_float_format(
+    tmp_path: Path,
+    fast_encoder: bool,
+    expected: str,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockerFixture,
+) -> None:
+    """Test that records with nulls are encoded once, floats per encoder."""
+    if not fast_encoder:
+        monkeypatch.setattr(converter, "orjson", None)
+    json_dumps = mocker.spy(converter.json, "dumps")
+    data: FileData = [{"name": None, "note": "null", "value": 1e16}]
+    output_path = tmp_path / "output.jsonl"
+    converter.Data.save_data(data, output_path)
+    assert output_path.read_text(encoding="utf-8") == expected
+    assert json_dumps.call_count == (0 if fast_encoder else 1)
+    assert converter.Data.load_data(output_path) == data
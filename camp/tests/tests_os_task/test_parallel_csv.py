@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from camp.os_task import converter, parallel
+
+
+@pytest.fixture
+def quoted_csv_path(tmp_path: Path) -> Path:
+    """CSV file with quoted delimiters, quotes and newlines in values."""
+    path = tmp_path / "quoted.csv"
+    rows = "".join(
+        f'{index};"line {index}\nnext; ""quoted""";{index / 2}\n'
+        + ("\n" if index % 7 == 0 else "")
+        for index in range(200)
+    )
+    path.write_text(f'id;"multi\nline";value\n{rows}', encoding="utf-8")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Split even small files into many chunks scanned by small blocks."""
+    monkeypatch.setattr(parallel, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(parallel, "BLOCK_SIZE", 16)
+    monkeypatch.setattr(parallel, "MAX_CHUNK_SIZE", 100)
+
+
+def test_split_keeps_records_whole(quoted_csv_path: Path) -> None:
+    """Test that byte ranges start at records, not at quoted newlines."""
+    start = parallel.header_end(quoted_csv_path)
+    data = quoted_csv_path.read_bytes()
+    assert data[:start] == b'id;"multi\nline";value\n'
+    chunks = parallel.split(quoted_csv_path, start, 50)
+    assert len(chunks) > 10
+    assert chunks[0].start == start
+    assert chunks[-1].stop == len(data)
+    for chunk, next_chunk in zip(chunks, chunks[1:]):
+        assert chunk.stop == next_chunk.start
+        assert data[next_chunk.start:next_chunk.start + 1].isdigit() or (
+            data[next_chunk.start:next_chunk.start + 1] == b"\n"
+        )
+
+
+@pytest.mark.parametrize(
+    "workers",
+    [2, 3],
+)
+def test_parallel_load_matches_serial(
+    quoted_csv_path: Path,
+    workers: int,
+) -> None:
+    """Test that parallel parsing gives the same records in order."""
+    expected = converter.CSVDataLoader().load_data(quoted_csv_path)
+    assert len(expected) == 200
+    assert expected[1] == {
+        "id": 1,
+        "multi\nline": 'line 1\nnext; "quoted"',
+        "value": 0.5,
+    }
+    loader = converter.CSVDataLoader(workers)
+    assert loader.load_data(quoted_csv_path) == expected
+
+
+def test_parallel_load_rows_of_wrong_length(tmp_path: Path) -> None:
+    """Test reporting a row not matching the header by its number."""
+    path = tmp_path / "ragged.csv"
+    rows = "".join(f"name{row};{row}\n" for row in range(100))
+    path.write_text(f"name;salary\n{rows}bob\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Row 101 has 1 values, expected 2"):
+        converter.CSVDataLoader(2).load_data(path)
+
+
+def test_main_with_workers(
+    quoted_csv_path: Path,
+    tmp_path: Path,
+) -> None:
+    """Test the --workers option of the command line interface."""
+    output_path = tmp_path / "output.jsonl"
+    result = CliRunner().invoke(
+        converter.main,
+        [str(quoted_csv_path), "-o", str(output_path), "--workers", "2"],
+    )
+    assert result.exit_code == 0
+    assert converter.Data.load_data(output_path) == (
+        converter.Data.load_data(quoted_csv_path)
+    )